@@ -0,0 +1,114 @@
+"""Headless batch fetches, for scripts and cron jobs.
+
+    python project.py --cities London,Tokyo,Paris [--format json|ndjson|csv] [--parallel 4]
+
+Cities are fetched through the same provider, cache and SQLite history as
+the app, ``--parallel`` at a time, and each one is written to stdout as soon
+as it completes (so the order is completion order, not argument order).
+Nothing here touches Tk, customtkinter or PIL, so it runs without a display.
+Units are metric: °C, m/s, hPa. A city that fails for any reason gets a
+record with its error and the rest carry on; the exit status is 1 if any
+city failed.
+"""
+import csv
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from lazy_import import lazy_module
+from forecast import aggregate_daily
+from providers import CityNotFoundError
+from resilience import CircuitOpenError
+from weather_service import WeatherService
+
+requests = lazy_module("requests")
+
+OUTPUT_FORMATS = ("ndjson", "json", "csv")
+DEFAULT_PARALLELISM = 4
+FORECAST_DAYS = 3
+
+CSV_FIELDS = ["city", "name", "country", "dt", "temp", "humidity", "pressure", "wind_speed",
+              "description", "icon", "error"]
+
+
+def fetch_many(service, cities, parallelism=DEFAULT_PARALLELISM):
+    """Yield ``(city, weather_data, forecast_data, error)`` as each city completes."""
+    with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="weather-batch") as executor:
+        futures = {executor.submit(service.fetch_city, city): city for city in cities}
+        for future in as_completed(futures):
+            city = futures[future]
+            try:
+                weather_data, forecast_data = future.result()
+            except (CityNotFoundError, CircuitOpenError, requests.exceptions.RequestException) as e:
+                yield city, None, None, str(e)
+            except Exception as e:
+                # A bad payload or fixture for one city shouldn't sink the rest
+                yield city, None, None, f"{type(e).__name__}: {e}"
+            else:
+                yield city, weather_data, forecast_data, None
+
+
+def to_record(city, weather_data, forecast_data, error=None):
+    if error is not None:
+        return {"city": city, "error": error}
+    return {
+        "city": city,
+        "name": weather_data.name,
+        "country": weather_data.country,
+        "dt": weather_data.dt,
+        "temp": weather_data.temp,
+        "humidity": weather_data.humidity,
+        "pressure": weather_data.pressure,
+        "wind_speed": weather_data.wind_speed,
+        "description": weather_data.description,
+        "icon": weather_data.icon,
+        "forecast": aggregate_daily(forecast_data, days=FORECAST_DAYS),
+        "error": None,
+    }
+
+
+def to_records(results):
+    for city, weather_data, forecast_data, error in results:
+        try:
+            yield to_record(city, weather_data, forecast_data, error)
+        except Exception as e:
+            yield to_record(city, None, None, f"{type(e).__name__}: {e}")
+
+
+def write_records(records, out, output_format="ndjson"):
+    """Write each record as it arrives and return how many had an error."""
+    failed = 0
+    if output_format == "csv":
+        # One row per city; the daily forecast only comes with json/ndjson
+        writer = csv.DictWriter(out, CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+    elif output_format == "json":
+        out.write("[")
+
+    try:
+        for i, record in enumerate(records):
+            if record["error"] is not None:
+                failed += 1
+            if output_format == "csv":
+                writer.writerow(record)
+            elif output_format == "json":
+                out.write(("," if i else "") + "\n  " + json.dumps(record, ensure_ascii=False))
+            else:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        # Even an interrupted run leaves valid JSON behind
+        if output_format == "json":
+            out.write("\n]\n")
+        out.flush()
+    return failed
+
+
+def run_batch(cities, output_format="ndjson", parallelism=DEFAULT_PARALLELISM, out=None, **service_options):
+    service = WeatherService(**service_options)
+    try:
+        records = to_records(fetch_many(service, cities, parallelism))
+        failed = write_records(records, out or sys.stdout, output_format)
+    finally:
+        service.close()
+    return 1 if failed else 0
@@ -0,0 +1,535 @@
+"""Performance benchmarks for the weather app.
+
+    python benchmark.py [startup search toggle forecast icons switching model providers]
+                        [--check] [--output FILE] [--baseline FILE]
+
+Startup runs in a fresh interpreter so import costs are real. The other
+benchmarks drive a headless WeatherApp (real fetch, cache, scheduler and
+render code, stand-in widgets instead of Tk) against the local stand-in API
+from fake_server.py. Results are printed and written as JSON; pass an older
+result file with --baseline to see what changed between commits.
+"""
+import argparse
+import contextlib
+import json
+import os
+import queue
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from types import SimpleNamespace
+from unittest.mock import patch
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Startup budget in milliseconds, checked with --check
+STARTUP_BUDGET_MS = {
+    "import": 150,
+    "first_paint": 1500,
+}
+
+IMPORT_SCRIPT = """
+import time
+started = time.perf_counter()
+import project
+print((time.perf_counter() - started) * 1000)
+"""
+
+FIRST_PAINT_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import project
+project.WeatherApp.fetch_weather = lambda self: None
+try:
+    root = project.ctk.CTk()
+except Exception as e:
+    print(json.dumps({"error": str(e)}))
+    raise SystemExit(0)
+app = project.WeatherApp(root)
+deadline = time.perf_counter() + 10
+while "deferred_widgets_ms" not in app.startup_timings and time.perf_counter() < deadline:
+    root.update()
+timings = dict(app.startup_timings)
+timings["process_first_paint_ms"] = (time.perf_counter() - started) * 1000
+root.destroy()
+print(json.dumps(timings))
+"""
+
+
+def run_script(script, env=None):
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=PROJECT_DIR,
+        env=dict(os.environ, **(env or {})),
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return result.stdout.strip().splitlines()[-1]
+
+
+def measure_import(runs=5):
+    samples = [float(run_script(IMPORT_SCRIPT)) for _ in range(runs)]
+    return {"median_ms": statistics.median(samples), "samples_ms": samples}
+
+
+def measure_first_paint():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = {"OPENWEATHER_API_KEY": "benchmark", "WEATHER_CACHE_DIR": cache_dir}
+        timings = json.loads(run_script(FIRST_PAINT_SCRIPT, env))
+    if "error" in timings:
+        # No display (e.g. CI without Xvfb), nothing to paint on
+        return {"skipped": timings["error"]}
+    return timings
+
+
+def bench_startup():
+    results = {
+        "import": measure_import(),
+        "first_paint": measure_first_paint(),
+    }
+    checks = {
+        "import": results["import"]["median_ms"],
+        "first_paint": results["first_paint"].get("process_first_paint_ms"),
+    }
+    results["budget_ms"] = STARTUP_BUDGET_MS
+    results["within_budget"] = {
+        name: value <= STARTUP_BUDGET_MS[name]
+        for name, value in checks.items()
+        if value is not None
+    }
+    return results
+
+
+class HeadlessRoot:
+    """Event queue standing in for a Tk root; ``after`` is safe from any thread."""
+
+    def __init__(self):
+        self._events = queue.Queue()
+
+    def after(self, ms, func):
+        self._events.put(func)
+
+    def after_idle(self, func):
+        self._events.put(func)
+
+    def after_cancel(self, job):
+        pass
+
+    def title(self, title):
+        pass
+
+    def geometry(self, size):
+        pass
+
+    def resizable(self, width, height):
+        pass
+
+    def bind(self, sequence, func):
+        pass
+
+    def pump(self, until=None, timeout=10):
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            if until is not None and until():
+                return True
+            try:
+                func = self._events.get(block=until is not None, timeout=0.001)
+            except queue.Empty:
+                if until is None:
+                    return True
+                continue
+            func()
+        raise TimeoutError("headless event loop did not settle")
+
+
+class HeadlessWidget:
+    def __init__(self, *args, **options):
+        self.options = dict(options)
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    def cget(self, name):
+        return self.options.get(name)
+
+    def get(self):
+        return self.options.get("value", self.options.get("text", ""))
+
+    def insert(self, index, text):
+        self.options["text"] = text
+
+    def delete(self, start, end):
+        self.options["text"] = ""
+
+    def pack(self, **kwargs):
+        pass
+
+    def pack_forget(self):
+        pass
+
+    def grid(self, **kwargs):
+        pass
+
+    def bind(self, sequence, func):
+        pass
+
+
+HEADLESS_CTK = SimpleNamespace(
+    CTkFrame=HeadlessWidget, CTkLabel=HeadlessWidget, CTkButton=HeadlessWidget,
+    CTkEntry=HeadlessWidget, CTkOptionMenu=HeadlessWidget, CTkSwitch=HeadlessWidget,
+    CTkToplevel=HeadlessWidget,
+    set_appearance_mode=lambda mode: None, set_default_color_theme=lambda theme: None,
+)
+
+
+@contextlib.contextmanager
+def headless_app(latency=0.05, provider="openweather", **server_config):
+    """A WeatherApp wired to the stand-in API, with Tk replaced by HeadlessWidget."""
+    import project
+    from fake_server import start_server
+    from resilience import TokenBucket
+
+    server = start_server(latency=latency, seed=1, **server_config)
+    with tempfile.TemporaryDirectory() as cache_dir, \
+         patch.dict(os.environ, {
+             "OPENWEATHER_API_KEY": "benchmark",
+             "OPENWEATHER_BASE_URL": server.base_url,
+             "WEATHER_CACHE_DIR": cache_dir,
+             "WEATHER_PROVIDER": provider,
+             # Measure the download/decode path unless a benchmark opts into an atlas
+             "WEATHER_ICON_ATLAS": os.path.join(cache_dir, "icons.atlas"),
+         }), \
+         patch.object(project, "ctk", HEADLESS_CTK), \
+         patch.object(project, "ImageTk", SimpleNamespace(PhotoImage=lambda image: image)):
+        root = HeadlessRoot()
+        app = project.WeatherApp(root)
+        # The stand-in has no quota; the per-key limiter would make this a rate-limit benchmark
+        app.client.limiter = TokenBucket(rate=10000, capacity=10000)
+        try:
+            root.pump(until=lambda: is_rendered(app, app.city))
+            yield app, root, server
+        finally:
+            root.pump()
+            app.refresher.stop()
+            app.prefetcher.stop()
+            app.scheduler.shutdown()
+            app.icon_loader.shutdown()
+            app.snapshot_writer.shutdown()
+            server.shutdown()
+            server.server_close()
+
+
+def is_rendered(app, city):
+    return (
+        app.weather_data is not None
+        and app.weather_data.name == city
+        and app.status_label.cget("text") in ("Data fetched successfully", "Data loaded from cache")
+        and not app.renderer._pending
+    )
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "p50_ms": statistics.median(ordered),
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max_ms": ordered[-1],
+    }
+
+
+def bench_search(runs=20, latency=0.05):
+    # Every search uses a new city name so nothing is served from cache
+    samples = []
+    with headless_app(latency=latency) as (app, root, server):
+        for i in range(runs):
+            city = f"Benchmark City {i}"
+            app.city_entry.insert(0, city)
+            started = time.perf_counter()
+            app.search_city()
+            root.pump(until=lambda: is_rendered(app, city))
+            samples.append((time.perf_counter() - started) * 1000)
+        phases = {
+            phase: {"p50_ms": stats["p50"] * 1000, "p99_ms": stats["p99"] * 1000}
+            for phase, stats in app.metrics.summary().items()
+        }
+    return dict(percentiles(samples), upstream_latency_ms=latency * 1000, phases=phases)
+
+
+def bench_toggle(runs=2000):
+    with headless_app(latency=0) as (app, root, server):
+        switch_values = [1, 0]
+        app.unit_switch.configure(value=0)
+        calls_before = app.renderer.configure_calls
+        started = time.perf_counter()
+        for i in range(runs):
+            app.unit_switch.configure(value=switch_values[i % 2])
+            app.toggle_unit()
+            root.pump()
+        elapsed = time.perf_counter() - started
+        calls = app.renderer.configure_calls - calls_before
+    return {
+        "runs": runs,
+        "mean_us": elapsed / runs * 1e6,
+        "configure_calls_per_toggle": calls / runs,
+    }
+
+
+def bench_forecast(runs=2000, sizes=(40, 400)):
+    import forecast
+    from fake_server import forecast as fake_forecast
+
+    results = {}
+    backends = {"python": None}
+    if forecast.np is not None:
+        backends["numpy"] = forecast.np
+    for entries in sizes:
+        payload = fake_forecast("London", entries)
+        for name, backend in backends.items():
+            # Force the backend, whatever NUMPY_MIN_ENTRIES would pick
+            with patch.object(forecast, "np", backend), patch.object(forecast, "NUMPY_MIN_ENTRIES", 0):
+                forecast.aggregate_daily(payload)
+                started = time.perf_counter()
+                for _ in range(runs):
+                    forecast.aggregate_daily(payload)
+                elapsed = time.perf_counter() - started
+            results[f"{name}_{entries}_payloads_per_sec"] = runs / elapsed
+    return results
+
+
+def bench_icons(latency=0.05):
+    from icon_atlas import ICON_CODES, IconAtlas, build_atlas, load_icons
+
+    def load_all(app, root, icon_codes):
+        labels = [HeadlessWidget() for _ in icon_codes]
+        started = time.perf_counter()
+        for icon_code, label in zip(icon_codes, labels):
+            app.load_weather_icon(icon_code, label)
+        root.pump(until=lambda: all(label.options.get("image") for label in labels))
+        return (time.perf_counter() - started) * 1000
+
+    with headless_app(latency=latency) as (app, root, server):
+        icon_codes = [code for code in ICON_CODES if app.icon_cache.get_bytes(code) is None][:6]
+        cold_ms = load_all(app, root, icon_codes)
+
+        # Drop the decoded images, keep the bytes on disk
+        app.icon_cache._images.clear()
+        warm_disk_ms = load_all(app, root, icon_codes)
+        warm_memory_ms = load_all(app, root, icon_codes)
+
+        # Same icons from a pre-decoded atlas: first draw, then drawn again
+        with tempfile.TemporaryDirectory() as atlas_dir:
+            atlas_path = os.path.join(atlas_dir, "icons.atlas")
+            build_atlas(load_icons(server.base_url + "/img/wn"), atlas_path)
+            # The real app has customtkinter loaded long before the first icon
+            import customtkinter
+            started = time.perf_counter()
+            app.icon_atlas = IconAtlas(atlas_path)
+            atlas_open_ms = (time.perf_counter() - started) * 1000
+            atlas_first_ms = load_all(app, root, icon_codes)
+            atlas_warm_ms = load_all(app, root, icon_codes)
+            app.icon_atlas.close()
+            app.icon_atlas = None
+    return {
+        "icons": len(icon_codes),
+        "cold_ms": cold_ms,
+        "warm_disk_ms": warm_disk_ms,
+        "warm_memory_ms": warm_memory_ms,
+        "atlas_open_ms": atlas_open_ms,
+        "atlas_first_ms": atlas_first_ms,
+        "atlas_warm_ms": atlas_warm_ms,
+        "upstream_latency_ms": latency * 1000,
+    }
+
+
+def bench_switching(switches=200, latency=0.02):
+    with headless_app(latency=latency) as (app, root, server):
+        threads_before = threading.active_count()
+        max_threads = threads_before
+        tracemalloc.start()
+        started = time.perf_counter()
+        for i in range(switches):
+            app.select_city(app.popular_cities[i % len(app.popular_cities)])
+            root.pump(until=lambda: True)
+            max_threads = max(max_threads, threading.active_count())
+        last_city = app.popular_cities[(switches - 1) % len(app.popular_cities)]
+        root.pump(until=lambda: is_rendered(app, last_city))
+        elapsed = time.perf_counter() - started
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            "switches": switches,
+            "total_ms": elapsed * 1000,
+            "upstream_requests": server.stats.get("/data/2.5/weather", 0),
+            "peak_memory_kb": peak / 1024,
+            "memory_after_kb": current / 1024,
+            "threads_before": threads_before,
+            "threads_max": max_threads,
+            "threads_after": threading.active_count(),
+            "final_city": app.weather_data.name,
+        }
+
+
+def bench_model(cities=200, reads=100000):
+    from fake_server import current_weather, forecast as fake_forecast
+    from models import Observation, ForecastSeries
+
+    # Decoded the way requests does it, so nothing is shared between cities
+    payloads = [
+        (json.loads(json.dumps(current_weather(f"City {i}"))), json.loads(json.dumps(fake_forecast(f"City {i}", 40))))
+        for i in range(cities)
+    ]
+
+    def retained_kb(build):
+        tracemalloc.start()
+        kept = [build(weather, forecast) for weather, forecast in payloads]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del kept
+        return size / 1024
+
+    raw_kb = retained_kb(lambda weather, forecast: json.loads(json.dumps((weather, forecast))))
+    model_kb = retained_kb(lambda weather, forecast: (Observation.from_json(weather), ForecastSeries.from_json(forecast)))
+
+    weather = payloads[0][0]
+    observation = Observation.from_json(weather)
+    started = time.perf_counter()
+    for _ in range(reads):
+        weather.get("weather", [{}])[0].get("icon", "")
+    raw_read_ns = (time.perf_counter() - started) / reads * 1e9
+    started = time.perf_counter()
+    for _ in range(reads):
+        observation.icon
+    model_read_ns = (time.perf_counter() - started) / reads * 1e9
+    return {
+        "cities": cities,
+        "raw_kb_per_city": raw_kb / cities,
+        "model_kb_per_city": model_kb / cities,
+        "raw_read_ns": raw_read_ns,
+        "model_read_ns": model_read_ns,
+    }
+
+
+def bench_providers(rounds=3, latency=0.02):
+    def api_requests(server):
+        return sum(count for path, count in server.stats.items() if path.startswith(("/data/", "/geo/")))
+
+    results = {}
+    for provider in ("openweather", "onecall"):
+        with headless_app(latency=latency, provider=provider) as (app, root, server):
+            app.refresher.stop()
+            app.prefetcher.stop()
+            cities = app.popular_cities
+            # First round resolves anything the provider needs to look up once
+            for city in cities:
+                app.refresh_city(city)
+            before = api_requests(server)
+            bytes_before = server.stats.get("bytes_sent", 0)
+            not_modified_before = server.stats.get("not_modified", 0)
+            started = time.perf_counter()
+            for _ in range(rounds):
+                for city in cities:
+                    app.refresh_city(city)
+            elapsed = time.perf_counter() - started
+            refreshes = rounds * len(cities)
+            results[provider] = {
+                "requests_per_refresh": (api_requests(server) - before) / refreshes,
+                "bytes_per_refresh": (server.stats.get("bytes_sent", 0) - bytes_before) / refreshes,
+                "not_modified_share": (server.stats.get("not_modified", 0) - not_modified_before) / max(1, api_requests(server) - before),
+                "refresh_ms": elapsed / refreshes * 1000,
+            }
+    return results
+
+
+BENCHMARKS = {
+    "startup": bench_startup,
+    "search": bench_search,
+    "toggle": bench_toggle,
+    "forecast": bench_forecast,
+    "icons": bench_icons,
+    "switching": bench_switching,
+    "model": bench_model,
+    "providers": bench_providers,
+}
+
+
+def flatten(results, prefix=""):
+    values = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            values.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[name] = value
+    return values
+
+
+def compare(baseline, results):
+    old, new = flatten(baseline), flatten(results)
+    lines = []
+    for name in sorted(old.keys() & new.keys()):
+        if name.startswith("meta.") or old[name] == 0:
+            continue
+        change = (new[name] - old[name]) / abs(old[name]) * 100
+        lines.append(f"{name}: {old[name]:.3f} -> {new[name]:.3f} ({change:+.1f}%)")
+    return lines
+
+
+def run_metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR,
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {"commit": commit, "python": sys.version.split()[0], "timestamp": int(time.time())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Weather app benchmarks")
+    parser.add_argument("benchmarks", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--output", default="bench_output.json", help="where to write the JSON results")
+    parser.add_argument("--check", action="store_true", help="exit non-zero if a budget is exceeded")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    results = {"meta": run_metadata()}
+    for name in args.benchmarks or list(BENCHMARKS):
+        results[name] = BENCHMARKS[name]()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} ({baseline.get('meta', {}).get('commit')}):")
+        for line in compare(baseline, results):
+            print(f"  {line}")
+
+    over_budget = [
+        f"{bench}.{name}"
+        for bench, result in results.items()
+        for name, ok in result.get("within_budget", {}).items()
+        if not ok
+    ]
+    if args.check and over_budget:
+        print(f"Over budget: {', '.join(over_budget)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
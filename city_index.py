@@ -0,0 +1,214 @@
+"""Offline city index for autocomplete.
+
+    python city_index.py city.list.json.gz [-o cities.idx]
+
+Builds a compact binary index from OpenWeather's bulk city list
+(http://bulk.openweathermap.org/sample/city.list.json.gz). The app memory-maps
+the file, so lookups only touch the pages they need and nothing is parsed
+at startup.
+
+Layout (native byte order, checked on open):
+
+    header        magic, version, byte-order mark, city count
+    key offsets   uint32 x (count + 1) into the key blob
+    records       (id, name offset, name length, country, state) per city
+    key blob      folded names, sorted, UTF-8
+    name blob     display names, UTF-8
+
+Records are in key order, so a prefix search is a binary search over the
+key offsets followed by a short forward scan.
+"""
+import argparse
+import gzip
+import json
+import mmap
+import os
+import struct
+import unicodedata
+from bisect import bisect_left
+
+MAGIC = b"WCIX"
+VERSION = 1
+BYTE_ORDER_MARK = 0x01020304
+HEADER = struct.Struct("=4sIII")
+RECORD = struct.Struct("=IIH2s2s")
+OFFSET = struct.Struct("=I")
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cities.idx")
+
+# Letters tried when looking for one-typo matches, on top of those in the query
+FUZZY_ALPHABET = "abcdefghijklmnopqrstuvwxyz -'"
+
+
+def fold(name):
+    # Case- and accent-insensitive: "São Paulo" and "sao paulo" share a key
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).split())
+
+
+class City:
+    __slots__ = ("id", "name", "country", "state")
+
+    def __init__(self, id, name, country="", state=""):
+        self.id = id
+        self.name = name
+        self.country = country
+        self.state = state
+
+    @property
+    def label(self):
+        # "Paris, FR" / "Paris, US, TX" so same-named cities can be told apart
+        return ", ".join(part for part in (self.name, self.country, self.state) if part)
+
+    def __eq__(self, other):
+        return isinstance(other, City) and self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"City({self.id}, {self.label!r})"
+
+
+def load_city_list(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_index(cities, path):
+    """Write an index for ``cities`` (dicts in OpenWeather's city.list.json format)."""
+    entries = []
+    for city in cities:
+        name = city.get("name", "").strip()
+        key = fold(name)
+        if not key:
+            continue
+        entries.append((
+            key.encode("utf-8"), name.encode("utf-8"), int(city["id"]),
+            city.get("country", "").encode("ascii", "ignore")[:2],
+            city.get("state", "").encode("ascii", "ignore")[:2],
+        ))
+    entries.sort(key=lambda entry: (entry[0], entry[3], entry[4], entry[2]))
+
+    key_offsets, records, keys, names = [0], [], bytearray(), bytearray()
+    for key, name, city_id, country, state in entries:
+        records.append(RECORD.pack(city_id, len(names), len(name), country, state))
+        keys += key
+        names += name
+        key_offsets.append(len(keys))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDER_MARK, len(entries)))
+        f.write(b"".join(OFFSET.pack(offset) for offset in key_offsets))
+        f.write(b"".join(records))
+        f.write(keys)
+        f.write(names)
+    os.replace(tmp_path, path)
+    return len(entries)
+
+
+class CityIndex:
+    """Read-only, memory-mapped view of an index written by ``build_index``."""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, byte_order, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION or byte_order != BYTE_ORDER_MARK:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a city index this version can read, rebuild it")
+
+        self._count = count
+        offsets_start = HEADER.size
+        self._records_start = offsets_start + OFFSET.size * (count + 1)
+        self._keys_start = self._records_start + RECORD.size * count
+        self._offsets = memoryview(self._mmap)[offsets_start:self._records_start].cast("I")
+        self._names_start = self._keys_start + self._offsets[count]
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        self._offsets.release()
+        self._mmap.close()
+
+    def search(self, text, limit=8):
+        """Cities whose name starts with ``text``, or one typo away if none do."""
+        return self.prefix(text, limit) or self.fuzzy(text, limit)
+
+    def prefix(self, text, limit=8):
+        key = fold(text).encode("utf-8")
+        if not key:
+            return []
+        return [self._city(i) for i in self._prefix_range(key, self._lower_bound(key), limit)]
+
+    def fuzzy(self, text, limit=8):
+        """Cities one typo (insert, delete, substitute, swap) from a prefix of ``text``."""
+        query = fold(text)
+        if len(query) < 3:
+            return []
+        letters = sorted(set(FUZZY_ALPHABET) | set(query))
+
+        found = {}
+        lo, hi = 0, self._count
+        for position in range(len(query) + 1):
+            # Variants edited here all start with the untouched head, so
+            # they are searched only among keys that share it
+            head, tail = query[:position], query[position:]
+            if head:
+                head_key = head.encode("utf-8")
+                lo = self._lower_bound(head_key, lo, hi)
+                hi = self._lower_bound(head_key + b"\xff", lo, hi)
+                if lo >= hi:
+                    break
+            variants = {head + c + tail for c in letters}
+            if tail:
+                variants.add(head + tail[1:])
+                variants |= {head + c + tail[1:] for c in letters}
+            if len(tail) > 1:
+                variants.add(head + tail[1] + tail[0] + tail[2:])
+            variants.discard(query)
+            for variant in variants:
+                key = variant.encode("utf-8")
+                for i in self._prefix_range(key, self._lower_bound(key, lo, hi), limit):
+                    found[i] = found.get(i, False) or self._key(i) == key
+
+        # Whole-name matches first, then alphabetical
+        ranked = sorted(found, key=lambda i: (not found[i], i))
+        return [self._city(i) for i in ranked[:limit]]
+
+    def _prefix_range(self, prefix, start, limit):
+        i = start
+        while i < self._count and i - start < limit and self._key(i).startswith(prefix):
+            yield i
+            i += 1
+
+    def _lower_bound(self, key, lo=0, hi=None):
+        return bisect_left(range(self._count), key, lo, self._count if hi is None else hi, key=self._key)
+
+    def _key(self, i):
+        return self._mmap[self._keys_start + self._offsets[i]:self._keys_start + self._offsets[i + 1]]
+
+    def _city(self, i):
+        city_id, name_offset, name_length, country, state = RECORD.unpack_from(
+            self._mmap, self._records_start + i * RECORD.size
+        )
+        start = self._names_start + name_offset
+        name = self._mmap[start:start + name_length].decode("utf-8")
+        return City(city_id, name, country.rstrip(b"\0").decode("ascii"), state.rstrip(b"\0").decode("ascii"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the offline city index")
+    parser.add_argument("city_list", help="OpenWeather city.list.json(.gz)")
+    parser.add_argument("-o", "--output", default=DEFAULT_INDEX_PATH)
+    args = parser.parse_args(argv)
+
+    count = build_index(load_city_list(args.city_list), args.output)
+    print(f"Indexed {count} cities into {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+from threading import Thread
+
+from lazy_import import lazy_module
+from resilience import CircuitOpenError
+from response_cache import normalize_city
+
+ctk = lazy_module("customtkinter")
+requests = lazy_module("requests")
+
+
+class CityTile:
+    def __init__(self, parent, city):
+        self.city = city
+        self.frame = ctk.CTkFrame(parent)
+
+        self.name_label = ctk.CTkLabel(self.frame, text=city, font=("Arial", 14, "bold"))
+        self.name_label.pack(pady=(5, 0))
+
+        self.icon_label = ctk.CTkLabel(self.frame, text="")
+        self.icon_label.pack()
+
+        self.temp_label = ctk.CTkLabel(self.frame, text="--", font=("Arial", 20))
+        self.temp_label.pack()
+
+        self.desc_label = ctk.CTkLabel(self.frame, text="", font=("Arial", 10))
+        self.desc_label.pack(pady=(0, 5))
+
+
+class Dashboard:
+    """Grid of compact city tiles, refreshed through the app's provider.
+
+    OpenWeather batches them into /group calls; providers without a batch
+    endpoint fetch them one city at a time.
+    """
+
+    def __init__(self, app, cities=None, columns=5):
+        self.app = app
+        self.cities = list(cities or app.popular_cities)
+
+        self.closed = False
+        self.window = ctk.CTkToplevel(app.root)
+        self.window.title("Weather Dashboard")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.window.bind("<Destroy>", self._on_destroy)
+
+        self.grid_frame = ctk.CTkFrame(self.window)
+        self.grid_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.tiles = []
+        for i, city in enumerate(self.cities):
+            tile = CityTile(self.grid_frame, city)
+            tile.frame.grid(row=i // columns, column=i % columns, padx=5, pady=5, sticky="nsew")
+            self.tiles.append(tile)
+
+        self.bottom_frame = ctk.CTkFrame(self.window, fg_color="transparent")
+        self.bottom_frame.pack(fill="x", padx=10, pady=(0, 10))
+
+        self.status_label = ctk.CTkLabel(self.bottom_frame, text="")
+        self.status_label.pack(side="left")
+
+        self.refresh_button = ctk.CTkButton(self.bottom_frame, text="Refresh", width=80, command=self.refresh)
+        self.refresh_button.pack(side="right")
+
+        self.refresh()
+
+    def close(self):
+        # Refreshes and icon loads still in flight find the dashboard closed
+        self.closed = True
+        for tile in self.tiles:
+            for label in (tile.icon_label, tile.temp_label, tile.desc_label):
+                self.app.renderer.forget(label)
+        self.app.renderer.forget(self.status_label)
+        self.window.destroy()
+
+    def _on_destroy(self, event):
+        # <Destroy> also fires for every child; only the window itself matters
+        if event.widget is self.window and not self.closed:
+            self.close()
+
+    def refresh(self):
+        cities = self.city_pairs()
+        self.app.renderer.set(self.status_label, text=f"Refreshing {len(cities)} cities...")
+        Thread(target=self._refresh_thread, args=(cities,), daemon=True).start()
+
+    def city_pairs(self):
+        return [(city, self.app.city_ids.get(normalize_city(city))) for city in self.cities]
+
+    def _refresh_thread(self, cities):
+        try:
+            by_city = self.app.provider.fetch_current(cities)
+        except (CircuitOpenError, requests.exceptions.RequestException) as e:
+            by_city = self.saved_observations()
+            status = f"Error: {str(e)}"
+            if by_city:
+                status = f"Weather service unavailable, showing saved data for {len(by_city)} cities"
+            self.app.root.after(0, lambda: self.render(by_city, status))
+            return
+
+        for city, observation in by_city.items():
+            self.app.record_observation(city, "weather", observation)
+
+        self.app.root.after(0, lambda: self.render(by_city))
+
+    def saved_observations(self):
+        by_city = {}
+        for city in self.cities:
+            observation = self.app.last_good(city, "weather")
+            if observation is not None:
+                by_city[city] = observation
+        return by_city
+
+    def render(self, by_city, status=None):
+        if self.closed:
+            return
+        renderer = self.app.renderer
+        for tile in self.tiles:
+            observation = by_city.get(tile.city)
+            if observation is None:
+                renderer.set(tile.temp_label, text="--")
+                renderer.set(tile.desc_label, text="No data")
+                continue
+
+            temp_c = observation.temp
+            if self.app.temp_unit == "celsius":
+                renderer.set(tile.temp_label, text=f"{temp_c:.0f}°C")
+            else:
+                renderer.set(tile.temp_label, text=f"{self.app.convert_temperature(temp_c, 'fahrenheit'):.0f}°F")
+
+            renderer.set(tile.desc_label, text=observation.description.capitalize())
+            self.app.load_weather_icon(observation.icon, tile.icon_label)
+
+        renderer.set(self.status_label, text=status or f"Updated {len(by_city)} of {len(self.tiles)} cities")
@@ -0,0 +1,349 @@
+"""Local stand-in for the OpenWeather API, for offline testing and benchmarks.
+
+    python fake_server.py --port 8000 --latency 0.3 --jitter 0.1 --rate-429 0.05
+
+Then point the app at it with ``OPENWEATHER_BASE_URL=http://127.0.0.1:8000``.
+Serves ``/data/2.5/weather``, ``/data/2.5/forecast``, ``/data/2.5/group``,
+``/data/3.0/onecall``, ``/geo/1.0/direct`` and ``/img/wn/<code>@2x.png`` with
+configurable latency, jitter, error rates and payload sizes.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from providers import CITY_IDS
+from icon_atlas import ICON_CODES
+
+CITY_NAMES = {city_id: name for name, city_id in CITY_IDS.items()}
+CONDITIONS = {
+    "01": (800, "Clear", "clear sky"),
+    "02": (801, "Clouds", "few clouds"),
+    "03": (802, "Clouds", "scattered clouds"),
+    "04": (804, "Clouds", "overcast clouds"),
+    "09": (521, "Rain", "shower rain"),
+    "10": (500, "Rain", "light rain"),
+    "11": (211, "Thunderstorm", "thunderstorm"),
+    "13": (600, "Snow", "light snow"),
+    "50": (741, "Fog", "fog"),
+}
+
+
+class StandInConfig:
+    def __init__(self, latency=0.0, jitter=0.0, rate_404=0.0, rate_429=0.0, rate_5xx=0.0,
+                 forecast_entries=40, padding=0, retry_after=1, unknown_cities=(), seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_404 = rate_404
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.forecast_entries = forecast_entries
+        self.padding = padding
+        self.retry_after = retry_after
+        self.unknown_cities = {city.casefold() for city in unknown_cities}
+        self.random = random.Random(seed)
+
+
+def city_seed(name):
+    return int(hashlib.sha256(name.casefold().encode("utf-8")).hexdigest()[:8], 16)
+
+
+def city_id_for(name):
+    return CITY_IDS.get(name, city_seed(name) % 9000000 + 1000000)
+
+
+def weather_condition(rng, night=False):
+    code = rng.choice(list(CONDITIONS))
+    condition_id, main, description = CONDITIONS[code]
+    icon = code + ("n" if night else "d")
+    return {"id": condition_id, "main": main, "description": description, "icon": icon}
+
+
+def current_weather(name, city_id=None, now=None):
+    now = int(time.time() if now is None else now)
+    rng = random.Random(city_seed(name) + now // 600)
+    temp = round(rng.uniform(-5, 32), 2)
+    return {
+        "coord": {"lon": round(rng.uniform(-180, 180), 4), "lat": round(rng.uniform(-60, 70), 4)},
+        "weather": [weather_condition(rng)],
+        "main": {
+            "temp": temp,
+            "feels_like": round(temp - rng.uniform(0, 3), 2),
+            "temp_min": round(temp - rng.uniform(0, 2), 2),
+            "temp_max": round(temp + rng.uniform(0, 2), 2),
+            "pressure": rng.randint(990, 1035),
+            "humidity": rng.randint(20, 100),
+        },
+        "wind": {"speed": round(rng.uniform(0, 12), 2), "deg": rng.randint(0, 359)},
+        "dt": now,
+        "sys": {"country": "XX"},
+        "timezone": 0,
+        "id": city_id or city_id_for(name),
+        "name": name,
+        "cod": 200,
+    }
+
+
+def forecast(name, entries=40, now=None):
+    now = int(time.time() if now is None else now)
+    start = now - now % 10800 + 10800
+    rng = random.Random(city_seed(name) + now // 3600)
+    base = rng.uniform(-5, 30)
+    items = []
+    for i in range(entries):
+        dt = start + i * 10800
+        hour = dt % 86400 // 3600
+        temp = round(base + 6 * (1 - abs(hour - 15) / 12) + rng.uniform(-1.5, 1.5), 2)
+        entry = {
+            "dt": dt,
+            "main": {
+                "temp": temp,
+                "temp_min": round(temp - rng.uniform(0, 1), 2),
+                "temp_max": round(temp + rng.uniform(0, 1), 2),
+                "pressure": rng.randint(990, 1035),
+                "humidity": rng.randint(20, 100),
+            },
+            "weather": [weather_condition(rng, night=hour < 6 or hour >= 21)],
+            "wind": {"speed": round(rng.uniform(0, 12), 2), "deg": rng.randint(0, 359)},
+            "dt_txt": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(dt)),
+        }
+        if entry["weather"][0]["main"] in ("Rain", "Thunderstorm"):
+            entry["rain"] = {"3h": round(rng.uniform(0.1, 5), 2)}
+        items.append(entry)
+    return {
+        "cod": "200",
+        "cnt": entries,
+        "list": items,
+        "city": {"id": city_id_for(name), "name": name, "country": "XX", "timezone": 0},
+    }
+
+
+def location(name):
+    rng = random.Random(city_seed(name))
+    return {"name": name, "lat": round(rng.uniform(-60, 70), 4), "lon": round(rng.uniform(-180, 180), 4), "country": "XX"}
+
+
+def one_call(lat, lon, days=8, now=None):
+    now = int(time.time() if now is None else now)
+    name = f"{lat},{lon}"
+    current = current_weather(name, now=now)
+    rng = random.Random(city_seed(name) + now // 3600)
+    base = rng.uniform(-5, 30)
+    daily = []
+    for i in range(days):
+        temp_min = round(base + rng.uniform(-4, 0), 2)
+        temp_max = round(base + rng.uniform(0, 8), 2)
+        day = {
+            "dt": now - now % 86400 + i * 86400 + 43200,
+            "temp": {"day": round((temp_min + temp_max) / 2, 2), "min": temp_min, "max": temp_max},
+            "humidity": rng.randint(20, 100),
+            "weather": [weather_condition(rng)],
+        }
+        if day["weather"][0]["main"] in ("Rain", "Thunderstorm"):
+            day["rain"] = round(rng.uniform(0.5, 20), 2)
+        daily.append(day)
+    return {
+        "lat": lat,
+        "lon": lon,
+        "timezone": "UTC",
+        "timezone_offset": 0,
+        "current": {
+            "dt": now,
+            "temp": current["main"]["temp"],
+            "feels_like": current["main"]["feels_like"],
+            "pressure": current["main"]["pressure"],
+            "humidity": current["main"]["humidity"],
+            "wind_speed": current["wind"]["speed"],
+            "weather": current["weather"],
+        },
+        "daily": daily,
+    }
+
+
+def icon_png(icon_code, size=100):
+    # Solid-colour PNG built by hand so the stand-in doesn't need PIL
+    seed = city_seed(icon_code)
+    color = bytes([seed & 0xFF, (seed >> 8) & 0xFF, (seed >> 16) & 0xFF, 255])
+    raw = b"".join(b"\x00" + color * size for _ in range(size))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 6, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; with Nagle on, the body
+    # waits for the client's delayed ACK (~40 ms on Linux)
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        config = self.server.config
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self.server.count(url.path)
+
+        delay = config.latency + config.random.uniform(-config.jitter, config.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        roll = config.random.random()
+        if roll < config.rate_429:
+            return self.send_json(429, {"cod": 429, "message": "Too many requests"},
+                                  {"Retry-After": str(config.retry_after)})
+        if roll < config.rate_429 + config.rate_5xx:
+            status = config.random.choice([500, 502, 503])
+            return self.send_json(status, {"cod": status, "message": "Upstream error"})
+
+        if url.path.startswith("/img/wn/"):
+            icon_code, _, scale = url.path.rsplit("/", 1)[-1].replace(".png", "").partition("@")
+            if icon_code not in ICON_CODES:
+                return self.send_json(404, {"cod": "404", "message": "icon not found"})
+            size = 200 if scale == "4x" else 100
+            return self.send_body(200, icon_png(icon_code, size), "image/png")
+
+        if url.path == "/data/2.5/group":
+            ids = [int(city_id) for city_id in query.get("id", "").split(",") if city_id.strip().isdigit()]
+            if len(ids) > 20:
+                return self.send_json(400, {"cod": "400", "message": "too many ids"})
+            items = [current_weather(CITY_NAMES.get(city_id, f"City {city_id}"), city_id) for city_id in ids]
+            return self.send_json(200, {"cnt": len(items), "list": items})
+
+        if url.path == "/geo/1.0/direct":
+            city = query.get("q", "")
+            if not city or city.casefold() in config.unknown_cities:
+                return self.send_json(200, [])
+            return self.send_json(200, [location(city)])
+
+        if url.path == "/data/3.0/onecall":
+            try:
+                lat, lon = float(query["lat"]), float(query["lon"])
+            except (KeyError, ValueError):
+                return self.send_json(400, {"cod": "400", "message": "wrong latitude or longitude"})
+            return self.send_json(200, one_call(lat, lon))
+
+        if url.path in ("/data/2.5/weather", "/data/2.5/forecast"):
+            city = query.get("q", "")
+            if not city and "id" in query:
+                city = CITY_NAMES.get(int(query["id"]), f"City {query['id']}")
+            if not city or city.casefold() in config.unknown_cities or roll < config.rate_429 + config.rate_5xx + config.rate_404:
+                return self.send_json(404, {"cod": "404", "message": "city not found"})
+            if url.path.endswith("/weather"):
+                return self.send_json(200, current_weather(city))
+            return self.send_json(200, forecast(city, config.forecast_entries))
+
+        self.send_json(404, {"cod": "404", "message": "not found"})
+
+    def send_json(self, status, payload, headers=None):
+        if self.server.config.padding and status == 200 and isinstance(payload, dict):
+            payload = dict(payload, padding="x" * self.server.config.padding)
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        if status == 200:
+            # Same payload, same ETag: a revalidating client gets an empty 304
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+            headers = dict(headers or {}, ETag=etag)
+            if self.headers.get("If-None-Match") == etag:
+                self.server.count("not_modified")
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                return self.end_headers()
+        self.send_body(status, body, "application/json; charset=utf-8", headers)
+
+    def send_body(self, status, body, content_type, headers=None):
+        if "gzip" in self.headers.get("Accept-Encoding", "") and content_type.startswith("application/json"):
+            body = gzip.compress(body)
+            headers = dict(headers or {}, **{"Content-Encoding": "gzip"})
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count("bytes_sent", len(body))
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config=None, verbose=False):
+        super().__init__(address, StandInHandler)
+        self.config = config or StandInConfig()
+        self.verbose = verbose
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+
+
+def start_server(host="127.0.0.1", port=0, **config):
+    """Start a stand-in server on a background thread; call ``shutdown()`` when done."""
+    server = StandInServer((host, port), StandInConfig(**config))
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local OpenWeather stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="base delay per request in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random +/- delay in seconds")
+    parser.add_argument("--rate-404", type=float, default=0.0, help="share of city lookups answered with 404")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="share of requests answered with 5xx")
+    parser.add_argument("--forecast-entries", type=int, default=40, help="3-hour entries per forecast")
+    parser.add_argument("--padding", type=int, default=0, help="extra bytes added to every JSON payload")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    config = StandInConfig(
+        latency=args.latency, jitter=args.jitter, rate_404=args.rate_404,
+        rate_429=args.rate_429, rate_5xx=args.rate_5xx,
+        forecast_entries=args.forecast_entries, padding=args.padding,
+        retry_after=args.retry_after, seed=args.seed,
+    )
+    server = StandInServer((args.host, args.port), config, verbose=args.verbose)
+    print(f"OpenWeather stand-in listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import importlib.util
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from lazy_import import lazy_module
+from models import ForecastSeries
+
+# NumPy is optional and only imported the first time a large forecast is aggregated
+np = lazy_module("numpy") if importlib.util.find_spec("numpy") else None
+
+SECONDS_PER_DAY = 86400
+
+# Below this many entries NumPy's per-call overhead outweighs what it saves;
+# the two break even at about 200 (python benchmark.py forecast). A 5 day /
+# 3 hour payload has 40, so the app itself stays on plain Python.
+NUMPY_MIN_ENTRIES = 200
+
+
+def aggregate_daily(forecast, days=3, skip_today=True, now=None):
+    """Collapse a forecast into per-day summaries.
+
+    ``forecast`` is a ``ForecastSeries`` (a raw /forecast payload is parsed
+    first). Days are split on the city's local midnight using its timezone
+    offset. Each day gets min/max/mean temperature, total precipitation
+    (rain + snow, mm) and its dominant condition.
+    """
+    if not isinstance(forecast, ForecastSeries):
+        forecast = ForecastSeries.from_json(forecast)
+    if not len(forecast):
+        return []
+
+    tz_offset = forecast.timezone
+    today = int((time.time() if now is None else now) + tz_offset) // SECONDS_PER_DAY
+
+    if np is not None and len(forecast) >= NUMPY_MIN_ENTRIES:
+        stats = _day_stats_numpy(forecast, tz_offset)
+    else:
+        stats = _day_stats_python(forecast, tz_offset)
+
+    daily = []
+    for day, start, end, temp_min, temp_max, temp_mean, precipitation in stats:
+        if skip_today and day == today:
+            continue
+        icon, description = _dominant_condition([forecast.conditions[code] for code in forecast.condition[start:end]])
+        date = datetime.fromtimestamp(day * SECONDS_PER_DAY, tz=timezone.utc)
+        daily.append({
+            "date": date.strftime("%Y-%m-%d"),
+            "day": date.strftime("%A"),
+            "temp_min": temp_min,
+            "temp_max": temp_max,
+            "temp_mean": temp_mean,
+            "precipitation": precipitation,
+            "icon": icon,
+            "description": description,
+        })
+        if len(daily) >= days:
+            break
+    return daily
+
+
+def _day_stats_numpy(forecast, tz_offset):
+    # The series is already sorted, and its arrays are wrapped without copying
+    dt = np.frombuffer(forecast.dt, dtype=np.int64)
+    day_index = (dt + tz_offset) // SECONDS_PER_DAY
+    days, starts, counts = np.unique(day_index, return_index=True, return_counts=True)
+    temp = np.frombuffer(forecast.temp, dtype=np.float64)
+    temp_min = np.minimum.reduceat(np.frombuffer(forecast.temp_min, dtype=np.float64), starts)
+    temp_max = np.maximum.reduceat(np.frombuffer(forecast.temp_max, dtype=np.float64), starts)
+    temp_mean = np.add.reduceat(temp, starts) / counts
+    precipitation = np.add.reduceat(np.frombuffer(forecast.precipitation, dtype=np.float64), starts)
+
+    return [
+        (int(days[i]), int(starts[i]), int(starts[i] + counts[i]),
+         float(temp_min[i]), float(temp_max[i]), float(temp_mean[i]), float(precipitation[i]))
+        for i in range(len(days))
+    ]
+
+
+def _day_stats_python(forecast, tz_offset):
+    stats = []
+    start = 0
+    day_index = [(dt + tz_offset) // SECONDS_PER_DAY for dt in forecast.dt]
+    for end in range(1, len(day_index) + 1):
+        if end < len(day_index) and day_index[end] == day_index[start]:
+            continue
+        temps = forecast.temp[start:end]
+        stats.append((
+            day_index[start], start, end,
+            min(forecast.temp_min[start:end]),
+            max(forecast.temp_max[start:end]),
+            sum(temps) / len(temps),
+            sum(forecast.precipitation[start:end]),
+        ))
+        start = end
+    return stats
+
+
+def _dominant_condition(conditions):
+    # Most frequent condition of the day, shown with its daytime icon
+    descriptions = [description for _, description in conditions]
+    description, _ = Counter(descriptions).most_common(1)[0]
+    icon = conditions[descriptions.index(description)][0]
+    if icon.endswith("n"):
+        icon = icon[:-1] + "d"
+    return icon, description
@@ -0,0 +1,231 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from lazy_import import lazy_module
+from resilience import CircuitBreaker, RetryPolicy, TokenBucket, parse_retry_after
+
+requests = lazy_module("requests")
+
+API_BASE_URL = "https://api.openweathermap.org/data/2.5"
+ICON_BASE_URL = "http://openweathermap.org/img/wn"
+
+# Max city IDs the /group endpoint accepts per call
+GROUP_LIMIT = 20
+
+# Responses kept for revalidation with If-None-Match / If-Modified-Since
+MAX_VALIDATED_RESPONSES = 128
+
+
+class WeatherClient:
+    """Shared HTTP client for the OpenWeather API.
+
+    All threads share one keep-alive connection pool (a single ``HTTPAdapter``,
+    whose urllib3 pool manager is thread-safe). Each thread gets its own
+    ``requests.Session`` mounted on that adapter, since sessions themselves
+    aren't guaranteed to be thread-safe.
+
+    With ``metrics`` set, every request records ``http_wait`` (send until the
+    response headers arrive) and ``http_body`` (reading the body), and every
+    new connection records ``http_connect`` (DNS + TCP) and ``http_tls``.
+
+    API calls (not icons, which don't count against the quota) go through a
+    token bucket shared by every thread using this client, so one client per
+    API key keeps that key inside its budget. 429s, 5xx and connection errors
+    are retried with backoff; repeated failures open a circuit breaker, after
+    which ``get`` raises ``CircuitOpenError`` until the upstream recovers.
+
+    Responses that carry an ``ETag`` or ``Last-Modified`` header are kept
+    (the last ``MAX_VALIDATED_RESPONSES`` of them) and the next request for
+    the same URL and parameters is sent with ``If-None-Match`` /
+    ``If-Modified-Since``. A ``304 Not Modified`` then returns the kept
+    response, so an unchanged body is never downloaded twice.
+    """
+
+    def __init__(self, api_key, base_url=API_BASE_URL, icon_base_url=ICON_BASE_URL,
+                 pool_connections=4, pool_maxsize=10, timeout=10, metrics=None,
+                 limiter=None, retry=None, breaker=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.icon_base_url = icon_base_url.rstrip("/")
+        self.timeout = timeout
+        self.metrics = metrics
+        self.limiter = limiter or TokenBucket()
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        if metrics is not None:
+            self.adapter.poolmanager.pool_classes_by_scheme = timed_pool_classes(metrics)
+        self._validated = OrderedDict()
+        self._validated_lock = threading.Lock()
+        self.not_modified = 0
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=pool_maxsize, thread_name_prefix="weather-http")
+
+    @classmethod
+    def from_base_url(cls, api_key, base_url=None, **kwargs):
+        # base_url is the server root, e.g. a local stand-in at http://127.0.0.1:8000
+        if not base_url:
+            return cls(api_key, **kwargs)
+        base_url = base_url.rstrip("/")
+        return cls(api_key, f"{base_url}/data/2.5", f"{base_url}/img/wn", **kwargs)
+
+    @property
+    def session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", self.adapter)
+            session.mount("http://", self.adapter)
+            session.headers.update({"Accept-Encoding": "gzip, deflate"})
+            self._local.session = session
+        return session
+
+    def get(self, endpoint, params):
+        params = dict(params, appid=self.api_key, units="metric")
+        # Endpoints outside /data/2.5 (One Call, geocoding) are passed as full URLs
+        url = endpoint if "://" in endpoint else f"{self.base_url}/{endpoint}"
+        key = (url, tuple(sorted((name, str(value)) for name, value in params.items())))
+        self.breaker.before_call()
+
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                response = self._get(url, params=params, **self._conditional_kwargs(key))
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                delay = self.retry.delay(attempt)
+                if delay is None:
+                    self.breaker.record_failure()
+                    raise
+            except Exception:
+                # Not retried (dropped body, bad encoding, redirect loop), but still a
+                # failure: a half-open breaker must not be left waiting on it
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in self.retry.statuses:
+                    self.breaker.record_success()
+                    return self._revalidated(key, response)
+                delay = self.retry.delay(attempt, response)
+                if response.status_code == 429:
+                    # The whole key is throttled, hold every thread back, but never for
+                    # longer than a fetch would wait before falling back to cache
+                    retry_after = parse_retry_after(response.headers.get("Retry-After")) or self.retry.base_delay
+                    self.limiter.pause(min(retry_after, self.retry.max_retry_after))
+                if delay is None:
+                    self.breaker.record_failure()
+                    return response
+            self.retry.sleep(delay)
+            attempt += 1
+
+    def _conditional_kwargs(self, key):
+        with self._validated_lock:
+            cached = self._validated.get(key)
+        if cached is None:
+            return {}
+        headers = {}
+        if "ETag" in cached.headers:
+            headers["If-None-Match"] = cached.headers["ETag"]
+        if "Last-Modified" in cached.headers:
+            headers["If-Modified-Since"] = cached.headers["Last-Modified"]
+        return {"headers": headers}
+
+    def _revalidated(self, key, response):
+        with self._validated_lock:
+            if response.status_code == 304:
+                cached = self._validated.get(key)
+                if cached is not None:
+                    self._validated.move_to_end(key)
+                    self.not_modified += 1
+                    return cached
+                return response
+            if response.status_code == 200 and ("ETag" in response.headers or "Last-Modified" in response.headers):
+                self._validated[key] = response
+                self._validated.move_to_end(key)
+                while len(self._validated) > MAX_VALIDATED_RESPONSES:
+                    self._validated.popitem(last=False)
+            elif response.status_code == 404:
+                self._validated.pop(key, None)
+        return response
+
+    def get_icon(self, icon_code):
+        response = self._get(f"{self.icon_base_url}/{icon_code}@2x.png")
+        response.raise_for_status()
+        return response.content
+
+    def _get(self, url, **kwargs):
+        started = time.perf_counter()
+        response = self.session.get(url, timeout=self.timeout, **kwargs)
+        if self.metrics is not None:
+            # requests stops its clock at the headers, the body is read after
+            wait = response.elapsed.total_seconds()
+            self.metrics.observe("http_wait", wait)
+            self.metrics.observe("http_body", max(0.0, time.perf_counter() - started - wait))
+        return response
+
+    def fetch_current_and_forecast(self, city, city_id=None):
+        # Both calls go out together, so time-to-data is one round trip, not two.
+        # An ID is exact, a name has to be resolved (and can be ambiguous).
+        params = {"id": city_id} if city_id is not None else {"q": city}
+        weather_future = self._executor.submit(self.get, "weather", params)
+        forecast_future = self._executor.submit(self.get, "forecast", params)
+        # If one fails, the other (and its retries) is still waited for, so nothing
+        # keeps running after the caller has moved on to showing the error
+        wait([weather_future, forecast_future])
+        return weather_future.result(), forecast_future.result()
+
+    def fetch_group(self, city_ids, max_concurrency=2):
+        # One /group call per 20 cities, with only a few chunks in flight at once
+        city_ids = list(city_ids)
+        chunks = [city_ids[i:i + GROUP_LIMIT] for i in range(0, len(city_ids), GROUP_LIMIT)]
+        semaphore = threading.BoundedSemaphore(max_concurrency)
+
+        def fetch_chunk(chunk):
+            with semaphore:
+                response = self.get("group", {"id": ",".join(str(city_id) for city_id in chunk)})
+                response.raise_for_status()
+                return response.json().get("list", [])
+
+        futures = [self._executor.submit(fetch_chunk, chunk) for chunk in chunks]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.adapter.close()
+
+
+def timed_pool_classes(metrics):
+    """urllib3 pool classes whose new connections report connect and TLS time."""
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    def timed(connection_cls):
+        class TimedConnection(connection_cls):
+            def _new_conn(self):
+                started = time.perf_counter()
+                sock = super()._new_conn()
+                self._connect_seconds = time.perf_counter() - started
+                metrics.observe("http_connect", self._connect_seconds)
+                return sock
+
+            def connect(self):
+                started = time.perf_counter()
+                self._connect_seconds = 0.0
+                super().connect()
+                if isinstance(self, HTTPSConnection):
+                    metrics.observe("http_tls", time.perf_counter() - started - self._connect_seconds)
+
+        return TimedConnection
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = timed(HTTPConnection)
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = timed(HTTPSConnection)
+
+    return {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
@@ -0,0 +1,181 @@
+"""Bundled weather icons, pre-decoded, in one memory-mapped file.
+
+    python icon_atlas.py [--base-url URL | --source DIR] [-o icons.atlas]
+
+Downloads every OpenWeather icon code at 2x and 4x (or reads
+``<code>@2x.png``/``<code>@4x.png`` from a directory) and packs them as raw
+RGBA pixels, so the app draws icons without the network and without
+decoding PNGs. Point ``--base-url`` at the stand-in server to build a
+placeholder atlas offline.
+
+Layout (native byte order, checked on open):
+
+    header     magic, version, byte-order mark, variant count
+    entries    (icon code, width, height, offset) per variant
+    pixels     RGBA rows for every variant, back to back
+"""
+import argparse
+import io
+import mmap
+import os
+import struct
+
+from lazy_import import lazy_module
+
+ctk = lazy_module("customtkinter")
+Image = lazy_module("PIL.Image")
+
+MAGIC = b"WICA"
+VERSION = 1
+BYTE_ORDER_MARK = 0x01020304
+HEADER = struct.Struct("=4sIII")
+ENTRY = struct.Struct("=4sHHI")
+
+DEFAULT_ATLAS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons.atlas")
+
+ICON_CODES = [
+    f"{code}{time_of_day}"
+    for code in ["01", "02", "03", "04", "09", "10", "11", "13", "50"]
+    for time_of_day in "dn"
+]
+
+# Icons are laid out at 100x100 (what the @2x PNGs always gave us); the
+# 200 px variant is for displays scaled 1.5x and up
+ICON_SIZE = 100
+VARIANTS = {100: "2x", 200: "4x"}
+
+
+def build_atlas(images, path):
+    """Write ``images`` ({(icon_code, pixels): PIL image}) as an atlas."""
+    entries, pixels = [], bytearray()
+    for (icon_code, size), image in sorted(images.items()):
+        image = image.convert("RGBA")
+        if image.size != (size, size):
+            image = image.resize((size, size), Image.LANCZOS)
+        entries.append(ENTRY.pack(icon_code.encode("ascii"), size, size, len(pixels)))
+        pixels += image.tobytes()
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDER_MARK, len(entries)))
+        f.write(b"".join(entries))
+        f.write(pixels)
+    os.replace(tmp_path, path)
+    return len(entries)
+
+
+def load_icons(base_url=None, source=None):
+    images = {}
+    session = None
+    for icon_code in ICON_CODES:
+        for size, scale in VARIANTS.items():
+            if source:
+                with open(os.path.join(source, f"{icon_code}@{scale}.png"), "rb") as f:
+                    data = f.read()
+            else:
+                if session is None:
+                    import requests
+                    session = requests.Session()
+                response = session.get(f"{base_url.rstrip('/')}/{icon_code}@{scale}.png", timeout=10)
+                response.raise_for_status()
+                data = response.content
+            image = Image.open(io.BytesIO(data))
+            image.load()
+            images[(icon_code, size)] = image
+    return images
+
+
+class IconAtlas:
+    """Read-only view of an atlas written by ``build_atlas``.
+
+    The variant table is read when the atlas is opened; pixels stay in the
+    mapped file until an icon is first drawn, then each variant becomes a
+    PIL image sharing the mapped memory and each ``(code, size)`` gets one
+    ``CTkImage`` for the life of the app.
+    """
+
+    def __init__(self, path=DEFAULT_ATLAS_PATH):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, byte_order, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION or byte_order != BYTE_ORDER_MARK:
+            self._mmap.close()
+            raise ValueError(f"{path} is not an icon atlas this version can read, rebuild it")
+
+        pixels_start = HEADER.size + ENTRY.size * count
+        view = memoryview(self._mmap)
+        self._variants = {}
+        for i in range(count):
+            code, width, height, offset = ENTRY.unpack_from(self._mmap, HEADER.size + i * ENTRY.size)
+            start = pixels_start + offset
+            self._variants.setdefault(code.rstrip(b"\0").decode("ascii"), {})[width] = (
+                (width, height), view[start:start + width * height * 4]
+            )
+        self._images = {}
+        self._ctk_images = {}
+
+    def __contains__(self, icon_code):
+        return icon_code in self._variants
+
+    def __len__(self):
+        return len(self._variants)
+
+    def image(self, icon_code, pixels):
+        """The decoded ``pixels``-wide variant (nearest larger one if not bundled)."""
+        sizes = sorted(self._variants[icon_code])
+        pixels = next((size for size in sizes if size >= pixels), sizes[-1])
+        key = (icon_code, pixels)
+        image = self._images.get(key)
+        if image is None:
+            size, data = self._variants[icon_code][pixels]
+            image = Image.frombuffer("RGBA", size, data, "raw", "RGBA", 0, 1)
+            self._images[key] = image
+        return image
+
+    def ctk_image(self, icon_code, size=ICON_SIZE, widget=None):
+        # The variant that matches the widget's scaling, so CTk never resamples
+        pixels = round(size * widget_scaling(widget))
+        variant = self.image(icon_code, pixels)
+        key = (icon_code, size, variant.width)
+        image = self._ctk_images.get(key)
+        if image is None:
+            image = ctk.CTkImage(light_image=variant, size=(size, size))
+            self._ctk_images[key] = image
+        return image
+
+    def close(self):
+        self._images.clear()
+        self._ctk_images.clear()
+        self._variants.clear()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Icons still on screen share the mapped pixels; it's unmapped with them
+            pass
+
+
+def widget_scaling(widget):
+    if widget is None:
+        return 1.0
+    try:
+        return ctk.ScalingTracker.get_widget_scaling(widget)
+    except (AttributeError, KeyError):
+        # Not (yet) inside a CTk window
+        return 1.0
+
+
+def main(argv=None):
+    from http_client import ICON_BASE_URL
+
+    parser = argparse.ArgumentParser(description="Build the bundled icon atlas")
+    parser.add_argument("--base-url", default=ICON_BASE_URL, help="where to download <code>@2x.png / @4x.png from")
+    parser.add_argument("--source", help="directory with <code>@2x.png / @4x.png files instead of downloading")
+    parser.add_argument("-o", "--output", default=DEFAULT_ATLAS_PATH)
+    args = parser.parse_args(argv)
+
+    count = build_atlas(load_icons(args.base_url, args.source), args.output)
+    print(f"Packed {count} icon variants into {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, get_ident
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "weather-app")
+
+
+class IconCache:
+    """Two-tier cache for weather icons, keyed on the OpenWeather icon code.
+
+    Decoded images live in a bounded in-memory LRU. The raw PNG bytes live in
+    a content-addressed store on disk (blobs named by their SHA-256) so they
+    survive restarts; ``index.json`` maps icon codes to blob hashes.
+    """
+
+    def __init__(self, cache_dir=None, max_items=32):
+        self.cache_dir = os.path.join(cache_dir or DEFAULT_CACHE_DIR, "icons")
+        self.max_items = max_items
+        self._images = OrderedDict()
+        self._lock = Lock()
+        self._index_path = os.path.join(self.cache_dir, "index.json")
+        self._index = self._load_index()
+
+    # In-memory tier (decoded images)
+    def get_image(self, icon_code):
+        with self._lock:
+            image = self._images.get(icon_code)
+            if image is not None:
+                self._images.move_to_end(icon_code)
+            return image
+
+    def put_image(self, icon_code, image):
+        with self._lock:
+            self._images[icon_code] = image
+            self._images.move_to_end(icon_code)
+            while len(self._images) > self.max_items:
+                self._images.popitem(last=False)
+
+    # On-disk tier (raw PNG bytes)
+    def get_bytes(self, icon_code):
+        with self._lock:
+            digest = self._index.get(icon_code)
+        if not digest:
+            return None
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        # A blob that doesn't match its name is corrupt, treat it as a miss
+        if hashlib.sha256(data).hexdigest() != digest:
+            return None
+        return data
+
+    def put_bytes(self, icon_code, data):
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest)
+        try:
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                self._atomic_write(blob_path, data)
+            with self._lock:
+                self._index[icon_code] = digest
+                index_data = json.dumps(self._index, sort_keys=True).encode("utf-8")
+            self._atomic_write(self._index_path, index_data)
+        except OSError:
+            # Disk cache is best effort, memory tier still works
+            pass
+        return digest
+
+    def __len__(self):
+        with self._lock:
+            return len(self._images)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, "objects", digest[:2], digest + ".png")
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _atomic_write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class IconLoader:
+    """Loads icons on a worker pool so the Tk main thread never waits on the network.
+
+    ``fetch(icon_code)`` returns the PNG bytes and ``decode(data)`` turns them
+    into an image; both run on a worker thread. Callbacks receive
+    ``(image, error)`` on the worker thread too, so GUI code must hand the
+    result back to Tk itself (e.g. with ``root.after``). Concurrent requests
+    for the same icon code share a single download.
+    """
+
+    def __init__(self, cache, fetch, decode, max_workers=4):
+        self.cache = cache
+        self.fetch = fetch
+        self.decode = decode
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="icon-loader")
+        self._pending = {}
+        self._lock = Lock()
+
+    def load(self, icon_code, callback):
+        with self._lock:
+            if icon_code in self._pending:
+                self._pending[icon_code].append(callback)
+                return
+            self._pending[icon_code] = [callback]
+        self._executor.submit(self._load, icon_code)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _load(self, icon_code):
+        image, error = None, None
+        try:
+            data = self.cache.get_bytes(icon_code)
+            if data is None:
+                data = self.fetch(icon_code)
+                self.cache.put_bytes(icon_code, data)
+            image = self.decode(data)
+        except Exception as e:
+            error = e
+
+        with self._lock:
+            callbacks = self._pending.pop(icon_code, [])
+        for callback in callbacks:
+            callback(image, error)
@@ -0,0 +1,47 @@
+import importlib
+import sys
+from threading import RLock
+
+_lock = RLock()
+
+
+class LazyModule:
+    """Stand-in for a module that is only imported when an attribute is first used.
+
+    Attribute lookups are forwarded to the real module every time, so things
+    like ``patch("customtkinter.CTkButton")`` keep working through the proxy.
+    """
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._load(), name)
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self.__dict__['_name']!r} ({state})>"
+
+
+def lazy_module(name):
+    # Already imported elsewhere, no point in a proxy
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
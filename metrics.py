@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram buckets in seconds, from sub-millisecond Tk work up to slow networks
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Shown in the status bar overlay, in this order
+OVERLAY_PHASES = ("fetch", "http_wait", "json_decode", "icon_load", "update_gui", "render_flush")
+
+
+class PhaseTimer:
+    __slots__ = ("metrics", "phase", "started")
+
+    def __init__(self, metrics, phase):
+        self.metrics = metrics
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.metrics.observe(self.phase, time.perf_counter() - self.started)
+        return False
+
+
+class PhaseMetrics:
+    """Latency per named phase (``http_wait``, ``icon_decode``, ``render_flush``...).
+
+    Recording is one lock and a few appends, cheap enough for the Tk thread.
+    Each phase keeps cumulative histogram buckets for Prometheus, so p50/p99
+    can be aggregated across machines, plus a window of recent samples for
+    the local overlay's percentiles.
+    """
+
+    def __init__(self, window=512):
+        self.window = window
+        self._phases = {}
+        self._lock = threading.Lock()
+
+    def timer(self, phase):
+        return PhaseTimer(self, phase)
+
+    def observe(self, phase, seconds):
+        with self._lock:
+            stats = self._phases.get(phase)
+            if stats is None:
+                stats = self._phases[phase] = {
+                    "count": 0, "sum": 0.0,
+                    "buckets": [0] * (len(BUCKETS) + 1),
+                    "recent": deque(maxlen=self.window),
+                }
+            stats["count"] += 1
+            stats["sum"] += seconds
+            stats["buckets"][bisect_left(BUCKETS, seconds)] += 1
+            stats["recent"].append(seconds)
+
+    def quantile(self, phase, q):
+        with self._lock:
+            stats = self._phases.get(phase)
+            recent = sorted(stats["recent"]) if stats else []
+        if not recent:
+            return None
+        return recent[min(len(recent) - 1, int(q * len(recent)))]
+
+    def summary(self):
+        with self._lock:
+            phases = {
+                phase: (stats["count"], stats["sum"], sorted(stats["recent"]))
+                for phase, stats in self._phases.items()
+            }
+        return {
+            phase: {
+                "count": count,
+                "sum": total,
+                "p50": recent[min(len(recent) - 1, int(0.5 * len(recent)))],
+                "p99": recent[min(len(recent) - 1, int(0.99 * len(recent)))],
+            }
+            for phase, (count, total, recent) in phases.items()
+        }
+
+    def overlay_text(self, phases=OVERLAY_PHASES):
+        # "fetch 120/310 · json_decode 2/4 ..." as p50/p99 in ms
+        summary = self.summary()
+        parts = [
+            f"{phase} {summary[phase]['p50'] * 1000:.0f}/{summary[phase]['p99'] * 1000:.0f}"
+            for phase in phases if phase in summary
+        ]
+        return "p50/p99 ms: " + " · ".join(parts) if parts else "No timings yet"
+
+    def to_prometheus(self, name="weather_app_phase_seconds"):
+        with self._lock:
+            phases = {
+                phase: (stats["count"], stats["sum"], list(stats["buckets"]))
+                for phase, stats in sorted(self._phases.items())
+            }
+        lines = [
+            f"# HELP {name} Time spent in each phase of fetching and rendering weather.",
+            f"# TYPE {name} histogram",
+        ]
+        for phase, (count, total, buckets) in phases.items():
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, buckets):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{phase="{phase}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{phase="{phase}",le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{phase="{phase}"}} {total:.6f}')
+            lines.append(f'{name}_count{{phase="{phase}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        # Atomic, so a textfile collector never reads half a file
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+def start_textfile_writer(metrics, path, interval=15):
+    """Rewrite ``path`` every ``interval`` seconds; set the returned event to stop."""
+    stopped = threading.Event()
+
+    def run():
+        while not stopped.wait(interval):
+            try:
+                metrics.write_prometheus(path)
+            except OSError:
+                pass
+
+    threading.Thread(target=run, name="metrics-writer", daemon=True).start()
+    return stopped
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.metrics.to_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(metrics, port, host="127.0.0.1"):
+    """Serve ``/metrics`` on a background thread; call ``shutdown()`` when done."""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    server.metrics = metrics
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.5}, daemon=True).start()
+    return server
@@ -0,0 +1,141 @@
+import sys
+from array import array
+
+
+class Observation:
+    """Current conditions for one city, the fields the app actually shows.
+
+    Parsed once from a /weather payload; the rest of the payload is dropped.
+    """
+
+    __slots__ = ("id", "name", "country", "dt", "temp", "humidity", "pressure",
+                 "wind_speed", "icon", "description")
+
+    def __init__(self, id=None, name="", country="", dt=0, temp=0, humidity=0, pressure=None,
+                 wind_speed=0, icon="", description=""):
+        self.id = id
+        self.name = name
+        self.country = country
+        self.dt = dt
+        self.temp = temp
+        self.humidity = humidity
+        self.pressure = pressure
+        self.wind_speed = wind_speed
+        self.icon = icon
+        self.description = description
+
+    @classmethod
+    def from_json(cls, data):
+        main = data.get("main", {})
+        weather = (data.get("weather") or [{}])[0]
+        return cls(
+            id=data.get("id"),
+            name=data.get("name", ""),
+            country=data.get("sys", {}).get("country", ""),
+            dt=data.get("dt", 0),
+            temp=main.get("temp", 0),
+            humidity=main.get("humidity", 0),
+            pressure=main.get("pressure"),
+            wind_speed=data.get("wind", {}).get("speed", 0),
+            icon=sys.intern(weather.get("icon", "")),
+            description=sys.intern(weather.get("description", "")),
+        )
+
+    def to_json(self):
+        # Same shape as the API, so from_json reads it back (snapshots, history)
+        main = {"temp": self.temp, "humidity": self.humidity}
+        if self.pressure is not None:
+            main["pressure"] = self.pressure
+        data = {
+            "name": self.name,
+            "sys": {"country": self.country},
+            "dt": self.dt,
+            "main": main,
+            "wind": {"speed": self.wind_speed},
+            "weather": [{"icon": self.icon, "description": self.description}],
+        }
+        if self.id is not None:
+            data["id"] = self.id
+        return data
+
+    def __eq__(self, other):
+        return isinstance(other, Observation) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self):
+        return f"Observation({self.name!r}, {self.country!r}, temp={self.temp})"
+
+
+class ForecastSeries:
+    """A 3-hourly /forecast payload as columns, sorted by time.
+
+    Numbers live in typed arrays (8 bytes a value, no per-entry objects).
+    Conditions are stored once in ``conditions`` as ``(icon, description)``
+    pairs and referenced from the ``condition`` column by index.
+    """
+
+    __slots__ = ("timezone", "dt", "temp", "temp_min", "temp_max", "precipitation",
+                 "condition", "conditions")
+
+    def __init__(self, timezone=0):
+        self.timezone = timezone
+        self.dt = array("q")
+        self.temp = array("d")
+        self.temp_min = array("d")
+        self.temp_max = array("d")
+        self.precipitation = array("d")
+        self.condition = array("H")
+        self.conditions = []
+
+    @classmethod
+    def from_json(cls, data):
+        series = cls(data.get("city", {}).get("timezone", 0))
+        entries = data.get("list", [])
+        if any(entries[i].get("dt", 0) > entries[i + 1].get("dt", 0) for i in range(len(entries) - 1)):
+            entries = sorted(entries, key=lambda entry: entry.get("dt", 0))
+
+        for entry in entries:
+            main = entry.get("main", {})
+            weather = (entry.get("weather") or [{}])[0]
+            temp = main.get("temp", 0)
+            series.append(
+                entry.get("dt", 0), temp, main.get("temp_min", temp), main.get("temp_max", temp),
+                entry.get("rain", {}).get("3h", 0) + entry.get("snow", {}).get("3h", 0),
+                weather.get("icon", ""), weather.get("description", ""),
+            )
+        return series
+
+    def append(self, dt, temp, temp_min, temp_max, precipitation, icon="", description=""):
+        # Entries must be added in time order
+        self.dt.append(dt)
+        self.temp.append(temp)
+        self.temp_min.append(temp_min)
+        self.temp_max.append(temp_max)
+        self.precipitation.append(precipitation)
+        condition = (icon, description)
+        try:
+            code = self.conditions.index(condition)
+        except ValueError:
+            code = len(self.conditions)
+            self.conditions.append((sys.intern(icon), sys.intern(description)))
+        self.condition.append(code)
+
+    def to_json(self):
+        entries = []
+        for i in range(len(self)):
+            icon, description = self.conditions[self.condition[i]]
+            entries.append({
+                "dt": self.dt[i],
+                "main": {"temp": self.temp[i], "temp_min": self.temp_min[i], "temp_max": self.temp_max[i]},
+                "rain": {"3h": self.precipitation[i]},
+                "weather": [{"icon": icon, "description": description}],
+            })
+        return {"city": {"timezone": self.timezone}, "list": entries}
+
+    def __len__(self):
+        return len(self.dt)
+
+    def __repr__(self):
+        return f"ForecastSeries({len(self)} entries)"
+
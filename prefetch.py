@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import deque
+
+from resilience import TokenBucket
+from response_cache import normalize_city
+
+# A city whose prefetch failed is left alone this long, so one bad entry
+# (a typo in the recents, an outage for one city) can't eat the budget
+FAILURE_COOLDOWN = 5 * 60
+
+
+class Prefetcher:
+    """Warms the response cache for the cities the user is likely to pick next.
+
+    Cities asked for with ``request`` (e.g. the dropdown item under the
+    pointer) go first. When nothing is queued and ``idle()`` says no user
+    fetch is running, the first city from ``candidates()`` that ``skip``
+    doesn't rule out (the app skips anything already cached, fresh or stale:
+    keeping cached cities fresh is the auto-refresher's job) is fetched. Every fetch spends a token from ``budget``;
+    without one the city is dropped, it will come up again. A city whose
+    fetch failed is skipped for ``failure_cooldown`` seconds.
+
+    ``record_selection`` is called when the user actually picks a city, so
+    ``stats`` shows how often selections were served from memory and how
+    many of those were prefetched.
+    """
+
+    def __init__(self, fetch, skip, candidates, idle=None, budget=None, poll=1.0,
+                 failure_cooldown=FAILURE_COOLDOWN, clock=time.monotonic):
+        self.fetch = fetch
+        self.skip = skip
+        self.candidates = candidates
+        self.idle = idle
+        self.budget = budget or TokenBucket()
+        self.poll = poll
+        self.failure_cooldown = failure_cooldown
+        self.clock = clock
+        self.stats = {
+            "selections": 0, "hits": 0, "stale_hits": 0, "misses": 0, "prefetch_hits": 0,
+            "requested": 0, "prefetched": 0, "over_budget": 0, "failed": 0,
+        }
+        self._queue = deque()
+        self._warmed = set()
+        self._failed_until = {}
+        self._wakeup = threading.Condition()
+        self._stopped = False
+
+    def request(self, city):
+        with self._wakeup:
+            if city in self._queue:
+                self._queue.remove(city)
+            self._queue.appendleft(city)
+            self.stats["requested"] += 1
+            self._wakeup.notify()
+
+    def record_selection(self, city, state):
+        # state is "hit" (fresh in cache), "stale" (drawn from cache, then refreshed) or "miss"
+        with self._wakeup:
+            self.stats["selections"] += 1
+            self.stats[{"hit": "hits", "stale": "stale_hits", "miss": "misses"}[state]] += 1
+            if state != "miss" and normalize_city(city) in self._warmed:
+                self.stats["prefetch_hits"] += 1
+
+    def hit_rate(self):
+        # Selections drawn from memory, fresh or stale
+        with self._wakeup:
+            selections = self.stats["selections"]
+            hits = self.stats["hits"] + self.stats["stale_hits"]
+        return hits / selections if selections else 0.0
+
+    def run_once(self):
+        """Prefetch one city; returns False when there was nothing to do."""
+        city = self._next_city()
+        if city is None:
+            return False
+        if not self.budget.acquire(timeout=0):
+            with self._wakeup:
+                self.stats["over_budget"] += 1
+            return False
+        try:
+            self.fetch(city)
+        except Exception:
+            with self._wakeup:
+                self.stats["failed"] += 1
+                self._failed_until[normalize_city(city)] = self.clock() + self.failure_cooldown
+            return True
+        with self._wakeup:
+            self.stats["prefetched"] += 1
+            self._failed_until.pop(normalize_city(city), None)
+            self._warmed.add(normalize_city(city))
+        return True
+
+    def start(self):
+        thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify_all()
+
+    def _run(self):
+        while True:
+            worked = self.run_once()
+            with self._wakeup:
+                if self._stopped:
+                    return
+                if not worked and not self._queue:
+                    self._wakeup.wait(self.poll)
+                if self._stopped:
+                    return
+
+    def _next_city(self):
+        while True:
+            with self._wakeup:
+                city = self._queue.popleft() if self._queue else None
+            if city is None:
+                break
+            if not self._cooling_down(city) and not self.skip(city):
+                return city
+
+        if self.idle is not None and not self.idle():
+            return None
+        for city in list(self.candidates()):
+            if not self._cooling_down(city) and not self.skip(city):
+                return city
+        return None
+
+    def _cooling_down(self, city):
+        key = normalize_city(city)
+        with self._wakeup:
+            until = self._failed_until.get(key)
+            if until is None:
+                return False
+            if self.clock() < until:
+                return True
+            del self._failed_until[key]
+            return False
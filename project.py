@@ -1,20 +1,48 @@
-import customtkinter as ctk
-import requests
-import json
-from datetime import datetime
 import time
-from PIL import Image, ImageTk
 import io
 import os
-from threading import Thread
-from dotenv import load_dotenv
+import sys
+import argparse
+from lazy_import import lazy_module
+from icon_cache import IconCache, IconLoader
+from icon_atlas import IconAtlas, DEFAULT_ATLAS_PATH, ICON_SIZE
+from providers import CityNotFoundError, PROVIDER_NAMES
+from resilience import CircuitOpenError, TokenBucket
+from response_cache import normalize_city
+from scheduler import FetchScheduler
+from refresher import AutoRefresher, DEFAULT_BUDGET_RATE, DEFAULT_BUDGET_BURST
+from prefetch import Prefetcher
+from dashboard import Dashboard
+from city_index import CityIndex, DEFAULT_INDEX_PATH
+from forecast import aggregate_daily
+from models import Observation, ForecastSeries
+from view_model import WeatherViewModel, convert_temperature
+from renderer import Renderer
+from snapshot import save_snapshot, load_snapshot, default_snapshot_path, SnapshotWriter
+from metrics import start_metrics_server, start_textfile_writer
+from weather_service import WeatherService
+from batch import run_batch, OUTPUT_FORMATS, DEFAULT_PARALLELISM
 
-# Load .env file
-load_dotenv()
+# Heavy modules are imported on first use, not at startup
+ctk = lazy_module("customtkinter")
+requests = lazy_module("requests")
+Image = lazy_module("PIL.Image")
+ImageTk = lazy_module("PIL.ImageTk")
 
-class WeatherApp:
-    def __init__(self, root):
+FORECAST_DAYS = 3
+
+# Autocomplete waits for a pause in typing, then shows this many matches
+SUGGEST_DELAY_MS = 150
+MAX_SUGGESTIONS = 6
+
+class WeatherApp(WeatherService):
+    def __init__(self, root, max_recent_cities=5, debug=False, provider=None, fixtures_dir=None):
+        self.started_at = time.perf_counter()
+        self.startup_timings = {}
         self.root = root
+        self.max_recent_cities = max_recent_cities
+        self.debug = debug
+        self._debug_job = None
         self.root.title("Weather App")
         self.root.geometry("500x800")
         self.root.resizable(False, False)
@@ -23,26 +51,88 @@ class WeatherApp:
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
         
-        # API validation
-        self.api_key = os.getenv("OPENWEATHER_API_KEY")
-        if not self.api_key:
-            raise ValueError("API key not found. Please set OPENWEATHER_API_KEY in your .env file.")
+        # Configuration, HTTP client, provider, response cache and history
+        super().__init__(provider, fixtures_dir)
+        
+        # Batched, diffing widget updates
+        self.renderer = Renderer(self.root, self.metrics)
+        self.scheduler = FetchScheduler(max_in_flight=2)
+        
+        # Icon cache (memory LRU + on-disk store)
+        self.icon_cache = IconCache(os.getenv("WEATHER_CACHE_DIR"))
+        self.icon_loader = IconLoader(self.icon_cache, self._download_icon, self._decode_icon)
+        
+        # Bundled, pre-decoded icons (memory-mapped); the cache and network are the fallback
+        self.icon_atlas = None
+        atlas_path = os.getenv("WEATHER_ICON_ATLAS", DEFAULT_ATLAS_PATH)
+        if os.path.exists(atlas_path):
+            try:
+                self.icon_atlas = IconAtlas(atlas_path)
+            except (OSError, ValueError):
+                pass
         
         # Default (if API incorrect)
         self.temp_unit = "celsius"
+        self.wind_unit = "m/s"
+        self.pressure_unit = "hPa"
         self.city = "London"
         self.weather_data = None
         self.forecast_data = None
         
+        # Recent cities, shown on a pool of reusable buttons
+        self.recent_cities = []
+        self.recent_city_buttons = []
+        self.visible_recent_buttons = 0
+        
         # Popular cities list
         self.popular_cities = [
             "London", "New York", "Tokyo", "Paris", "Sydney", 
             "Berlin", "Moscow", "Dubai", "Singapore", "Mumbai"
         ]
         
+        # Offline city list for autocomplete (memory-mapped, optional)
+        self.city_index = None
+        index_path = os.getenv("WEATHER_CITY_INDEX", DEFAULT_INDEX_PATH)
+        if os.path.exists(index_path):
+            try:
+                self.city_index = CityIndex(index_path)
+            except (OSError, ValueError):
+                pass
+        
+        # Last rendered state from the previous run, drawn before any network call
+        self.snapshot_path = default_snapshot_path(os.getenv("WEATHER_CACHE_DIR"))
+        self.snapshot_writer = SnapshotWriter(self.save_snapshot)
+        snapshot = load_snapshot(self.snapshot_path)
+        if snapshot:
+            self.restore_city(snapshot)
+        
         self.create_widgets()
+        self.startup_timings["widgets_ms"] = (time.perf_counter() - self.started_at) * 1000
+        if snapshot:
+            self.show_snapshot(snapshot)
         self.fetch_weather()
         
+        # Keeps the current, recent and popular cities fresh without a click;
+        # background refreshes and prefetches share one slice of the quota
+        self.background_budget = TokenBucket(DEFAULT_BUDGET_RATE, DEFAULT_BUDGET_BURST)
+        self.refresher = AutoRefresher(
+            self.refresh_city,
+            lambda: (self.city, list(self.recent_cities), self.popular_cities),
+            age=lambda city: self.response_cache.age(city, "weather"),
+            budget=self.background_budget,
+        )
+        self.refresher.start()
+        
+        # Warms the cache for the next likely selection while the app is idle
+        self.prefetcher = Prefetcher(
+            self.refresh_city,
+            self.skip_prefetch,
+            lambda: list(self.recent_cities) + self.popular_cities,
+            idle=lambda: self.scheduler.in_flight() == 0,
+            budget=self.background_budget,
+        )
+        self.prefetcher.start()
+        
     def create_widgets(self):
         self.main_frame = ctk.CTkFrame(self.root)
         self.main_frame.pack(fill="both", expand=True, padx=20, pady=20)
@@ -53,6 +143,12 @@ class WeatherApp:
         self.city_entry = ctk.CTkEntry(self.search_frame, placeholder_text="Enter city name...")
         self.city_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
         self.city_entry.insert(0, self.city)
+        self.city_entry.bind("<KeyRelease>", self._on_entry_key)
+        
+        # Autocomplete dropdown, built the first time there is something to show
+        self.suggestions = []
+        self.suggestion_buttons = []
+        self._suggest_job = None
         
         # Search button
         self.search_button = ctk.CTkButton(self.search_frame, text="Search", command=self.search_city)
@@ -73,6 +169,20 @@ class WeatherApp:
         )
         self.city_dropdown.pack(side="right", padx=(0, 10))
         
+        # Prefetch whichever city is under the pointer in the open dropdown
+        dropdown_menu = getattr(self.city_dropdown, "_dropdown_menu", None)
+        if dropdown_menu is not None:
+            dropdown_menu.bind("<<MenuSelect>>", self._on_dropdown_hover)
+        
+        # Multi-city dashboard
+        self.dashboard_button = ctk.CTkButton(
+            self.popular_cities_frame,
+            text="Dashboard",
+            width=90,
+            command=self.open_dashboard
+        )
+        self.dashboard_button.pack(side="right", padx=(0, 10))
+        
         self.weather_frame = ctk.CTkFrame(self.main_frame)
         self.weather_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
@@ -112,6 +222,10 @@ class WeatherApp:
         self.humidity_label = ctk.CTkLabel(self.details_frame, text="Humidity: --")
         self.humidity_label.pack(side="left", expand=True)
         
+        # Pressure
+        self.pressure_label = ctk.CTkLabel(self.details_frame, text="Pressure: --")
+        self.pressure_label.pack(side="left", expand=True)
+        
         # Wind speed
         self.wind_label = ctk.CTkLabel(self.details_frame, text="Wind: --")
         self.wind_label.pack(side="right", expand=True)
@@ -126,6 +240,25 @@ class WeatherApp:
         self.unit_switch = ctk.CTkSwitch(self.toggle_frame, text="°F", command=self.toggle_unit)
         self.unit_switch.pack(side="right", padx=(0, 10))
         
+        # Status
+        self.status_frame = ctk.CTkFrame(self.root)
+        self.status_frame.pack(fill="x", padx=20, pady=(0, 20))
+        
+        self.status_label = ctk.CTkLabel(self.status_frame, text="Ready")
+        self.status_label.pack(pady=5)
+        
+        # Debug overlay (F12), per-phase p50/p99 timings
+        self.root.bind("<F12>", lambda event: self.toggle_debug_overlay())
+        if self.debug:
+            self.show_debug_overlay()
+        
+        # Sections below the fold are built once the first frame is on screen
+        self.forecast_days = []
+        self.root.after_idle(lambda: self.root.after(0, self.create_deferred_widgets))
+    
+    def create_deferred_widgets(self):
+        self.startup_timings["first_paint_ms"] = (time.perf_counter() - self.started_at) * 1000
+        
         # Forecast section
         self.forecast_label = ctk.CTkLabel(self.main_frame, text="3-Day Forecast", font=("Arial", 18, "bold"))
         self.forecast_label.pack(pady=(10, 0))
@@ -134,7 +267,7 @@ class WeatherApp:
         self.forecast_frame.pack(fill="x", padx=10, pady=10)
         
         self.forecast_days = []
-        for i in range(3):
+        for i in range(FORECAST_DAYS):
             day_frame = ctk.CTkFrame(self.forecast_frame)
             day_frame.pack(side="left", fill="both", expand=True, padx=5)
             
@@ -168,32 +301,96 @@ class WeatherApp:
         self.recent_cities_container = ctk.CTkFrame(self.recents_frame, fg_color="transparent")
         self.recent_cities_container.pack(side="right", fill="x", expand=True, padx=(5, 0))
         
-        # Store recent cities (max 5)
-        self.recent_cities = []
-        
-        # Status
-        self.status_frame = ctk.CTkFrame(self.root)
-        self.status_frame.pack(fill="x", padx=20, pady=(0, 20))
+        self.startup_timings["deferred_widgets_ms"] = (time.perf_counter() - self.started_at) * 1000
         
-        self.status_label = ctk.CTkLabel(self.status_frame, text="Ready")
-        self.status_label.pack(pady=5)
+        # Fill in whatever arrived before these widgets existed
+        self.update_recent_cities_display()
+        self.update_gui()
         
     def search_city(self):
         self.city = self.city_entry.get().strip()
         if self.city:
-            self.status_label.configure(text=f"Searching for {self.city}...")
-            self.error_label.configure(text="")
+            self.renderer.set(self.status_label, text=f"Searching for {self.city}...")
+            self.renderer.set(self.error_label, text="")
             self.fetch_weather()
             self.add_to_recent_cities(self.city)
         else:
-            self.status_label.configure(text="Please enter a city name")
+            self.renderer.set(self.status_label, text="Please enter a city name")
+    
+    def _on_entry_key(self, event):
+        if event.keysym == "Return":
+            self.hide_suggestions()
+            self.search_city()
+            return
+        if event.keysym == "Escape":
+            self.hide_suggestions()
+            return
+        
+        # Debounced, only the last keystroke in a burst searches
+        if self._suggest_job is not None:
+            self.root.after_cancel(self._suggest_job)
+        self._suggest_job = self.root.after(SUGGEST_DELAY_MS, self.update_suggestions)
+    
+    def update_suggestions(self):
+        self._suggest_job = None
+        text = self.city_entry.get().strip()
+        if self.city_index is None or len(text) < 2:
+            self.hide_suggestions()
+            return
+        
+        self.suggestions = self.city_index.search(text, limit=MAX_SUGGESTIONS)
+        if not self.suggestions:
+            self.hide_suggestions()
+            return
+        
+        if not hasattr(self, "suggestion_frame"):
+            self.suggestion_frame = ctk.CTkFrame(self.main_frame)
+        
+        # Same pooling as the recents bar: buttons are reused, never destroyed
+        while len(self.suggestion_buttons) < len(self.suggestions):
+            slot = len(self.suggestion_buttons)
+            button = ctk.CTkButton(
+                self.suggestion_frame,
+                text="",
+                anchor="w",
+                fg_color="transparent",
+                command=lambda i=slot: self.select_suggestion(i)
+            )
+            self.suggestion_buttons.append(button)
+        
+        for slot, button in enumerate(self.suggestion_buttons):
+            if slot < len(self.suggestions):
+                self.renderer.set(button, text=self.suggestions[slot].label)
+                button.pack(fill="x", padx=5, pady=1)
+            else:
+                button.pack_forget()
+        
+        self.suggestion_frame.place(in_=self.search_frame, relx=0, rely=1, relwidth=1)
+        self.suggestion_frame.lift()
+    
+    def hide_suggestions(self):
+        if self._suggest_job is not None:
+            self.root.after_cancel(self._suggest_job)
+            self._suggest_job = None
+        self.suggestions = []
+        if hasattr(self, "suggestion_frame"):
+            self.suggestion_frame.place_forget()
+    
+    def select_suggestion(self, slot):
+        if slot >= len(self.suggestions):
+            return
+        city = self.suggestions[slot]
+        self.city_ids[normalize_city(city.label)] = city.id
+        self.hide_suggestions()
+        self.select_city(city.label)
     
     def select_city(self, city):
+        self.prefetcher.record_selection(city, self.cache_state(city))
         self.city = city
         self.city_entry.delete(0, "end")
         self.city_entry.insert(0, city)
-        self.status_label.configure(text=f"Selected {city}")
-        self.error_label.configure(text="")
+        self.renderer.set(self.status_label, text=f"Selected {city}")
+        self.renderer.set(self.error_label, text="")
         self.fetch_weather()
         self.add_to_recent_cities(city)
     
@@ -203,154 +400,347 @@ class WeatherApp:
             self.recent_cities.remove(city)
         self.recent_cities.insert(0, city)
         
-        # Last 5 city searched
-        self.recent_cities = self.recent_cities[:5]
+        # Last N city searched
+        self.recent_cities = self.recent_cities[:self.max_recent_cities]
         self.update_recent_cities_display()
     
     def update_recent_cities_display(self):
-        for widget in self.recent_cities_container.winfo_children():
-            widget.destroy()
+        # The recents bar is built after the first frame, it catches up then
+        if not hasattr(self, "recent_cities_container"):
+            return
         
-        for city in self.recent_cities:
+        # Buttons are created once per slot and reused, never destroyed
+        while len(self.recent_city_buttons) < len(self.recent_cities):
+            slot = len(self.recent_city_buttons)
             city_btn = ctk.CTkButton(
                 self.recent_cities_container,
-                text=city,
+                text="",
                 width=70,
                 height=25,
                 font=("Arial", 10),
-                command=lambda c=city: self.select_city(c)
+                command=lambda i=slot: self.select_recent_city(i)
             )
-            city_btn.pack(side="left", padx=2)
+            city_btn.bind("<Enter>", lambda event, i=slot: self.prefetch_recent_city(i))
+            self.recent_city_buttons.append(city_btn)
+        
+        for slot, city in enumerate(self.recent_cities):
+            self.renderer.set(self.recent_city_buttons[slot], text=city)
+        
+        # Show or hide slots only when the number of cities changes
+        visible = len(self.recent_cities)
+        for slot in range(self.visible_recent_buttons, visible):
+            self.recent_city_buttons[slot].pack(side="left", padx=2)
+        for slot in range(visible, self.visible_recent_buttons):
+            self.recent_city_buttons[slot].pack_forget()
+        self.visible_recent_buttons = visible
+    
+    def select_recent_city(self, slot):
+        if slot < len(self.recent_cities):
+            self.select_city(self.recent_cities[slot])
+    
+    def prefetch_recent_city(self, slot):
+        if slot < len(self.recent_cities):
+            self.prefetcher.request(self.recent_cities[slot])
+    
+    def _on_dropdown_hover(self, event):
+        index = event.widget.index("active")
+        if index is not None:
+            self.prefetcher.request(event.widget.entrycget(index, "label"))
+    
+    def cache_state(self, city):
+        # "hit" draws from memory and stops there, "stale" draws and refreshes
+        weather_data, weather_fresh = self.response_cache.get(city, "weather")
+        forecast_data, forecast_fresh = self.response_cache.get(city, "forecast")
+        if weather_data is None or forecast_data is None:
+            return "miss"
+        return "hit" if weather_fresh and forecast_fresh else "stale"
+    
+    def skip_prefetch(self, city):
+        # Only warm what isn't cached at all; cached cities (even stale ones) are
+        # kept fresh on the refresher's schedule, not once per TTL from here
+        return self.cache_state(city) != "miss" or self.is_known_missing(city)
+    
+    def open_dashboard(self):
+        return Dashboard(self, self.popular_cities)
+    
+    def toggle_debug_overlay(self):
+        self.debug = not self.debug
+        if self.debug:
+            self.show_debug_overlay()
+            return
+        self._cancel_debug_refresh()
+        if hasattr(self, "debug_label"):
+            self.debug_label.pack_forget()
+    
+    def show_debug_overlay(self):
+        self.debug = True
+        if not hasattr(self, "debug_label"):
+            self.debug_label = ctk.CTkLabel(self.status_frame, text="", font=("Courier", 10))
+        self.debug_label.pack(pady=(0, 5))
+        self.refresh_debug_overlay()
+    
+    def _cancel_debug_refresh(self):
+        # Only one 1 Hz refresh loop, however often F12 is pressed
+        job = getattr(self, "_debug_job", None)
+        if job is not None:
+            self.root.after_cancel(job)
+        self._debug_job = None
+    
+    def refresh_debug_overlay(self):
+        self._cancel_debug_refresh()
+        if not self.debug:
+            return
+        text = self.metrics.overlay_text()
+        if hasattr(self, "prefetcher") and self.prefetcher.stats["selections"]:
+            stats = self.prefetcher.stats
+            text += f"\nprefetch: {self.prefetcher.hit_rate():.0%} of {stats['selections']} picks from cache, {stats['prefetch_hits']} prefetched"
+        self.renderer.set(self.debug_label, text=text)
+        self._debug_job = self.root.after(1000, self.refresh_debug_overlay)
     
     def fetch_weather(self):
-        Thread(target=self._fetch_weather_thread).start()
+        city = self.city
+        
+        # Draw cached data straight away, only go to the network if it's stale or missing
+        weather_data, weather_fresh = self.response_cache.get(city, "weather")
+        forecast_data, forecast_fresh = self.response_cache.get(city, "forecast")
+        if weather_data is not None and forecast_data is not None:
+            self.weather_data = weather_data
+            self.forecast_data = forecast_data
+            self.update_gui()
+            if weather_fresh and forecast_fresh:
+                # Anything still in flight is older than what's on screen now
+                self.scheduler.supersede()
+                self.renderer.set(self.status_label, text="Data loaded from cache")
+                return
+            self.renderer.set(self.status_label, text="Showing cached data, refreshing...")
+        
+        self.scheduler.submit(normalize_city(city), lambda ticket: self._fetch_weather_thread(city, ticket))
     
-    def _fetch_weather_thread(self):
+    def _fetch_weather_thread(self, city, ticket=None):
         try:
-            # Get current weather
-            weather_url = f"https://api.openweathermap.org/data/2.5/weather?q={self.city}&appid={self.api_key}&units=metric"
-            weather_response = requests.get(weather_url)
-            
-            # Check if city not found
-            if weather_response.status_code == 404:
-                self.root.after(0, lambda: self.status_label.configure(text="Failed to fetch weather data"))
-                self.root.after(0, lambda: self.error_label.configure(text=f"Error: City '{self.city}' not found"))
-                return
-            
-            weather_response.raise_for_status()
-            self.weather_data = weather_response.json()
-            
-            # Get forecast
-            forecast_url = f"https://api.openweathermap.org/data/2.5/forecast?q={self.city}&appid={self.api_key}&units=metric"
-            forecast_response = requests.get(forecast_url)
-            forecast_response.raise_for_status()
-            self.forecast_data = forecast_response.json()
-            
-            # Add to recent cities only if successful
-            self.root.after(0, lambda: self.add_to_recent_cities(self.city))
-            self.root.after(0, self.update_gui)
-            self.root.after(0, lambda: self.status_label.configure(text="Data fetched successfully"))
+            weather_data, forecast_data = self.fetch_city(city)
+            self.root.after(0, lambda: self._apply_weather(city, weather_data, forecast_data, ticket))
+        except CityNotFoundError:
+            self._show_fetch_error(f"Error: City '{city}' not found", ticket)
+        except CircuitOpenError as e:
+            self._show_cached_or_error(city, f"Error: {str(e)}", ticket)
         except requests.exceptions.HTTPError as e:
-            self.root.after(0, lambda: self.status_label.configure(text="Failed to fetch weather data"))
-            self.root.after(0, lambda: self.error_label.configure(text=f"Error: {str(e)}"))
+            self._show_cached_or_error(city, f"Error: {str(e)}", ticket)
         except requests.exceptions.RequestException as e:
-            self.root.after(0, lambda: self.status_label.configure(text="Failed to fetch weather data"))
-            self.root.after(0, lambda: self.error_label.configure(text=f"Error: {str(e)}"))
+            self._show_cached_or_error(city, f"Error: {str(e)}", ticket)
     
-    def update_gui(self):
-        if not self.weather_data:
+    def refresh_city(self, city):
+        # Runs on the refresher thread; errors are counted by the refresher
+        weather_data, forecast_data = self.fetch_from_provider(city)
+        self.record_observation(city, "weather", weather_data)
+        self.record_observation(city, "forecast", forecast_data)
+        self.root.after(0, lambda: self._apply_refresh(city, weather_data, forecast_data))
+    
+    def _apply_refresh(self, city, weather_data, forecast_data):
+        # Other cities just wait in the cache for when they're selected
+        if normalize_city(city) != normalize_city(self.city):
             return
         
-        # Clear any previous error messages
-        self.error_label.configure(text="")
+        # Nothing visible changed, leave the screen alone
+        view = WeatherViewModel(weather_data, aggregate_daily(forecast_data, days=FORECAST_DAYS))
+        if self.weather_data is not None and view == self.get_view_model():
+            return
         
-        # Update weather
-        city_name = self.weather_data.get("name", "")
-        country = self.weather_data.get("sys", {}).get("country", "")
-        self.city_label.configure(text=f"{city_name}, {country}")
+        self.weather_data = weather_data
+        self.forecast_data = forecast_data
+        self.update_gui()
+        self.renderer.set(self.status_label, text="Data refreshed")
+    
+    def _apply_weather(self, city, weather_data, forecast_data, ticket=None, status="Data fetched successfully"):
+        # A newer request was made while this one was in flight
+        if ticket is not None and not ticket.is_current():
+            return
         
-        # Update date
-        timestamp = self.weather_data.get("dt", 0)
-        date_str = datetime.fromtimestamp(timestamp).strftime("%A, %d %B %Y")
-        self.date_label.configure(text=date_str)
+        self.weather_data = weather_data
+        self.forecast_data = forecast_data
         
-        # Update weather icon
-        icon_code = self.weather_data.get("weather", [{}])[0].get("icon", "")
-        self.load_weather_icon(icon_code, self.icon_label)
+        # Add to recent cities only if successful
+        self.add_to_recent_cities(city)
+        self.update_gui()
+        self.renderer.set(self.status_label, text=status)
         
-        # Update temperature
-        temp_c = self.weather_data.get("main", {}).get("temp", 0)
-        temp_f = self.convert_temperature(temp_c, "fahrenheit")
+        # Snapshot for the next cold start, written off the Tk thread
+        self.snapshot_writer.save(city, weather_data, forecast_data)
+    
+    def save_snapshot(self, city, weather_data, forecast_data):
+        icon_codes = [weather_data.icon]
+        icon_codes += [day["icon"] for day in aggregate_daily(forecast_data, days=FORECAST_DAYS)]
+        icons = {}
+        for icon_code in icon_codes:
+            icon_bytes = self.icon_cache.get_bytes(icon_code)
+            if icon_bytes is not None:
+                icons[icon_code] = icon_bytes
+        try:
+            save_snapshot(
+                self.snapshot_path, city, weather_data.to_json(), forecast_data.to_json(), icons,
+                city_id=self.city_ids.get(normalize_city(city))
+            )
+        except OSError:
+            pass
+    
+    def restore_city(self, snapshot):
+        # A city picked from the suggestions is fetched by the ID it was picked with
+        self.city = snapshot["city"]
+        if snapshot.get("city_id"):
+            self.city_ids[normalize_city(self.city)] = snapshot["city_id"]
+    
+    def show_snapshot(self, snapshot):
+        # Icons are decoded here so the first frame has them without the worker pool
+        for icon_code, icon_bytes in snapshot["icons"].items():
+            if self.icon_cache.get_image(icon_code) is None:
+                try:
+                    icon_photo = ImageTk.PhotoImage(self._decode_icon(icon_bytes))
+                except Exception:
+                    continue
+                self.icon_cache.put_image(icon_code, icon_photo)
+                if self.icon_cache.get_bytes(icon_code) is None:
+                    self.icon_cache.put_bytes(icon_code, icon_bytes)
+        
+        self.weather_data = Observation.from_json(snapshot["weather"])
+        self.forecast_data = ForecastSeries.from_json(snapshot["forecast"] or {})
+        self.update_gui()
+        self.renderer.set(self.status_label, text="Showing last saved data, refreshing...")
+        self.renderer.flush()
+    
+    def _show_cached_or_error(self, city, message, ticket=None):
+        weather_data = self.last_good(city, "weather")
+        forecast_data = self.last_good(city, "forecast")
+        if weather_data is None or forecast_data is None:
+            self._show_fetch_error(message, ticket)
+            return
         
-        if self.temp_unit == "celsius":
-            self.temp_label.configure(text=f"{temp_c:.1f}°C")
-        else:
-            self.temp_label.configure(text=f"{temp_f:.1f}°F")
+        status = "Weather service unavailable, showing saved data"
+        self.root.after(0, lambda: self._apply_weather(city, weather_data, forecast_data, ticket, status))
+    
+    def _show_fetch_error(self, message, ticket=None):
+        def show():
+            if ticket is not None and not ticket.is_current():
+                return
+            self.renderer.set(self.status_label, text="Failed to fetch weather data")
+            self.renderer.set(self.error_label, text=message)
+        self.root.after(0, show)
+    
+    def update_gui(self):
+        with self.metrics.timer("update_gui"):
+            self._update_gui()
+    
+    def _update_gui(self):
+        view = self.get_view_model()
+        if view is None:
+            return
+        
+        # Clear any previous error messages
+        self.renderer.set(self.error_label, text="")
         
-        # Update description
-        description = self.weather_data.get("weather", [{}])[0].get("description", "").capitalize()
-        self.desc_label.configure(text=description)
+        self.renderer.set(self.city_label, text=view.city)
+        self.renderer.set(self.date_label, text=view.date)
+        self.load_weather_icon(view.icon, self.icon_label)
+        self.renderer.set(self.desc_label, text=view.description)
         
         # Update details
-        humidity = self.weather_data.get("main", {}).get("humidity", 0)
-        self.humidity_label.configure(text=f"Humidity: {humidity}%")
-        
-        wind_speed = self.weather_data.get("wind", {}).get("speed", 0)
-        self.wind_label.configure(text=f"Wind: {wind_speed} m/s")
+        self.renderer.set(self.humidity_label, text=view.humidity)
+        self.renderer.set(self.wind_label, text=view.wind[self.wind_unit])
+        self.renderer.set(self.pressure_label, text=view.pressure[self.pressure_unit])
         
         # Update forecast
-        if self.forecast_data and "list" in self.forecast_data:
-            # Get unique dates for forecast
-            forecast_dates = set()
-            forecasts = []
-            
-            for forecast in self.forecast_data["list"]:
-                date = datetime.fromtimestamp(forecast.get("dt", 0)).strftime("%Y-%m-%d")
-                if date not in forecast_dates and date != datetime.now().strftime("%Y-%m-%d"):
-                    forecast_dates.add(date)
-                    forecasts.append(forecast)
-                    if len(forecasts) >= 3:
-                        break
-            
-            # Update forecast days
-            for i, forecast in enumerate(forecasts[:3]):
-                if i < len(self.forecast_days):
-                    day_frame = self.forecast_days[i]
-                    
-                    # Day of week
-                    day_timestamp = forecast.get("dt", 0)
-                    day_name = datetime.fromtimestamp(day_timestamp).strftime("%A")
-                    day_frame["day"].configure(text=day_name)
-                    
-                    # Icon
-                    icon_code = forecast.get("weather", [{}])[0].get("icon", "")
-                    self.load_weather_icon(icon_code, day_frame["icon"])
-                    
-                    # Temperature
-                    temp_c = forecast.get("main", {}).get("temp", 0)
-                    temp_f = self.convert_temperature(temp_c, "fahrenheit")
-                    
-                    if self.temp_unit == "celsius":
-                        day_frame["temp"].configure(text=f"{temp_c:.1f}°C")
-                    else:
-                        day_frame["temp"].configure(text=f"{temp_f:.1f}°F")
-                    
-                    # Description
-                    description = forecast.get("weather", [{}])[0].get("description", "").capitalize()
-                    day_frame["desc"].configure(text=description)
+        for i, day in enumerate(view.forecast):
+            if i < len(self.forecast_days):
+                day_frame = self.forecast_days[i]
+                self.renderer.set(day_frame["day"], text=day.day)
+                self.load_weather_icon(day.icon, day_frame["icon"])
+                self.renderer.set(day_frame["desc"], text=day.description)
+        
+        self.update_temperature_labels()
+    
+    def update_temperature_labels(self):
+        view = self.get_view_model()
+        if view is None:
+            return
+        
+        self.renderer.set(self.temp_label, text=view.temp[self.temp_unit])
+        for i, day in enumerate(view.forecast):
+            if i < len(self.forecast_days):
+                self.renderer.set(self.forecast_days[i]["temp"], text=day.temp[self.temp_unit])
+    
+    def get_view_model(self):
+        # Built once per payload, unit switches only pick strings out of it
+        if not self.weather_data:
+            return None
+        source = (self.weather_data, self.forecast_data)
+        cached_source = getattr(self, "_view_model_source", (None, None))
+        if cached_source[0] is not source[0] or cached_source[1] is not source[1]:
+            with self.metrics.timer("view_model"):
+                self._view_model = WeatherViewModel(self.weather_data, self.get_daily_forecast())
+            self._view_model_source = source
+        return self._view_model
+    
+    def get_daily_forecast(self):
+        # Aggregated once per forecast payload, renders reuse the result
+        if not self.forecast_data:
+            return []
+        if getattr(self, "_daily_forecast_source", None) is not self.forecast_data:
+            self._daily_forecast = aggregate_daily(self.forecast_data, days=FORECAST_DAYS)
+            self._daily_forecast_source = self.forecast_data
+        return self._daily_forecast
     
     def load_weather_icon(self, icon_code, label):
-        try:
-            icon_url = f"http://openweathermap.org/img/wn/{icon_code}@2x.png"
-            icon_response = requests.get(icon_url)
-            icon_response.raise_for_status()
-            
-            icon_image = Image.open(io.BytesIO(icon_response.content))
-            icon_photo = ImageTk.PhotoImage(icon_image)
+        label.icon_code = icon_code
+        icon_atlas = getattr(self, "icon_atlas", None)
+        if icon_atlas is not None and icon_code in icon_atlas:
+            icon_image = icon_atlas.ctk_image(icon_code, ICON_SIZE, label)
+            label.image = icon_image
+            self.renderer.set(label, image=icon_image, text="")
+            return
+        
+        icon_photo = self.icon_cache.get_image(icon_code)
+        if icon_photo is not None:
             label.image = icon_photo
-            label.configure(image=icon_photo, text="")
-        except Exception as e:
-            label.configure(text=f"Icon\nError", image="")
+            self.renderer.set(label, image=icon_photo, text="")
+            return
+        
+        # Placeholder until the worker pool has the icon ready
+        self.renderer.set(label, text="...", image="")
+        started = time.perf_counter()
+        self.icon_loader.load(
+            icon_code,
+            lambda image, error: self.root.after(0, lambda: self._show_icon(icon_code, label, image, error, started))
+        )
+    
+    def _show_icon(self, icon_code, label, image, error, started=None):
+        if started is not None:
+            self.metrics.observe("icon_load", time.perf_counter() - started)
+        
+        # Label moved on to another icon while this one was loading
+        if getattr(label, "icon_code", None) != icon_code:
+            return
+        
+        if error is not None:
+            self.renderer.set(label, text=f"Icon\nError", image="")
+            return
+        
+        # PhotoImage talks to Tk, so it is only ever created here on the main thread
+        icon_photo = self.icon_cache.get_image(icon_code)
+        if icon_photo is None:
+            with self.metrics.timer("icon_photo"):
+                icon_photo = ImageTk.PhotoImage(image)
+            self.icon_cache.put_image(icon_code, icon_photo)
+        label.image = icon_photo
+        self.renderer.set(label, image=icon_photo, text="")
+    
+    def _download_icon(self, icon_code):
+        with self.metrics.timer("icon_download"):
+            return self.client.get_icon(icon_code)
+    
+    def _decode_icon(self, icon_bytes):
+        with self.metrics.timer("icon_decode"):
+            icon_image = Image.open(io.BytesIO(icon_bytes))
+            icon_image.load()
+        return icon_image
     
     def toggle_unit(self):
         if self.unit_switch.get() == 1:
@@ -358,18 +748,43 @@ class WeatherApp:
         else:
             self.temp_unit = "celsius"
         
-        self.update_gui()
+        # Only the temperature labels change, everything else stays as drawn
+        self.update_temperature_labels()
     
     def convert_temperature(self, temp, unit):
-        if unit == "fahrenheit":
-            return (temp * 9/5) + 32
-        else:
-            return temp
+        return convert_temperature(temp, unit)
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Weather App")
+    parser.add_argument("--dashboard", action="store_true", help="open the multi-city dashboard on start")
+    parser.add_argument("--recent", type=int, default=5, help="number of recently viewed cities to keep")
+    parser.add_argument("--debug", action="store_true", help="show per-phase timings in the status bar (F12)")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-file", help="write Prometheus metrics to this file every 15 seconds")
+    parser.add_argument("--provider", choices=PROVIDER_NAMES, help="weather data source (default: WEATHER_PROVIDER or openweather)")
+    parser.add_argument("--fixtures", help="directory of recorded <city>.json files, implies --provider fixtures")
+    parser.add_argument("--cities", help="comma-separated cities to fetch without opening a window (for scripts and cron)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="ndjson", help="output format for --cities")
+    parser.add_argument("--parallel", type=int, default=DEFAULT_PARALLELISM, help="cities fetched at once with --cities")
+    args = parser.parse_args(argv)
+    provider = args.provider or ("fixtures" if args.fixtures else None)
+    
+    # Headless: never starts Tk, customtkinter or PIL
+    if args.cities:
+        cities = [city.strip() for city in args.cities.split(",") if city.strip()]
+        return run_batch(cities, args.format, args.parallel, provider=provider, fixtures_dir=args.fixtures)
+    
     root = ctk.CTk()
-    app = WeatherApp(root)
+    app = WeatherApp(
+        root, max_recent_cities=args.recent, debug=args.debug, provider=provider, fixtures_dir=args.fixtures
+    )
+    if args.metrics_port:
+        start_metrics_server(app.metrics, args.metrics_port)
+    if args.metrics_file:
+        start_textfile_writer(app.metrics, args.metrics_file)
+    if args.dashboard:
+        app.open_dashboard()
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,265 @@
+"""Weather data sources behind the app's fetch path.
+
+Every provider has ``fetch(city, city_id=None)`` returning an
+``(Observation, ForecastSeries)`` pair, and raises ``CityNotFoundError``
+for a city it doesn't know. ``fetch_current(cities)`` takes
+``(city, city_id)`` pairs and returns ``{city: Observation}`` for the ones
+it found, for the dashboard. Network errors are left to propagate as
+``requests`` exceptions (or ``CircuitOpenError``), as the client raises them.
+
+    openweather  /weather + /forecast, two calls per city (default)
+    onecall      One Call 3.0, one call per city once its coordinates are known
+    fixtures     JSON files on disk, for offline use and demos
+
+Pick one with ``WEATHER_PROVIDER`` (and ``WEATHER_FIXTURES`` for the fixture
+directory) or ``--provider``/``--fixtures`` on the command line. Fixtures can
+be recorded from a live provider:
+
+    python providers.py record fixtures/ London Paris Tokyo
+"""
+import argparse
+import contextlib
+import json
+import os
+import threading
+
+from models import Observation, ForecastSeries
+from response_cache import normalize_city
+
+PROVIDER_NAMES = ("openweather", "onecall", "fixtures")
+DEFAULT_PROVIDER = "openweather"
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+ONECALL_PATH = "/data/3.0/onecall"
+GEOCODE_PATH = "/geo/1.0/direct"
+
+# OpenWeather city IDs, so popular cities are fetched by ID (and in /group batches)
+CITY_IDS = {
+    "London": 2643743,
+    "New York": 5128581,
+    "Tokyo": 1850147,
+    "Paris": 2988507,
+    "Sydney": 2147714,
+    "Berlin": 2950159,
+    "Moscow": 524901,
+    "Dubai": 292223,
+    "Singapore": 1880252,
+    "Mumbai": 1275339,
+}
+
+
+class CityNotFoundError(Exception):
+    def __init__(self, city):
+        super().__init__(f"City '{city}' not found")
+        self.city = city
+
+
+class OpenWeatherProvider:
+    """Current weather and the 5 day / 3 hour forecast, fetched in parallel."""
+
+    needs_api_key = True
+
+    def __init__(self, client):
+        self.client = client
+
+    def fetch(self, city, city_id=None):
+        weather_response, forecast_response = self.client.fetch_current_and_forecast(city, city_id)
+        if weather_response.status_code == 404:
+            raise CityNotFoundError(city)
+        weather_response.raise_for_status()
+        forecast_response.raise_for_status()
+        with _timer(self.client, "json_decode"):
+            return (
+                Observation.from_json(weather_response.json()),
+                ForecastSeries.from_json(forecast_response.json()),
+            )
+
+    def fetch_current(self, cities):
+        # Cities with an ID share /group calls, the rest are fetched one by one
+        by_id = {city_id: city for city, city_id in cities if city_id is not None}
+        observations = {}
+        if by_id:
+            for item in self.client.fetch_group(list(by_id)):
+                city = by_id.get(item.get("id"))
+                if city is not None:
+                    observations[city] = Observation.from_json(item)
+        observations.update(fetch_current_each(self, [pair for pair in cities if pair[1] is None]))
+        return observations
+
+
+class OneCallProvider:
+    """Current weather and daily forecast from a single One Call request.
+
+    One Call is addressed by coordinates, so a city is located the first
+    time it's fetched and its coordinates are kept for the life of the
+    provider; every fetch after that is one API call instead of two. A city
+    with a known ID is located by ID (display labels like "Paris, US, TX"
+    aren't in the geocoder's city,state,country order), others by name.
+    Needs an API key with the One Call 3.0 subscription.
+    """
+
+    needs_api_key = True
+
+    def __init__(self, client):
+        self.client = client
+        self.api_root = client.base_url.rsplit("/data/", 1)[0]
+        self._locations = {}
+        self._lock = threading.Lock()
+
+    def locate(self, city, city_id=None):
+        key = city_id if city_id is not None else normalize_city(city)
+        with self._lock:
+            location = self._locations.get(key)
+        if location is not None:
+            return location
+
+        if city_id is not None:
+            response = self.client.get("weather", {"id": city_id})
+            if response.status_code == 404:
+                raise CityNotFoundError(city)
+            response.raise_for_status()
+            data = response.json()
+            location = {
+                "name": data.get("name", city),
+                "country": data.get("sys", {}).get("country", ""),
+                "lat": data["coord"]["lat"],
+                "lon": data["coord"]["lon"],
+            }
+        else:
+            response = self.client.get(f"{self.api_root}{GEOCODE_PATH}", {"q": city, "limit": 1})
+            response.raise_for_status()
+            matches = response.json()
+            if not matches:
+                raise CityNotFoundError(city)
+            location = matches[0]
+        with self._lock:
+            self._locations[key] = location
+        return location
+
+    def fetch(self, city, city_id=None):
+        location = self.locate(city, city_id)
+        response = self.client.get(f"{self.api_root}{ONECALL_PATH}", {
+            "lat": location["lat"], "lon": location["lon"], "exclude": "minutely,hourly,alerts",
+        })
+        response.raise_for_status()
+        with _timer(self.client, "json_decode"):
+            return parse_one_call(response.json(), location)
+
+    def fetch_current(self, cities):
+        return fetch_current_each(self, cities)
+
+
+def parse_one_call(data, location):
+    current = data.get("current", {})
+    weather = (current.get("weather") or [{}])[0]
+    observation = Observation(
+        name=location.get("name", ""),
+        country=location.get("country", ""),
+        dt=current.get("dt", 0),
+        temp=current.get("temp", 0),
+        humidity=current.get("humidity", 0),
+        pressure=current.get("pressure"),
+        wind_speed=current.get("wind_speed", 0),
+        icon=weather.get("icon", ""),
+        description=weather.get("description", ""),
+    )
+
+    # One entry per day (stamped at local noon), which aggregate_daily
+    # summarises as-is
+    series = ForecastSeries(data.get("timezone_offset", 0))
+    for day in sorted(data.get("daily", []), key=lambda day: day.get("dt", 0)):
+        temp = day.get("temp", {})
+        weather = (day.get("weather") or [{}])[0]
+        mean = temp.get("day", 0)
+        series.append(
+            day.get("dt", 0), mean, temp.get("min", mean), temp.get("max", mean),
+            day.get("rain", 0) + day.get("snow", 0),
+            weather.get("icon", ""), weather.get("description", ""),
+        )
+    return observation, series
+
+
+class FixtureProvider:
+    """Serves weather from ``<directory>/<city>.json`` files.
+
+    Each file holds ``{"weather": ..., "forecast": ...}`` in the API's own
+    format, as written by ``write_fixture``. No network, no API key.
+    """
+
+    needs_api_key = False
+
+    def __init__(self, directory=DEFAULT_FIXTURES_DIR):
+        self.directory = directory
+
+    def fetch(self, city, city_id=None):
+        try:
+            with open(fixture_path(self.directory, city), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            raise CityNotFoundError(city) from None
+        return Observation.from_json(data["weather"]), ForecastSeries.from_json(data["forecast"])
+
+    def fetch_current(self, cities):
+        return fetch_current_each(self, cities)
+
+
+def fetch_current_each(provider, cities):
+    """``fetch_current`` for providers with no batch endpoint: one fetch per city."""
+    observations = {}
+    for city, city_id in cities:
+        try:
+            observations[city] = provider.fetch(city, city_id)[0]
+        except CityNotFoundError:
+            continue
+    return observations
+
+
+def fixture_path(directory, city):
+    return os.path.join(directory, normalize_city(city).replace(" ", "_") + ".json")
+
+
+def write_fixture(directory, city, observation, forecast):
+    os.makedirs(directory, exist_ok=True)
+    with open(fixture_path(directory, city), "w", encoding="utf-8") as f:
+        json.dump({"weather": observation.to_json(), "forecast": forecast.to_json()}, f)
+
+
+def make_provider(name=DEFAULT_PROVIDER, client=None, fixtures_dir=None):
+    if name == "openweather":
+        return OpenWeatherProvider(client)
+    if name == "onecall":
+        return OneCallProvider(client)
+    if name == "fixtures":
+        return FixtureProvider(fixtures_dir or DEFAULT_FIXTURES_DIR)
+    raise ValueError(f"Unknown weather provider '{name}', expected one of: {', '.join(PROVIDER_NAMES)}")
+
+
+def _timer(client, phase):
+    metrics = getattr(client, "metrics", None)
+    return metrics.timer(phase) if metrics is not None else contextlib.nullcontext()
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+    from http_client import WeatherClient
+
+    parser = argparse.ArgumentParser(description="Record weather fixtures for offline use")
+    parser.add_argument("command", choices=["record"])
+    parser.add_argument("directory", help="where to write <city>.json files")
+    parser.add_argument("cities", nargs="+")
+    parser.add_argument("--provider", choices=["openweather", "onecall"], default=DEFAULT_PROVIDER)
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    client = WeatherClient.from_base_url(os.getenv("OPENWEATHER_API_KEY"), os.getenv("OPENWEATHER_BASE_URL"))
+    provider = make_provider(args.provider, client)
+    try:
+        for city in args.cities:
+            write_fixture(args.directory, city, *provider.fetch(city))
+            print(f"Recorded {city} -> {fixture_path(args.directory, city)}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
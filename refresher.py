@@ -0,0 +1,141 @@
+import random
+import threading
+import time
+
+from resilience import TokenBucket
+from response_cache import normalize_city
+
+# Seconds between background refreshes, by how the city is being used
+DEFAULT_INTERVALS = {
+    "current": 10 * 60,
+    "recent": 30 * 60,
+    "popular": 60 * 60,
+}
+
+# Background refreshes get their own slice of the quota: 5 a minute (10 API
+# calls, each refresh is weather + forecast), on top of what users trigger.
+# The app shares this budget with the prefetcher, hence room for a burst.
+DEFAULT_BUDGET_RATE = 5 / 60
+DEFAULT_BUDGET_BURST = 5
+
+# How often the target list is re-read even when nothing is due
+POLL_SECONDS = 30
+
+
+class AutoRefresher:
+    """Keeps weather for the current, recent and popular cities up to date.
+
+    ``targets()`` returns ``(current_city, recent_cities, popular_cities)``
+    and is re-read every time the refresher wakes up, so it follows the app
+    without being told. Each city is refreshed on the shortest interval of
+    the tiers it's in, +/- ``jitter`` so refreshes don't bunch up, and every
+    refresh spends a token from ``budget``. ``age(city)`` (seconds since
+    the last data, or None) lets a refresh be skipped when a user search
+    has just fetched the city anyway.
+
+    ``refresh(city)`` runs on the refresher's own thread.
+    """
+
+    def __init__(self, refresh, targets, age=None, intervals=None, jitter=0.2, budget=None,
+                 clock=time.monotonic, random=random.random):
+        self.refresh = refresh
+        self.targets = targets
+        self.age = age
+        self.intervals = dict(DEFAULT_INTERVALS, **(intervals or {}))
+        self.jitter = jitter
+        self.budget = budget or TokenBucket(DEFAULT_BUDGET_RATE, DEFAULT_BUDGET_BURST, clock=clock)
+        self.clock = clock
+        self.random = random
+        self.stats = {"refreshed": 0, "skipped": 0, "deferred": 0, "failed": 0}
+        # normalized city -> [next_at, interval, city]
+        self._schedule = {}
+        self._wakeup = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def update_targets(self):
+        current, recent, popular = self.targets()
+        wanted = {}
+        for tier, cities in (("popular", popular), ("recent", recent), ("current", [current] if current else [])):
+            interval = self.intervals[tier]
+            for city in list(cities):
+                key = normalize_city(city)
+                if key not in wanted or interval < wanted[key][1]:
+                    wanted[key] = (city, interval)
+
+        now = self.clock()
+        with self._wakeup:
+            schedule = {}
+            for key, (city, interval) in wanted.items():
+                entry = self._schedule.get(key)
+                if entry is None:
+                    # First refresh lands anywhere in the interval, not all at once
+                    next_at = now + interval * self.random()
+                else:
+                    # Moving to a shorter interval pulls the next refresh in
+                    next_at = min(entry[0], now + self._jittered(interval))
+                schedule[key] = [next_at, interval, city]
+            self._schedule = schedule
+
+    def run_pending(self):
+        """Refresh every city that is due; returns seconds until the next one."""
+        self.update_targets()
+        now = self.clock()
+        with self._wakeup:
+            due = sorted(
+                (entry[0], key, entry[1], entry[2])
+                for key, entry in self._schedule.items() if entry[0] <= now
+            )
+
+        for _, key, interval, city in due:
+            age = self.age(city) if self.age is not None else None
+            if age is not None and age < interval / 2:
+                # Fetched recently by someone else, count the interval from then
+                self.stats["skipped"] += 1
+                self._reschedule(key, self._jittered(interval) - age)
+                continue
+            if not self.budget.acquire(timeout=0):
+                self.stats["deferred"] += 1
+                self._reschedule(key, 1 / self.budget.rate)
+                continue
+            try:
+                self.refresh(city)
+                self.stats["refreshed"] += 1
+            except Exception:
+                # Cached data stays as it was; the client's breaker handles outages
+                self.stats["failed"] += 1
+            self._reschedule(key, self._jittered(interval))
+
+        with self._wakeup:
+            if not self._schedule:
+                return POLL_SECONDS
+            return max(0.0, min(entry[0] for entry in self._schedule.values()) - self.clock())
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="auto-refresh", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify_all()
+
+    def _run(self):
+        while True:
+            wait = self.run_pending()
+            with self._wakeup:
+                if self._stopped:
+                    return
+                self._wakeup.wait(min(wait, POLL_SECONDS))
+                if self._stopped:
+                    return
+
+    def _reschedule(self, key, delay):
+        with self._wakeup:
+            entry = self._schedule.get(key)
+            if entry is not None:
+                entry[0] = self.clock() + max(0.0, delay)
+
+    def _jittered(self, interval):
+        return interval * (1 + self.jitter * (2 * self.random() - 1))
@@ -0,0 +1,70 @@
+from lazy_import import lazy_module
+
+tkinter = lazy_module("tkinter")
+
+
+class Renderer:
+    """Batches widget updates into a single Tk callback and skips no-op configures.
+
+    ``set`` records the options a widget should have. The first change after
+    a flush schedules one ``root.after(0, flush)``; every later change in the
+    same frame just joins it. On flush each widget is configured only with the
+    options that differ from what the renderer last gave it.
+
+    Widgets managed here should only be configured through the renderer,
+    otherwise its idea of what is on screen goes stale. A widget that was
+    destroyed before its update is flushed is dropped; the rest of the frame
+    still goes out.
+
+    With ``metrics`` set, each flush is recorded as ``render_flush``, which is
+    where the Tk ``configure`` calls happen.
+    """
+
+    def __init__(self, root, metrics=None):
+        self.root = root
+        self.metrics = metrics
+        self._pending = {}
+        self._rendered = {}
+        self._scheduled = False
+        self.frames = 0
+        self.configure_calls = 0
+
+    def set(self, widget, **options):
+        self._pending.setdefault(widget, {}).update(options)
+        if not self._scheduled:
+            self._scheduled = True
+            self.root.after(0, self.flush)
+
+    def flush(self):
+        if self.metrics is not None:
+            with self.metrics.timer("render_flush"):
+                self._flush()
+        else:
+            self._flush()
+
+    def _flush(self):
+        pending, self._pending = self._pending, {}
+        self._scheduled = False
+        self.frames += 1
+
+        for widget, options in pending.items():
+            rendered = self._rendered.setdefault(widget, {})
+            changed = {
+                key: value for key, value in options.items()
+                if key not in rendered or rendered[key] is not value and rendered[key] != value
+            }
+            if not changed:
+                continue
+            try:
+                widget.configure(**changed)
+            except tkinter.TclError:
+                # Destroyed (e.g. its window was closed) since the update was queued
+                self.forget(widget)
+                continue
+            rendered.update(changed)
+            self.configure_calls += 1
+
+    def forget(self, widget):
+        # For widgets that are destroyed or configured elsewhere
+        self._pending.pop(widget, None)
+        self._rendered.pop(widget, None)
@@ -0,0 +1,157 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from threading import Condition, Lock
+
+# OpenWeather's free tier allows 60 calls a minute. A burst of 10 on top of
+# 50/min keeps any sliding minute under that.
+DEFAULT_RATE = 50 / 60
+DEFAULT_BURST = 10
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that has been failing."""
+
+    def __init__(self, retry_in):
+        super().__init__(f"Weather service unavailable, retrying in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens a second, up to ``capacity`` saved up.
+
+    ``acquire`` blocks until a token is free. ``pause`` empties the bucket
+    for a while, e.g. when the server answers 429 with ``Retry-After``, so
+    every thread backs off together.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=DEFAULT_BURST, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._condition = Condition(Lock())
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else self.clock() + timeout
+        with self._condition:
+            while True:
+                now = self.clock()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+                if deadline is not None:
+                    if now + wait > deadline:
+                        return False
+                self._condition.wait(wait)
+
+    def pause(self, seconds):
+        with self._condition:
+            now = self.clock()
+            self._refill(now)
+            self._tokens = 0.0
+            self._paused_until = max(self._paused_until, now + seconds)
+
+    def available(self):
+        with self._condition:
+            self._refill(self.clock())
+            return self._tokens
+
+    def _refill(self, now):
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, deferring to ``Retry-After`` when sent.
+
+    A ``Retry-After`` longer than ``max_retry_after`` isn't waited out on a
+    fetch thread; the request gives up and the caller falls back to cache.
+    """
+
+    def __init__(self, attempts=3, base_delay=0.5, max_delay=8.0, max_retry_after=10.0,
+                 statuses=RETRY_STATUSES, sleep=time.sleep, random=random.random):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.statuses = statuses
+        self.sleep = sleep
+        self.random = random
+
+    def backoff(self, attempt):
+        return self.random() * min(self.max_delay, self.base_delay * 2 ** attempt)
+
+    def delay(self, attempt, response=None):
+        """Seconds to wait before the next attempt, or None to stop retrying."""
+        if attempt + 1 >= self.attempts:
+            return None
+        retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+        if retry_after is None:
+            return self.backoff(attempt)
+        return retry_after if retry_after <= self.max_retry_after else None
+
+
+def parse_retry_after(value, now=None):
+    # Either a number of seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after ``failure_threshold`` failures in a row.
+
+    Once open, calls are refused for ``reset_timeout`` seconds, then a single
+    trial call is let through (half-open): success closes the circuit again,
+    failure re-opens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            retry_in = self._opened_at + self.reset_timeout - self.clock()
+            if self.state == self.OPEN and retry_in <= 0:
+                # This caller is the trial, everyone else keeps waiting
+                self.state = self.HALF_OPEN
+                return
+            raise CircuitOpenError(max(retry_in, 0.0))
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self.clock()
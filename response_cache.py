@@ -0,0 +1,71 @@
+import time
+from threading import Lock
+
+# Seconds before an entry counts as stale, per endpoint
+DEFAULT_TTLS = {
+    "weather": 10 * 60,
+    "forecast": 30 * 60,
+    # Negative entry for a city the API said doesn't exist; only used while fresh
+    "not_found": 5 * 60,
+}
+
+# Stale entries are still served (and refreshed) for this long
+DEFAULT_MAX_STALE = 6 * 60 * 60
+
+
+def normalize_city(city):
+    return " ".join(city.split()).casefold()
+
+
+class ResponseCache:
+    """In-memory cache of API payloads keyed on (normalized city, endpoint).
+
+    ``get`` returns ``(data, fresh)``. A fresh entry can be used as-is; a
+    stale one should be drawn straight away and refreshed in the background
+    (stale-while-revalidate). Entries older than ``ttl + max_stale`` are
+    dropped.
+    """
+
+    def __init__(self, ttls=None, max_stale=DEFAULT_MAX_STALE, clock=time.monotonic):
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_stale = max_stale
+        self.clock = clock
+        self._entries = {}
+        self._lock = Lock()
+
+    def get(self, city, endpoint):
+        key = (normalize_city(city), endpoint)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            data, stored_at = entry
+            age = self.clock() - stored_at
+            ttl = self.ttls.get(endpoint, 0)
+            if age > ttl + self.max_stale:
+                del self._entries[key]
+                return None, False
+            return data, age <= ttl
+
+    def age(self, city, endpoint):
+        # Seconds since the entry was stored, None if there isn't one
+        with self._lock:
+            entry = self._entries.get((normalize_city(city), endpoint))
+            return None if entry is None else self.clock() - entry[1]
+
+    def put(self, city, endpoint, data):
+        with self._lock:
+            self._entries[(normalize_city(city), endpoint)] = (data, self.clock())
+
+    def invalidate(self, city=None):
+        with self._lock:
+            if city is None:
+                self._entries.clear()
+                return
+            name = normalize_city(city)
+            for key in [key for key in self._entries if key[0] == name]:
+                del self._entries[key]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import RLock
+
+
+class FetchTicket:
+    """Handle given to a scheduled fetch so it can tell whether it's still wanted."""
+
+    def __init__(self, scheduler, key, generation):
+        self.scheduler = scheduler
+        self.key = key
+        self.generation = generation
+
+    def is_current(self):
+        return self.scheduler.is_current(self)
+
+
+class FetchScheduler:
+    """Latest-wins scheduler for weather fetches.
+
+    Every ``submit`` starts a new generation; only the ticket holding the
+    newest generation is current, so results from superseded requests can be
+    dropped. Queued work that has been superseded is cancelled before it
+    starts, a duplicate request for a key that is already in flight is
+    coalesced onto that job, and at most ``max_in_flight`` jobs run at once.
+    """
+
+    def __init__(self, max_in_flight=2):
+        self.max_in_flight = max_in_flight
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="weather-fetch")
+        # Re-entrant: cancelling a future runs its done callback under the lock
+        self._lock = RLock()
+        self._generation = 0
+        self._jobs = {}
+
+    def submit(self, key, func):
+        with self._lock:
+            self._generation += 1
+
+            # Same request already queued or running, let it carry the new generation
+            job = self._jobs.get(key)
+            if job is not None:
+                ticket, future = job
+                ticket.generation = self._generation
+                self._cancel_queued(keep=key)
+                return ticket
+
+            self._cancel_queued()
+            ticket = FetchTicket(self, key, self._generation)
+            future = self._executor.submit(func, ticket)
+            self._jobs[key] = (ticket, future)
+        future.add_done_callback(lambda f: self._done(key, f))
+        return ticket
+
+    def supersede(self):
+        # Makes every outstanding ticket stale, e.g. when the UI drew from cache
+        with self._lock:
+            self._generation += 1
+            self._cancel_queued()
+
+    def is_current(self, ticket):
+        with self._lock:
+            return ticket.generation == self._generation
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._jobs)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _cancel_queued(self, keep=None):
+        for key, (ticket, future) in list(self._jobs.items()):
+            if key != keep and future.cancel():
+                self._jobs.pop(key, None)
+
+    def _done(self, key, future):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job[1] is future:
+                del self._jobs[key]
@@ -0,0 +1,86 @@
+import base64
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, get_ident
+
+from icon_cache import DEFAULT_CACHE_DIR
+
+SNAPSHOT_VERSION = 1
+
+
+def default_snapshot_path(cache_dir=None):
+    return os.path.join(cache_dir or DEFAULT_CACHE_DIR, "snapshot.json.gz")
+
+
+def save_snapshot(path, city, weather_data, forecast_data, icons=None, saved_at=None, city_id=None):
+    """Write the last rendered state as gzipped JSON (icons as base64 PNG).
+
+    ``city_id`` is the OpenWeather ID ``city`` was picked by, if any, so the
+    next run fetches the same place instead of looking the label up by name.
+    """
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "saved_at": int(time.time() if saved_at is None else saved_at),
+        "city": city,
+        "city_id": city_id,
+        "weather": weather_data,
+        "forecast": forecast_data,
+        "icons": {
+            code: base64.b64encode(data).decode("ascii")
+            for code, data in (icons or {}).items()
+        },
+    }
+    data = gzip.compress(json.dumps(snapshot, separators=(",", ":")).encode("utf-8"), compresslevel=6)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path):
+    """Return the saved snapshot dict (icons decoded to bytes), or None."""
+    try:
+        with open(path, "rb") as f:
+            snapshot = json.loads(gzip.decompress(f.read()).decode("utf-8"))
+        if snapshot.get("version") != SNAPSHOT_VERSION or not snapshot.get("weather"):
+            return None
+        snapshot["icons"] = {
+            code: base64.b64decode(data) for code, data in snapshot.get("icons", {}).items()
+        }
+        return snapshot
+    except (OSError, EOFError, ValueError, AttributeError):
+        return None
+
+
+class SnapshotWriter:
+    """Calls ``write`` on one background thread, keeping only the latest state.
+
+    ``save`` never blocks. States saved while a write is running are
+    coalesced: the next write gets the most recent one, the rest are dropped.
+    """
+
+    def __init__(self, write):
+        self.write = write
+        self._pending = None
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshot")
+
+    def save(self, *args):
+        with self._lock:
+            scheduled = self._pending is not None
+            self._pending = args
+        if not scheduled:
+            self._executor.submit(self._run)
+
+    def _run(self):
+        with self._lock:
+            args, self._pending = self._pending, None
+        self.write(*args)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,125 @@
+import json
+import os
+import sqlite3
+import time
+from threading import Lock
+
+from icon_cache import DEFAULT_CACHE_DIR
+from response_cache import normalize_city
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY,
+    city TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    observed_at INTEGER NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS observations_city_kind_time
+    ON observations (city, kind, observed_at);
+"""
+
+# Forecasts are kept this many days (a refresh stores a whole new one);
+# observations are small and kept for good
+RETENTION_DAYS = {"forecast": 7}
+
+
+def default_store_path(cache_dir=None):
+    return os.path.join(cache_dir or DEFAULT_CACHE_DIR, "observations.db")
+
+
+class ObservationStore:
+    """SQLite (WAL mode) history of every weather and forecast payload.
+
+    Rows are keyed on (normalized city, kind, observed_at) and indexed for
+    range queries such as "last 24h for London". ``kind`` is the endpoint the
+    payload came from, e.g. ``"weather"`` or ``"forecast"``. Observations use
+    the payload's own ``dt``; forecasts use the time they were fetched.
+
+    A payload identical to the city's latest one isn't stored again, and
+    kinds in ``RETENTION_DAYS`` are pruned as new rows come in.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_store_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(SCHEMA)
+
+    def record(self, city, kind, payload, fetched_at=None):
+        fetched_at = int(time.time() if fetched_at is None else fetched_at)
+        observed_at = payload.get("dt", fetched_at) if kind == "weather" else fetched_at
+        city = normalize_city(city)
+        payload = json.dumps(payload, separators=(",", ":"))
+        with self._lock, self._connection:
+            latest = self._connection.execute(
+                "SELECT payload FROM observations WHERE city = ? AND kind = ? "
+                "ORDER BY observed_at DESC LIMIT 1",
+                (city, kind)
+            ).fetchone()
+            if latest is not None and latest[0] == payload:
+                # Unchanged (e.g. revalidated with a 304), nothing new to keep
+                return False
+            self._connection.execute(
+                "INSERT OR REPLACE INTO observations (city, kind, observed_at, fetched_at, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (city, kind, int(observed_at), fetched_at, payload)
+            )
+            if kind in RETENTION_DAYS:
+                self._connection.execute(
+                    "DELETE FROM observations WHERE city = ? AND kind = ? AND observed_at < ?",
+                    (city, kind, fetched_at - RETENTION_DAYS[kind] * 86400)
+                )
+        return True
+
+    def prune(self, now=None):
+        """Drop rows past their kind's retention, for every city; returns how many."""
+        now = int(time.time() if now is None else now)
+        deleted = 0
+        with self._lock, self._connection:
+            for kind, days in RETENTION_DAYS.items():
+                deleted += self._connection.execute(
+                    "DELETE FROM observations WHERE kind = ? AND observed_at < ?",
+                    (kind, now - days * 86400)
+                ).rowcount
+        return deleted
+
+    def range(self, city, kind="weather", since=None, until=None):
+        since = 0 if since is None else int(since)
+        until = int(time.time()) if until is None else int(until)
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT observed_at, payload FROM observations "
+                "WHERE city = ? AND kind = ? AND observed_at BETWEEN ? AND ? "
+                "ORDER BY observed_at",
+                (normalize_city(city), kind, since, until)
+            ).fetchall()
+        return [(observed_at, json.loads(payload)) for observed_at, payload in rows]
+
+    def history(self, city, hours=24, kind="weather", now=None):
+        now = time.time() if now is None else now
+        return self.range(city, kind, since=now - hours * 3600, until=now)
+
+    def latest(self, city, kind="weather"):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT payload FROM observations WHERE city = ? AND kind = ? "
+                "ORDER BY observed_at DESC LIMIT 1",
+                (normalize_city(city), kind)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def cities(self):
+        with self._lock:
+            rows = self._connection.execute("SELECT DISTINCT city FROM observations ORDER BY city").fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from batch import fetch_many, to_record, to_records, write_records, run_batch
+from fake_server import start_server
+from models import Observation, ForecastSeries
+from providers import CityNotFoundError, write_fixture
+
+class SlowService:
+    def __init__(self, delays):
+        self.delays = delays
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def fetch_city(self, city):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delays[city])
+        with self.lock:
+            self.running -= 1
+        if city == "Atlantis":
+            raise CityNotFoundError(city)
+        if city == "Garbled":
+            raise KeyError("main")
+        return Observation(name=city, temp=20), ForecastSeries()
+
+def test_fetch_many_streams_in_completion_order():
+    service = SlowService({"London": 0.2, "Tokyo": 0.01, "Atlantis": 0.05})
+
+    results = list(fetch_many(service, ["London", "Tokyo", "Atlantis"], parallelism=3))
+
+    assert [city for city, *_ in results] == ["Tokyo", "Atlantis", "London"]
+    assert results[1][3] == "City 'Atlantis' not found"
+    assert results[2][1].name == "London"
+
+def test_fetch_many_respects_parallelism():
+    cities = [f"City {i}" for i in range(8)]
+    service = SlowService({city: 0.02 for city in cities})
+
+    assert len(list(fetch_many(service, cities, parallelism=2))) == 8
+    assert service.max_running == 2
+
+def test_one_bad_payload_does_not_stop_the_rest():
+    service = SlowService({"Garbled": 0.01, "London": 0.05})
+
+    results = {city: error for city, _, _, error in fetch_many(service, ["Garbled", "London"])}
+
+    assert results == {"Garbled": "KeyError: 'main'", "London": None}
+
+def test_record_that_fails_to_build_becomes_an_error():
+    results = [("London", Observation(name="London"), None, None)]
+
+    record, = to_records(results)
+
+    assert record["city"] == "London"
+    assert record["error"].startswith("AttributeError")
+
+def records():
+    return [
+        to_record("London", Observation(name="London", country="GB", temp=11.5, icon="10d"), ForecastSeries()),
+        to_record("Atlantis", None, None, "City 'Atlantis' not found"),
+    ]
+
+def test_ndjson_is_one_record_per_line():
+    out = io.StringIO()
+
+    assert write_records(records(), out, "ndjson") == 1
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert (lines[0]["name"], lines[0]["temp"], lines[0]["forecast"]) == ("London", 11.5, [])
+    assert lines[1] == {"city": "Atlantis", "error": "City 'Atlantis' not found"}
+
+def test_json_is_an_array():
+    out = io.StringIO()
+    write_records(records(), out, "json")
+
+    assert [record["city"] for record in json.loads(out.getvalue())] == ["London", "Atlantis"]
+
+def test_json_with_no_cities():
+    out = io.StringIO()
+    write_records([], out, "json")
+
+    assert json.loads(out.getvalue()) == []
+
+def test_json_array_is_closed_when_the_stream_breaks():
+    def broken():
+        yield records()[0]
+        raise KeyboardInterrupt
+
+    out = io.StringIO()
+    with pytest.raises(KeyboardInterrupt):
+        write_records(broken(), out, "json")
+
+    assert [record["city"] for record in json.loads(out.getvalue())] == ["London"]
+
+def test_csv_has_header_and_flat_rows():
+    out = io.StringIO()
+    write_records(records(), out, "csv")
+
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert (rows[0]["city"], rows[0]["temp"], rows[0]["icon"], rows[0]["error"]) == ("London", "11.5", "10d", "")
+    assert (rows[1]["city"], rows[1]["temp"], rows[1]["error"]) == ("Atlantis", "", "City 'Atlantis' not found")
+    assert "forecast" not in rows[0]
+
+def test_run_batch_against_stand_in_server(tmp_path):
+    server = start_server(seed=1, unknown_cities=["Atlantis"])
+    out = io.StringIO()
+    try:
+        with patch.dict(os.environ, {
+            "OPENWEATHER_API_KEY": "dummy_api_key",
+            "OPENWEATHER_BASE_URL": server.base_url,
+            "WEATHER_CACHE_DIR": str(tmp_path),
+            "WEATHER_PROVIDER": "openweather",
+        }):
+            status = run_batch(["London", "Atlantis", "Tokyo"], "ndjson", 2, out=out)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    results = {record["city"]: record for record in map(json.loads, out.getvalue().splitlines())}
+    assert status == 1
+    assert results["Atlantis"]["error"] == "City 'Atlantis' not found"
+    assert results["Tokyo"]["name"] == "Tokyo"
+    assert len(results["London"]["forecast"]) == 3
+
+def test_cities_command_never_loads_gui_modules(tmp_path):
+    """Test the headless command works without customtkinter, Tk or PIL"""
+    write_fixture(str(tmp_path), "London", Observation(name="London", temp=9), ForecastSeries())
+    script = (
+        "import sys, project\n"
+        f"status = project.main(['--cities', 'London', '--fixtures', {str(tmp_path)!r}])\n"
+        "print(status, sorted(m for m in ('customtkinter', 'tkinter', 'PIL') if m in sys.modules), file=sys.stderr)"
+    )
+    env = dict(os.environ, WEATHER_CACHE_DIR=str(tmp_path))
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True, env=env)
+
+    assert json.loads(result.stdout)["name"] == "London"
+    assert result.stderr.strip() == "0 []"
+
+def test_headless_core_does_not_import_the_dashboard():
+    script = "import sys, batch, fake_server\nprint('dashboard' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,94 @@
+import pytest
+from unittest.mock import MagicMock
+from city_index import CityIndex, City, build_index, fold
+from http_client import WeatherClient
+from project import WeatherApp, SUGGEST_DELAY_MS
+
+CITIES = [
+    {"id": 2988507, "name": "Paris", "country": "FR"},
+    {"id": 4717560, "name": "Paris", "country": "US", "state": "TX"},
+    {"id": 2643743, "name": "London", "country": "GB"},
+    {"id": 6058560, "name": "London", "country": "CA"},
+    {"id": 3448439, "name": "São Paulo", "country": "BR"},
+    {"id": 2950159, "name": "Berlin", "country": "DE"},
+    {"id": 1850147, "name": "Tokyo", "country": "JP"},
+    {"id": 0, "name": "   "},
+]
+
+@pytest.fixture
+def index(tmp_path):
+    path = str(tmp_path / "cities.idx")
+    assert build_index(CITIES, path) == 7
+    index = CityIndex(path)
+    yield index
+    index.close()
+
+def test_fold_ignores_case_and_accents():
+    assert fold("São  Paulo") == "sao paulo"
+    assert fold("ZÜRICH") == "zurich"
+
+def test_prefix_search(index):
+    assert [city.label for city in index.prefix("par")] == ["Paris, FR", "Paris, US, TX"]
+    assert [city.name for city in index.prefix("sao p")] == ["São Paulo"]
+    assert index.prefix("lon", limit=1) == [City(6058560, "London")]
+    assert index.prefix("xyz") == []
+    assert index.prefix("") == []
+
+def test_fuzzy_search_finds_one_typo(index):
+    assert [city.id for city in index.search("pariss")] == [2988507, 4717560]
+    assert [city.name for city in index.search("lodnon")] == ["London", "London"]
+    assert [city.name for city in index.search("berlni")] == ["Berlin"]
+    # Too short to guess from
+    assert index.search("qz") == []
+
+def test_rejects_unknown_file(tmp_path):
+    path = tmp_path / "cities.idx"
+    path.write_bytes(b"JUNK" + bytes(64))
+
+    with pytest.raises(ValueError):
+        CityIndex(str(path))
+
+def test_client_fetches_by_id():
+    client = WeatherClient("dummy_api_key")
+    client.get = MagicMock()
+
+    client.fetch_current_and_forecast("Paris, US, TX", 4717560)
+
+    assert {call.args[1]["id"] for call in client.get.call_args_list} == {4717560}
+
+@pytest.fixture
+def weather_app(index):
+    app = WeatherApp.__new__(WeatherApp)
+    app.root = MagicMock()
+    app.renderer = MagicMock()
+    app.city_index = index
+    app.city_ids = {}
+    app.city_entry = MagicMock()
+    app.suggestions = []
+    app.suggestion_buttons = []
+    app._suggest_job = None
+    app.select_city = MagicMock()
+    return app
+
+def test_typing_is_debounced(weather_app):
+    weather_app.root.after.side_effect = ["job1", "job2"]
+    weather_app._on_entry_key(MagicMock(keysym="p"))
+    weather_app._on_entry_key(MagicMock(keysym="a"))
+
+    weather_app.root.after_cancel.assert_called_once_with("job1")
+    weather_app.root.after.assert_called_with(SUGGEST_DELAY_MS, weather_app.update_suggestions)
+
+def test_short_text_shows_no_suggestions(weather_app):
+    weather_app.city_entry.get.return_value = "p"
+    weather_app.update_suggestions()
+
+    assert weather_app.suggestions == []
+
+def test_select_suggestion_fetches_by_id(weather_app):
+    weather_app.suggestions = weather_app.city_index.prefix("paris")
+    weather_app.suggestion_frame = MagicMock()
+    weather_app.select_suggestion(1)
+
+    assert weather_app.city_ids == {"paris, us, tx": 4717560}
+    weather_app.select_city.assert_called_once_with("Paris, US, TX")
+    weather_app.suggestion_frame.place_forget.assert_called_once()
@@ -1,6 +1,9 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from project import WeatherApp
+from renderer import Renderer
+from response_cache import ResponseCache
+from metrics import PhaseMetrics
 
 class MockWidget:
     def __init__(self, **kwargs):
@@ -29,6 +32,13 @@ class MockWidget:
     
     def winfo_children(self):
         return self.children
+    
+    def bind(self, sequence, func):
+        self.bindings = getattr(self, "bindings", {})
+        self.bindings[sequence] = func
+    
+    def pack_forget(self):
+        pass
 
 class MockRoot:
     def __init__(self):
@@ -55,6 +65,8 @@ def weather_app():
         app = WeatherApp.__new__(WeatherApp)
         
         app.root = root
+        app.metrics = PhaseMetrics()
+        app.renderer = Renderer(root)
         app.api_key = "dummy_api_key"
         app.city = "London"
         app.temp_unit = "celsius"
@@ -66,6 +78,8 @@ def weather_app():
         app.recent_cities = []
         app.city_entry = MockWidget()
         app.fetch_weather = MagicMock()
+        app.response_cache = ResponseCache()
+        app.prefetcher = MagicMock()
         app.recent_cities_container = MockWidget()
         app.add_to_recent_cities = MagicMock()
         
@@ -78,6 +92,7 @@ def test_select_city(weather_app):
     assert weather_app.status_label.config_params.get("text") == "Selected Paris"
     weather_app.fetch_weather.assert_called_once()
     weather_app.add_to_recent_cities.assert_called_once_with("Paris")
+    weather_app.prefetcher.record_selection.assert_called_once_with("Paris", "miss")
 
 def test_add_to_recent_cities_new_city(weather_app):
     weather_app.add_to_recent_cities = lambda city: weather_app.recent_cities.insert(0, city)
@@ -118,4 +133,47 @@ def test_search_city_empty(weather_app):
     
     assert weather_app.status_label.config_params.get("text") == "Please enter a city name"
     weather_app.fetch_weather.assert_not_called()
-    weather_app.add_to_recent_cities.assert_not_called()
\ No newline at end of file
+    weather_app.add_to_recent_cities.assert_not_called()
+
+@pytest.fixture
+def recents_app():
+    root = MockRoot()
+    app = WeatherApp.__new__(WeatherApp)
+    app.root = root
+    app.metrics = PhaseMetrics()
+    app.renderer = Renderer(root)
+    app.max_recent_cities = 3
+    app.recent_cities = []
+    app.recent_city_buttons = []
+    app.visible_recent_buttons = 0
+    app.recent_cities_container = MockWidget()
+    app.select_city = MagicMock()
+    return app
+
+def test_recent_city_buttons_are_reused(recents_app):
+    """Test the recents bar updates its buttons in place instead of rebuilding them"""
+    with patch('customtkinter.CTkButton', side_effect=lambda *args, **kwargs: MockWidget()) as mock_button:
+        for city in ["London", "Paris", "Tokyo", "Berlin", "Dubai", "Paris"]:
+            recents_app.add_to_recent_cities(city)
+    
+    assert mock_button.call_count == 3
+    assert recents_app.recent_cities == ["Paris", "Dubai", "Berlin"]
+    texts = [button.config_params["text"] for button in recents_app.recent_city_buttons]
+    assert texts == ["Paris", "Dubai", "Berlin"]
+
+def test_recent_city_limit_is_configurable(recents_app):
+    recents_app.max_recent_cities = 7
+    with patch('customtkinter.CTkButton', side_effect=lambda *args, **kwargs: MockWidget()):
+        for i in range(10):
+            recents_app.add_to_recent_cities(f"City {i}")
+    
+    assert len(recents_app.recent_cities) == 7
+    assert len(recents_app.recent_city_buttons) == 7
+
+def test_recent_city_button_selects_current_city_in_slot(recents_app):
+    with patch('customtkinter.CTkButton', side_effect=lambda *args, **kwargs: MockWidget()):
+        recents_app.add_to_recent_cities("London")
+        recents_app.add_to_recent_cities("Paris")
+    
+    recents_app.select_recent_city(1)
+    recents_app.select_city.assert_called_once_with("London")
@@ -0,0 +1,181 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from http_client import WeatherClient
+from response_cache import ResponseCache
+from renderer import Renderer
+from metrics import PhaseMetrics
+from dashboard import Dashboard, CityTile
+from providers import OpenWeatherProvider, FixtureProvider, write_fixture, CITY_IDS
+from response_cache import normalize_city
+from models import Observation, ForecastSeries
+from resilience import CircuitOpenError
+from store import ObservationStore
+from weather_service import WeatherService
+
+class MockResponse:
+    def __init__(self, json_data, status_code=200):
+        self.json_data = json_data
+        self.status_code = status_code
+        self.headers = {}
+    
+    def json(self):
+        return self.json_data
+    
+    def raise_for_status(self):
+        pass
+
+class MockLabel:
+    def __init__(self):
+        self.text = ""
+    
+    def configure(self, text=None, image=None):
+        if text is not None:
+            self.text = text
+
+class MockRoot:
+    def after(self, ms, func):
+        if callable(func):
+            func()
+
+def group_response(url, params, timeout):
+    ids = params["id"].split(",")
+    return MockResponse({"list": [
+        {"id": int(city_id), "main": {"temp": 20}, "weather": [{"icon": "01d", "description": "clear sky"}]}
+        for city_id in ids
+    ]})
+
+@pytest.fixture
+def dashboard():
+    app = MagicMock()
+    app.root = MockRoot()
+    app.metrics = PhaseMetrics()
+    app.renderer = Renderer(app.root)
+    app.client = WeatherClient("dummy_api_key")
+    app.provider = OpenWeatherProvider(app.client)
+    app.city_ids = {normalize_city(name): city_id for name, city_id in CITY_IDS.items()}
+    app.response_cache = ResponseCache()
+    app.store = ObservationStore(":memory:")
+    app.last_good = lambda city, kind: WeatherService.last_good(app, city, kind)
+    app.temp_unit = "celsius"
+    app.convert_temperature = lambda temp, unit: (temp * 9/5) + 32
+    
+    dashboard = Dashboard.__new__(Dashboard)
+    dashboard.app = app
+    dashboard.cities = list(CITY_IDS)
+    dashboard.status_label = MockLabel()
+    dashboard.closed = False
+    dashboard.window = MagicMock()
+    dashboard.tiles = []
+    for city in dashboard.cities:
+        tile = CityTile.__new__(CityTile)
+        tile.city = city
+        tile.icon_label = MockLabel()
+        tile.temp_label = MockLabel()
+        tile.desc_label = MockLabel()
+        dashboard.tiles.append(tile)
+    return dashboard
+
+def test_popular_cities_fit_in_one_group_call():
+    """Test ten cities are fetched with a single upstream request"""
+    client = WeatherClient("dummy_api_key")
+    with patch('requests.Session.get', side_effect=group_response) as mock_get:
+        results = client.fetch_group(CITY_IDS.values())
+    
+    assert mock_get.call_count == 1
+    assert len(results) == 10
+    assert mock_get.call_args[0][0].endswith("/group")
+
+def test_group_fetch_is_chunked():
+    """Test more than 20 IDs are split across calls"""
+    client = WeatherClient("dummy_api_key")
+    with patch('requests.Session.get', side_effect=group_response) as mock_get:
+        results = client.fetch_group(range(1, 46))
+    
+    assert mock_get.call_count == 3
+    assert sorted(item["id"] for item in results) == list(range(1, 46))
+    assert all(len(call.kwargs["params"]["id"].split(",")) <= 20 for call in mock_get.call_args_list)
+
+def test_refresh_fills_tiles_and_cache(dashboard):
+    with patch('requests.Session.get', side_effect=group_response):
+        dashboard._refresh_thread(dashboard.city_pairs())
+    
+    assert all(tile.temp_label.text == "20°C" for tile in dashboard.tiles)
+    assert dashboard.tiles[0].desc_label.text == "Clear sky"
+    assert dashboard.status_label.text == "Updated 10 of 10 cities"
+    assert dashboard.app.record_observation.call_count == 10
+    city, kind, data = dashboard.app.record_observation.call_args_list[0].args
+    assert (city, kind, data.id) == ("London", "weather", CITY_IDS["London"])
+
+def test_cities_without_an_id_are_fetched_one_by_one(dashboard):
+    dashboard.cities.append("Lisbon")
+    dashboard.tiles.append(CityTile.__new__(CityTile))
+    tile = dashboard.tiles[-1]
+    tile.city, tile.icon_label, tile.temp_label, tile.desc_label = "Lisbon", MockLabel(), MockLabel(), MockLabel()
+    weather = MockResponse({"name": "Lisbon", "main": {"temp": 24}, "weather": [{"icon": "01d", "description": "sunny"}]})
+    forecast = MockResponse({"list": [], "city": {"timezone": 0}})
+    
+    def get(url, params, timeout):
+        if url.endswith("/group"):
+            return group_response(url, params, timeout)
+        return weather if url.endswith("/weather") else forecast
+    
+    with patch('requests.Session.get', side_effect=get) as mock_get:
+        dashboard._refresh_thread(dashboard.city_pairs())
+    
+    assert tile.temp_label.text == "24°C"
+    assert dashboard.status_label.text == "Updated 11 of 11 cities"
+    assert mock_get.call_count == 3
+
+def test_fixture_provider_refresh_stays_offline(dashboard, tmp_path):
+    write_fixture(tmp_path, "London", Observation(name="London", temp=15, icon="10d", description="rain"),
+                  ForecastSeries(0))
+    dashboard.app.provider = FixtureProvider(str(tmp_path))
+    
+    with patch('requests.Session.get') as mock_get:
+        dashboard._refresh_thread(dashboard.city_pairs())
+    
+    mock_get.assert_not_called()
+    assert dashboard.tiles[0].temp_label.text == "15°C"
+    assert dashboard.tiles[1].desc_label.text == "No data"
+    assert dashboard.status_label.text == "Updated 1 of 10 cities"
+
+def test_render_fahrenheit_and_missing_city(dashboard):
+    dashboard.app.temp_unit = "fahrenheit"
+    dashboard.render({"London": Observation(temp=0, icon="01d", description="snow")})
+    
+    assert dashboard.tiles[0].temp_label.text == "32°F"
+    assert dashboard.tiles[1].desc_label.text == "No data"
+
+def test_open_circuit_shows_saved_tiles(dashboard):
+    dashboard.app.response_cache.put("London", "weather", Observation(temp=12, icon="04d", description="clouds"))
+    dashboard.app.store.record("Tokyo", "weather", Observation(name="Tokyo", dt=1700000000, temp=18).to_json())
+    dashboard.app.client.breaker.before_call = MagicMock(side_effect=CircuitOpenError(30))
+    
+    dashboard._refresh_thread(dashboard.city_pairs())
+    
+    assert dashboard.tiles[0].temp_label.text == "12°C"
+    assert dashboard.tiles[2].temp_label.text == "18°C"
+    assert dashboard.tiles[1].desc_label.text == "No data"
+    assert dashboard.status_label.text == "Weather service unavailable, showing saved data for 2 cities"
+
+def test_error_shown_when_no_tile_is_saved(dashboard):
+    dashboard.app.client.breaker.before_call = MagicMock(side_effect=CircuitOpenError(30))
+    
+    dashboard._refresh_thread(dashboard.city_pairs())
+    
+    assert dashboard.status_label.text == "Error: Weather service unavailable, retrying in 30s"
+
+def test_closed_dashboard_ignores_late_results(dashboard):
+    renderer = dashboard.app.renderer
+    renderer.set(dashboard.tiles[0].temp_label, text="20°C")
+    dashboard.close()
+    
+    assert dashboard.tiles[0].temp_label not in renderer._rendered
+    dashboard.window.destroy.assert_called_once()
+    with patch('requests.Session.get', side_effect=group_response):
+        dashboard._refresh_thread(dashboard.city_pairs())
+    assert dashboard.tiles[1].temp_label.text == ""
+    
+    # The window's own <Destroy> after close() doesn't close twice
+    dashboard._on_destroy(MagicMock(widget=dashboard.window))
+    dashboard.window.destroy.assert_called_once()
@@ -0,0 +1,114 @@
+import pytest
+import time
+import requests
+from unittest.mock import MagicMock
+from fake_server import start_server, icon_png
+from http_client import WeatherClient
+from resilience import RetryPolicy
+from project import WeatherApp
+from renderer import Renderer
+from metrics import PhaseMetrics
+from response_cache import ResponseCache
+from store import ObservationStore
+from providers import OpenWeatherProvider
+
+class MockRoot:
+    def after(self, ms, func):
+        if callable(func):
+            func()
+
+@pytest.fixture
+def server_factory():
+    servers = []
+    def start(**config):
+        server = start_server(**config)
+        servers.append(server)
+        return server
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def server(server_factory):
+    return server_factory(seed=1)
+
+def test_weather_and_forecast_over_real_sockets(server):
+    client = WeatherClient.from_base_url("dummy_api_key", server.base_url)
+    weather, forecast = client.fetch_current_and_forecast("London")
+    
+    assert weather.status_code == 200
+    assert weather.json()["name"] == "London"
+    assert len(forecast.json()["list"]) == 40
+    assert weather.headers["Content-Encoding"] == "gzip"
+
+def test_connections_are_reused(server):
+    """Test sequential requests ride one keep-alive connection"""
+    client = WeatherClient.from_base_url("dummy_api_key", server.base_url)
+    for _ in range(5):
+        client.get("weather", {"q": "Paris"})
+    
+    assert server.stats["/data/2.5/weather"] == 5
+    assert server.stats["connections"] == 1
+
+def test_group_and_icon_endpoints(server):
+    client = WeatherClient.from_base_url("dummy_api_key", server.base_url)
+    results = client.fetch_group([2643743, 2988507])
+    
+    assert [item["name"] for item in results] == ["London", "Paris"]
+    assert client.get_icon("10d") == icon_png("10d")
+
+def test_fault_injection(server_factory):
+    server = server_factory(rate_429=1.0, retry_after=7)
+    client = WeatherClient.from_base_url("dummy_api_key", server.base_url, retry=RetryPolicy(attempts=1))
+    response = client.get("weather", {"q": "London"})
+    
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+
+def test_unknown_city_is_404(server_factory):
+    server = server_factory(unknown_cities=["Atlantis"])
+    client = WeatherClient.from_base_url("dummy_api_key", server.base_url)
+    
+    assert client.get("weather", {"q": "atlantis"}).status_code == 404
+
+def test_latency_and_timeouts(server_factory):
+    server = server_factory(latency=0.3)
+    client = WeatherClient.from_base_url(
+        "dummy_api_key", server.base_url, timeout=0.05, retry=RetryPolicy(attempts=1)
+    )
+    
+    with pytest.raises(requests.exceptions.Timeout):
+        client.get("weather", {"q": "London"})
+
+def test_concurrent_fetch_takes_one_round_trip(server_factory):
+    """Test weather and forecast latency overlaps instead of adding up"""
+    server = server_factory(latency=0.3)
+    client = WeatherClient.from_base_url("dummy_api_key", server.base_url)
+    started = time.perf_counter()
+    client.fetch_current_and_forecast("Tokyo")
+    
+    assert time.perf_counter() - started < 0.55
+
+def test_weather_app_fetch_against_stand_in(server):
+    """Test the real fetch path end to end"""
+    app = WeatherApp.__new__(WeatherApp)
+    app.root = MockRoot()
+    app.metrics = PhaseMetrics()
+    app.renderer = Renderer(app.root)
+    app.client = WeatherClient.from_base_url("dummy_api_key", server.base_url)
+    app.provider = OpenWeatherProvider(app.client)
+    app.city_ids = {}
+    app.response_cache = ResponseCache()
+    app.store = ObservationStore(":memory:")
+    app.status_label = MagicMock()
+    app.error_label = MagicMock()
+    app.update_gui = MagicMock()
+    app.add_to_recent_cities = MagicMock()
+    app.snapshot_writer = MagicMock()
+    
+    app._fetch_weather_thread("Berlin")
+    
+    assert app.weather_data.name == "Berlin"
+    assert len(app.forecast_data) == 40
+    app.update_gui.assert_called_once()
@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import patch
+import forecast
+from forecast import aggregate_daily
+from project import WeatherApp
+
+# 2021-01-21 00:00 UTC
+DAY = 1611187200
+
+def entry(dt, temp, description="clear sky", icon="01d", rain=0):
+    data = {
+        "dt": dt,
+        "main": {"temp": temp, "temp_min": temp - 1, "temp_max": temp + 1},
+        "weather": [{"icon": icon, "description": description}],
+    }
+    if rain:
+        data["rain"] = {"3h": rain}
+    return data
+
+@pytest.fixture
+def forecast_data():
+    entries = []
+    for day in range(4):
+        for slot in range(8):
+            dt = DAY + day * 86400 + slot * 10800
+            description = "light rain" if slot in (3, 4, 5) and day == 1 else "clear sky"
+            entries.append(entry(dt, 10 + slot, description, rain=1.5 if description == "light rain" else 0))
+    return {"city": {"timezone": 0}, "list": entries}
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request):
+    if request.param == "numpy":
+        if forecast.np is None:
+            pytest.skip("numpy not installed")
+        with patch.object(forecast, "NUMPY_MIN_ENTRIES", 0):
+            yield
+    else:
+        with patch.object(forecast, "np", None):
+            yield
+
+def test_small_forecasts_skip_numpy(forecast_data):
+    """Test a normal 40-entry payload stays on the faster pure-Python path"""
+    with patch.object(forecast, "_day_stats_numpy", side_effect=AssertionError) as numpy_stats:
+        days = aggregate_daily(forecast_data, now=DAY + 3600)
+    
+    assert len(days) == 3
+    numpy_stats.assert_not_called()
+
+def test_aggregate_daily_stats(forecast_data, backend):
+    """Test per-day min, max, mean and precipitation"""
+    days = aggregate_daily(forecast_data, now=DAY + 3600)
+    
+    assert [day["date"] for day in days] == ["2021-01-22", "2021-01-23", "2021-01-24"]
+    assert days[0]["day"] == "Friday"
+    assert days[0]["temp_min"] == 9
+    assert days[0]["temp_max"] == 18
+    assert days[0]["temp_mean"] == pytest.approx(13.5)
+    assert days[0]["precipitation"] == pytest.approx(4.5)
+    assert days[1]["precipitation"] == 0
+
+def test_aggregate_daily_dominant_condition(backend):
+    entries = [entry(DAY + slot * 10800, 5, "snow" if slot < 5 else "clear sky", icon="13n") for slot in range(8)]
+    days = aggregate_daily({"list": entries}, skip_today=False, now=DAY)
+    
+    assert days[0]["description"] == "snow"
+    assert days[0]["icon"] == "13d"
+
+def test_aggregate_daily_uses_city_timezone(backend):
+    """Test days split on local midnight, not UTC"""
+    entries = [entry(DAY + 22 * 3600, 1), entry(DAY + 25 * 3600, 2)]
+    utc_days = aggregate_daily({"city": {"timezone": 0}, "list": entries}, skip_today=False, now=0)
+    tokyo_days = aggregate_daily({"city": {"timezone": 9 * 3600}, "list": entries}, skip_today=False, now=0)
+    
+    assert len(utc_days) == 2
+    assert len(tokyo_days) == 1
+    assert tokyo_days[0]["date"] == "2021-01-22"
+
+def test_aggregate_daily_empty():
+    assert aggregate_daily({}) == []
+
+def test_daily_forecast_computed_once_per_payload(forecast_data):
+    app = WeatherApp.__new__(WeatherApp)
+    app.forecast_days = [{}, {}, {}]
+    app.forecast_data = forecast_data
+    
+    with patch('project.aggregate_daily', return_value=[]) as mock_aggregate:
+        app.get_daily_forecast()
+        app.get_daily_forecast()
+        app.forecast_data = dict(forecast_data)
+        app.get_daily_forecast()
+    
+    assert mock_aggregate.call_count == 2
@@ -152,7 +152,7 @@ def test_update_gui_celsius(weather_app, mock_weather_data, mock_forecast_data):
     weather_app.temp_unit = "celsius"
     
     timestamp_date = datetime(2021, 1, 21)
-    with patch('project.datetime') as mock_datetime:
+    with patch('view_model.datetime') as mock_datetime:
         mock_datetime.fromtimestamp.return_value = timestamp_date
         mock_datetime.now.return_value = timestamp_date
         mock_datetime.strftime = datetime.strftime
@@ -178,7 +178,7 @@ def test_update_gui_fahrenheit(weather_app, mock_weather_data, mock_forecast_dat
     weather_app.temp_unit = "fahrenheit"
     
     timestamp_date = datetime(2021, 1, 21)
-    with patch('project.datetime') as mock_datetime:
+    with patch('view_model.datetime') as mock_datetime:
         mock_datetime.fromtimestamp.return_value = timestamp_date
         mock_datetime.now.return_value = timestamp_date
         mock_datetime.strftime = datetime.strftime
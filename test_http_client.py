@@ -0,0 +1,112 @@
+import pytest
+import requests
+import threading
+import time
+from unittest.mock import patch
+from http_client import WeatherClient
+from resilience import RetryPolicy
+
+class MockResponse:
+    def __init__(self, url, status_code=200, headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers or {}
+
+def test_session_is_per_thread_with_shared_pool():
+    """Test each thread gets its own session mounted on the shared adapter"""
+    client = WeatherClient("dummy_api_key")
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(client.session))
+    thread.start()
+    thread.join()
+    
+    assert client.session is client.session
+    assert sessions[0] is not client.session
+    assert sessions[0].get_adapter("https://api.openweathermap.org") is client.adapter
+    assert client.session.get_adapter("https://api.openweathermap.org") is client.adapter
+
+def test_session_requests_gzip():
+    client = WeatherClient("dummy_api_key")
+    assert "gzip" in client.session.headers["Accept-Encoding"]
+
+def test_get_adds_api_key_and_units():
+    client = WeatherClient("dummy_api_key", base_url="http://localhost:8000/data/2.5/")
+    with patch('requests.Session.get', return_value=MockResponse("")) as mock_get:
+        client.get("weather", {"q": "Paris"})
+    
+    mock_get.assert_called_once_with(
+        "http://localhost:8000/data/2.5/weather",
+        params={"q": "Paris", "appid": "dummy_api_key", "units": "metric"},
+        timeout=10
+    )
+
+def test_current_and_forecast_are_fetched_concurrently():
+    """Test both requests are in flight at the same time"""
+    client = WeatherClient("dummy_api_key")
+    barrier = threading.Barrier(2, timeout=5)
+    
+    def fake_get(url, **kwargs):
+        # Both calls must arrive before either can return
+        barrier.wait()
+        return MockResponse(url)
+    
+    with patch('requests.Session.get', side_effect=fake_get):
+        weather, forecast = client.fetch_current_and_forecast("London")
+    
+    assert weather.url.endswith("/weather")
+    assert forecast.url.endswith("/forecast")
+
+def test_failed_weather_call_waits_for_the_forecast_call():
+    """Test no request is left running once the fetch has failed"""
+    client = WeatherClient("dummy_api_key", retry=RetryPolicy(attempts=1))
+    finished = []
+
+    def get(url, params, timeout, **kwargs):
+        if url.endswith("/weather"):
+            raise requests.exceptions.ConnectionError("No connection")
+        time.sleep(0.1)
+        finished.append(url)
+        return MockResponse(url)
+
+    with patch('requests.Session.get', side_effect=get):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.fetch_current_and_forecast("London")
+        assert finished == ["https://api.openweathermap.org/data/2.5/forecast"]
+
+def test_unchanged_response_is_revalidated():
+    """Test a 304 hands back the response kept from the last 200"""
+    client = WeatherClient("dummy_api_key")
+    first = MockResponse("forecast", headers={"ETag": '"abc"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    with patch('requests.Session.get', side_effect=[first, MockResponse("forecast", status_code=304)]) as mock_get:
+        client.get("forecast", {"q": "Paris"})
+        second = client.get("forecast", {"q": "Paris"})
+    
+    assert second is first
+    assert client.not_modified == 1
+    assert mock_get.call_args.kwargs["headers"] == {
+        "If-None-Match": '"abc"', "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT",
+    }
+
+def test_validators_are_per_url_and_params():
+    client = WeatherClient("dummy_api_key")
+    with patch('requests.Session.get', return_value=MockResponse("forecast", headers={"ETag": '"abc"'})) as mock_get:
+        client.get("forecast", {"q": "Paris"})
+        client.get("forecast", {"q": "Tokyo"})
+    
+    assert "headers" not in mock_get.call_args.kwargs
+
+def test_stand_in_answers_revalidation_with_304():
+    from fake_server import start_server
+    server = start_server(seed=1)
+    client = WeatherClient.from_base_url("dummy_api_key", server.base_url)
+    try:
+        first = client.get("forecast", {"q": "Paris"})
+        second = client.get("forecast", {"q": "Paris"})
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+    
+    assert second is first
+    assert len(second.json()["list"]) == 40
+    assert server.stats["not_modified"] == 1
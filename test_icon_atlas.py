@@ -0,0 +1,109 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from PIL import Image
+from fake_server import start_server
+from icon_atlas import IconAtlas, build_atlas, load_icons, ICON_CODES, ICON_SIZE
+from project import WeatherApp
+from renderer import Renderer
+
+class MockRoot:
+    def after(self, ms, func):
+        func()
+
+class MockLabel:
+    # Not inside a CTk window, so scaling falls back to 1.0
+    master = None
+
+    def __init__(self):
+        self.image = None
+        self.configure = MagicMock()
+
+def solid(color, size):
+    return Image.new("RGBA", (size, size), color)
+
+@pytest.fixture
+def atlas_path(tmp_path):
+    path = str(tmp_path / "icons.atlas")
+    build_atlas({
+        ("01d", 100): solid((255, 200, 0, 255), 100),
+        ("01d", 200): solid((255, 100, 0, 255), 200),
+        ("10n", 100): solid((0, 0, 255, 128), 50),
+    }, path)
+    return path
+
+def test_atlas_round_trips_pixels(atlas_path):
+    atlas = IconAtlas(atlas_path)
+
+    assert len(atlas) == 2
+    assert "01d" in atlas and "13d" not in atlas
+    assert atlas.image("01d", 100).getpixel((0, 0)) == (255, 200, 0, 255)
+    assert atlas.image("01d", 200).size == (200, 200)
+    # Resized to the variant's size when built
+    assert atlas.image("10n", 100).size == (100, 100)
+    atlas.close()
+
+def test_atlas_picks_nearest_larger_variant(atlas_path):
+    atlas = IconAtlas(atlas_path)
+
+    assert atlas.image("01d", 80).width == 100
+    assert atlas.image("01d", 150).width == 200
+    assert atlas.image("01d", 400).width == 200
+    assert atlas.image("10n", 200).width == 100
+    assert atlas.image("01d", 100) is atlas.image("01d", 100)
+    atlas.close()
+
+def test_ctk_image_follows_widget_scaling(atlas_path):
+    atlas = IconAtlas(atlas_path)
+
+    with patch("icon_atlas.widget_scaling", return_value=1.0):
+        normal = atlas.ctk_image("01d")
+    with patch("icon_atlas.widget_scaling", return_value=2.0):
+        hidpi = atlas.ctk_image("01d")
+        assert atlas.ctk_image("01d") is hidpi
+
+    assert normal is not hidpi
+    assert normal.cget("light_image").width == 100
+    assert hidpi.cget("light_image").width == 200
+    assert hidpi.cget("size") == (ICON_SIZE, ICON_SIZE)
+
+def test_rejects_files_that_are_not_atlases(tmp_path):
+    path = tmp_path / "icons.atlas"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + bytes(32))
+
+    with pytest.raises(ValueError):
+        IconAtlas(str(path))
+
+def test_build_from_stand_in_server(tmp_path):
+    server = start_server()
+    try:
+        images = load_icons(server.base_url + "/img/wn")
+    finally:
+        server.shutdown()
+        server.server_close()
+    path = str(tmp_path / "icons.atlas")
+
+    assert build_atlas(images, path) == len(ICON_CODES) * 2
+    atlas = IconAtlas(path)
+    assert all(code in atlas for code in ICON_CODES)
+    atlas.close()
+
+def test_app_draws_atlas_icons_without_loading(atlas_path):
+    app = WeatherApp.__new__(WeatherApp)
+    app.root = MockRoot()
+    app.renderer = Renderer(app.root)
+    app.icon_atlas = IconAtlas(atlas_path)
+    app.icon_cache = MagicMock()
+    app.icon_loader = MagicMock()
+    label = MockLabel()
+
+    app.load_weather_icon("01d", label)
+
+    app.icon_loader.load.assert_not_called()
+    app.icon_cache.get_image.assert_not_called()
+    assert label.image.cget("light_image").width == 100
+    label.configure.assert_called_once_with(image=label.image, text="")
+
+    # Codes missing from the atlas still go through the loader
+    app.icon_cache.get_image.return_value = None
+    app.load_weather_icon("13d", label)
+    app.icon_loader.load.assert_called_once()
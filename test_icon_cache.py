@@ -0,0 +1,147 @@
+import pytest
+import threading
+from unittest.mock import patch, MagicMock
+from project import WeatherApp
+from icon_cache import IconCache, IconLoader
+from http_client import WeatherClient
+from renderer import Renderer
+from metrics import PhaseMetrics
+
+class MockResponse:
+    def __init__(self, content):
+        self.content = content
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+class MockLabel:
+    def __init__(self):
+        self.text = ""
+        self.image = None
+
+    def configure(self, text=None, image=None):
+        if text is not None:
+            self.text = text
+        if image is not None:
+            self.image = image
+
+class MockRoot:
+    def after(self, ms, func):
+        if callable(func):
+            func()
+
+@pytest.fixture
+def weather_app(tmp_path):
+    app = WeatherApp.__new__(WeatherApp)
+    app.root = MockRoot()
+    app.metrics = PhaseMetrics()
+    app.renderer = Renderer(app.root)
+    app.client = WeatherClient("dummy_api_key")
+    app.icon_cache = IconCache(str(tmp_path))
+    app.icon_loader = IconLoader(app.icon_cache, app._download_icon, app._decode_icon)
+    return app
+
+def test_memory_cache_evicts_least_recently_used(tmp_path):
+    """Test the in-memory tier stays within its size bound"""
+    cache = IconCache(str(tmp_path), max_items=2)
+    cache.put_image("01d", "sun")
+    cache.put_image("02d", "cloud")
+    cache.get_image("01d")
+    cache.put_image("10d", "rain")
+
+    assert len(cache) == 2
+    assert cache.get_image("01d") == "sun"
+    assert cache.get_image("02d") is None
+    assert cache.get_image("10d") == "rain"
+
+def test_disk_cache_survives_restart(tmp_path):
+    """Test icon bytes are found again by a fresh cache instance"""
+    IconCache(str(tmp_path)).put_bytes("01d", b"png-bytes")
+
+    assert IconCache(str(tmp_path)).get_bytes("01d") == b"png-bytes"
+    assert IconCache(str(tmp_path)).get_bytes("02d") is None
+
+def test_disk_cache_is_content_addressed(tmp_path):
+    """Test identical icons share one blob on disk"""
+    cache = IconCache(str(tmp_path))
+    first = cache.put_bytes("01d", b"same")
+    second = cache.put_bytes("01n", b"same")
+
+    assert first == second
+    blobs = list((tmp_path / "icons" / "objects").rglob("*.png"))
+    assert len(blobs) == 1
+
+def test_disk_cache_ignores_corrupt_blob(tmp_path):
+    """Test a blob whose content doesn't match its hash is a miss"""
+    cache = IconCache(str(tmp_path))
+    digest = cache.put_bytes("01d", b"good")
+    (tmp_path / "icons" / "objects" / digest[:2] / f"{digest}.png").write_bytes(b"bad")
+
+    assert cache.get_bytes("01d") is None
+
+def test_load_weather_icon_uses_cache(weather_app):
+    """Test repeated icon loads only hit the network once"""
+    label = MockLabel()
+    with patch('requests.Session.get', return_value=MockResponse(b"png")) as mock_get, \
+         patch('project.Image.open'), \
+         patch('project.ImageTk.PhotoImage', return_value="photo"):
+        weather_app.load_weather_icon("01d", label)
+        weather_app.icon_loader.shutdown()
+        weather_app.load_weather_icon("01d", label)
+
+    assert mock_get.call_count == 1
+    assert label.image == "photo"
+
+def test_load_weather_icon_from_disk_skips_network(weather_app):
+    """Test an icon stored on disk is decoded without downloading"""
+    weather_app.icon_cache.put_bytes("01d", b"png")
+    label = MockLabel()
+    with patch('requests.Session.get') as mock_get, \
+         patch('project.Image.open'), \
+         patch('project.ImageTk.PhotoImage', return_value="photo"):
+        weather_app.load_weather_icon("01d", label)
+        weather_app.icon_loader.shutdown()
+
+    mock_get.assert_not_called()
+    assert label.image == "photo"
+
+def test_load_weather_icon_shows_placeholder_first(weather_app):
+    """Test the label gets a placeholder before the worker finishes"""
+    label = MockLabel()
+    weather_app.icon_loader = MagicMock()
+    weather_app.load_weather_icon("01d", label)
+
+    assert label.text == "..."
+    weather_app.icon_loader.load.assert_called_once()
+
+def test_stale_icon_is_not_applied(weather_app):
+    """Test a slow icon doesn't overwrite a label that moved on"""
+    label = MockLabel()
+    label.icon_code = "02d"
+    weather_app._show_icon("01d", label, "image", None)
+
+    assert label.image is None
+
+def test_icon_error_is_shown(weather_app):
+    """Test download failures end up on the label"""
+    label = MockLabel()
+    with patch('requests.Session.get', side_effect=Exception("offline")):
+        weather_app.load_weather_icon("01d", label)
+        weather_app.icon_loader.shutdown()
+
+    assert label.text == "Icon\nError"
+
+def test_icon_loader_shares_inflight_download(tmp_path):
+    """Test concurrent requests for one icon only download it once"""
+    release = threading.Event()
+    fetch = MagicMock(side_effect=lambda code: release.wait() and b"png")
+    loader = IconLoader(IconCache(str(tmp_path)), fetch, lambda data: data)
+    results = []
+    loader.load("01d", lambda image, error: results.append(image))
+    loader.load("01d", lambda image, error: results.append(image))
+    release.set()
+    loader.shutdown()
+
+    assert fetch.call_count == 1
+    assert results == [b"png", b"png"]
@@ -0,0 +1,43 @@
+import subprocess
+import sys
+from unittest.mock import patch
+from lazy_import import LazyModule, lazy_module
+from project import WeatherApp
+
+def test_lazy_module_imports_on_first_use():
+    module = LazyModule("colorsys")
+    assert "not loaded" in repr(module)
+    
+    assert module.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1)
+    assert "not loaded" not in repr(module)
+
+def test_lazy_module_sees_patches():
+    """Test patching the real module shows through the proxy"""
+    module = LazyModule("colorsys")
+    with patch('colorsys.rgb_to_hsv', return_value="patched"):
+        assert module.rgb_to_hsv(1, 0, 0) == "patched"
+
+def test_lazy_module_returns_loaded_modules_directly():
+    assert lazy_module("sys") is sys
+
+def test_importing_project_skips_heavy_modules():
+    """Test startup doesn't pay for customtkinter, requests, PIL or dotenv"""
+    script = (
+        "import sys, project\n"
+        "print(sorted(m for m in ('customtkinter', 'requests', 'PIL', 'dotenv', 'numpy') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+def test_recents_bar_waits_for_deferred_widgets():
+    """Test recent cities added before the bar exists are kept for later"""
+    app = WeatherApp.__new__(WeatherApp)
+    app.max_recent_cities = 5
+    app.recent_cities = []
+    app.recent_city_buttons = []
+    app.visible_recent_buttons = 0
+    
+    app.add_to_recent_cities("London")
+    
+    assert app.recent_cities == ["London"]
+    assert app.recent_city_buttons == []
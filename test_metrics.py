@@ -0,0 +1,161 @@
+import pytest
+import requests
+from unittest.mock import MagicMock
+from metrics import PhaseMetrics, start_metrics_server
+from fake_server import start_server
+from http_client import WeatherClient
+from project import WeatherApp
+from renderer import Renderer
+from response_cache import ResponseCache
+from store import ObservationStore
+from providers import OpenWeatherProvider
+
+class MockRoot:
+    def after(self, ms, func):
+        if callable(func):
+            func()
+
+@pytest.fixture
+def metrics():
+    return PhaseMetrics()
+
+@pytest.fixture
+def server():
+    server = start_server(seed=1)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_quantiles_come_from_recent_samples(metrics):
+    for ms in range(1, 101):
+        metrics.observe("fetch", ms / 1000)
+
+    assert metrics.quantile("fetch", 0.5) == pytest.approx(0.051)
+    assert metrics.quantile("fetch", 0.99) == pytest.approx(0.1)
+    assert metrics.quantile("missing", 0.5) is None
+    assert metrics.summary()["fetch"]["count"] == 100
+
+def test_timer_records_even_when_the_phase_fails(metrics):
+    with pytest.raises(ValueError):
+        with metrics.timer("json_decode"):
+            raise ValueError("bad payload")
+
+    assert metrics.summary()["json_decode"]["count"] == 1
+
+def test_prometheus_histogram_is_cumulative(metrics):
+    metrics.observe("http_wait", 0.003)
+    metrics.observe("http_wait", 0.2)
+    metrics.observe("http_wait", 30)
+    text = metrics.to_prometheus()
+
+    assert "# TYPE weather_app_phase_seconds histogram" in text
+    assert 'weather_app_phase_seconds_bucket{phase="http_wait",le="0.005"} 1' in text
+    assert 'weather_app_phase_seconds_bucket{phase="http_wait",le="0.25"} 2' in text
+    assert 'weather_app_phase_seconds_bucket{phase="http_wait",le="10.0"} 2' in text
+    assert 'weather_app_phase_seconds_bucket{phase="http_wait",le="+Inf"} 3' in text
+    assert 'weather_app_phase_seconds_count{phase="http_wait"} 3' in text
+
+def test_write_prometheus_file(metrics, tmp_path):
+    metrics.observe("update_gui", 0.001)
+    path = tmp_path / "textfile" / "weather_app.prom"
+    metrics.write_prometheus(str(path))
+
+    assert 'phase="update_gui"' in path.read_text()
+
+def test_metrics_endpoint(metrics):
+    metrics.observe("render_flush", 0.0002)
+    server = start_metrics_server(metrics, 0)
+    try:
+        port = server.server_address[1]
+        response = requests.get(f"http://127.0.0.1:{port}/metrics", timeout=5)
+        assert response.status_code == 200
+        assert 'phase="render_flush"' in response.text
+        assert requests.get(f"http://127.0.0.1:{port}/other", timeout=5).status_code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_overlay_text(metrics):
+    assert metrics.overlay_text() == "No timings yet"
+    metrics.observe("fetch", 0.120)
+    metrics.observe("update_gui", 0.002)
+
+    assert metrics.overlay_text() == "p50/p99 ms: fetch 120/120 · update_gui 2/2"
+
+def test_client_records_connection_and_request_phases(metrics, server):
+    client = WeatherClient.from_base_url("dummy_api_key", server.base_url, metrics=metrics)
+    client.get("weather", {"q": "Paris"})
+    client.get("weather", {"q": "Paris"})
+    summary = metrics.summary()
+
+    # Keep-alive: two requests, one connection
+    assert summary["http_connect"]["count"] == 1
+    assert summary["http_wait"]["count"] == 2
+    assert summary["http_body"]["count"] == 2
+    assert "http_tls" not in summary
+
+def test_renderer_records_flush(metrics):
+    root = MockRoot()
+    renderer = Renderer(root, metrics)
+    renderer.set(MagicMock(), text="15.5°C")
+
+    assert metrics.summary()["render_flush"]["count"] == 1
+
+def test_fetch_records_each_phase(metrics, server):
+    app = WeatherApp.__new__(WeatherApp)
+    app.root = MockRoot()
+    app.metrics = metrics
+    app.renderer = Renderer(app.root, metrics)
+    app.client = WeatherClient.from_base_url("dummy_api_key", server.base_url, metrics=metrics)
+    app.provider = OpenWeatherProvider(app.client)
+    app.city_ids = {}
+    app.response_cache = ResponseCache()
+    app.store = ObservationStore(":memory:")
+    app.status_label = MagicMock()
+    app.error_label = MagicMock()
+    app.add_to_recent_cities = MagicMock()
+    app.snapshot_writer = MagicMock()
+    app._update_gui = MagicMock()
+
+    app._fetch_weather_thread("Berlin")
+
+    assert {"fetch", "http_wait", "json_decode", "store_write", "update_gui", "render_flush"} <= set(metrics.summary())
+
+def test_debug_overlay_refreshes_until_hidden(metrics):
+    app = WeatherApp.__new__(WeatherApp)
+    app.root = MagicMock()
+    app.metrics = metrics
+    app.renderer = Renderer(MockRoot())
+    app.debug = False
+    app.debug_label = MagicMock()
+    metrics.observe("fetch", 0.05)
+
+    app.toggle_debug_overlay()
+    app.debug_label.configure.assert_called_with(text="p50/p99 ms: fetch 50/50")
+    app.root.after.assert_called_with(1000, app.refresh_debug_overlay)
+
+    app.toggle_debug_overlay()
+    app.debug_label.pack_forget.assert_called_once()
+    app.root.after.reset_mock()
+    app.refresh_debug_overlay()
+    app.root.after.assert_not_called()
+
+def test_toggling_overlay_keeps_one_refresh_loop(metrics):
+    app = WeatherApp.__new__(WeatherApp)
+    app.root = MagicMock()
+    app.root.after.side_effect = ["job1", "job2", "job3"]
+    app.metrics = metrics
+    app.renderer = Renderer(MockRoot())
+    app.debug = False
+    app.debug_label = MagicMock()
+
+    app.toggle_debug_overlay()
+    app.toggle_debug_overlay()
+    app.root.after_cancel.assert_called_once_with("job1")
+    app.toggle_debug_overlay()
+    assert app.root.after.call_count == 2
+
+    # The pending callback reschedules itself in place of the old job, never alongside it
+    app.refresh_debug_overlay()
+    app.root.after_cancel.assert_called_with("job2")
+    assert app._debug_job == "job3"
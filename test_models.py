@@ -0,0 +1,66 @@
+import pytest
+from models import Observation, ForecastSeries
+from forecast import aggregate_daily
+
+@pytest.fixture
+def weather_data():
+    return {
+        "id": 2643743,
+        "name": "London",
+        "sys": {"country": "GB", "sunrise": 1611215000},
+        "dt": 1611234567,
+        "coord": {"lon": -0.13, "lat": 51.51},
+        "weather": [{"id": 800, "main": "Clear", "icon": "01d", "description": "clear sky"}],
+        "main": {"temp": 15.5, "feels_like": 14.2, "humidity": 76, "pressure": 1013},
+        "wind": {"speed": 3.6, "deg": 250},
+    }
+
+def forecast_entry(dt, temp, icon="01d", description="clear sky", rain=0):
+    entry = {"dt": dt, "main": {"temp": temp}, "weather": [{"icon": icon, "description": description}]}
+    if rain:
+        entry["rain"] = {"3h": rain}
+    return entry
+
+def test_observation_keeps_only_displayed_fields(weather_data):
+    observation = Observation.from_json(weather_data)
+
+    assert (observation.name, observation.country, observation.temp) == ("London", "GB", 15.5)
+    assert (observation.icon, observation.description, observation.wind_speed) == ("01d", "clear sky", 3.6)
+    assert not hasattr(observation, "__dict__")
+
+def test_observation_defaults_for_missing_fields():
+    observation = Observation.from_json({"name": "Atlantis", "weather": []})
+
+    assert observation.pressure is None
+    assert observation.icon == ""
+    assert observation.temp == 0
+
+def test_observation_round_trip(weather_data):
+    observation = Observation.from_json(weather_data)
+
+    assert Observation.from_json(observation.to_json()) == observation
+
+def test_forecast_series_is_sorted_columns():
+    series = ForecastSeries.from_json({"city": {"timezone": 3600}, "list": [
+        forecast_entry(200, 12, "10d", "light rain", rain=1.5),
+        forecast_entry(100, 10),
+        forecast_entry(300, 11),
+    ]})
+
+    assert len(series) == 3
+    assert list(series.dt) == [100, 200, 300]
+    assert list(series.temp) == [10, 12, 11]
+    assert list(series.precipitation) == [0, 1.5, 0]
+    # Each distinct condition is stored once
+    assert series.conditions == [("01d", "clear sky"), ("10d", "light rain")]
+    assert list(series.condition) == [0, 1, 0]
+    assert series.timezone == 3600
+
+def test_forecast_series_round_trip_aggregates_the_same():
+    day = 1611187200
+    payload = {"list": [forecast_entry(day + i * 10800, 5 + i, rain=0.5) for i in range(16)]}
+    series = ForecastSeries.from_json(payload)
+    expected = aggregate_daily(payload, skip_today=False, now=day)
+
+    assert aggregate_daily(series, skip_today=False, now=day) == expected
+    assert aggregate_daily(ForecastSeries.from_json(series.to_json()), skip_today=False, now=day) == expected
@@ -0,0 +1,187 @@
+import pytest
+import threading
+from unittest.mock import MagicMock
+from prefetch import Prefetcher, FAILURE_COOLDOWN
+from resilience import TokenBucket
+from project import WeatherApp
+from renderer import Renderer
+from metrics import PhaseMetrics
+from response_cache import ResponseCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class MockRoot:
+    def after(self, ms, func):
+        pass
+
+@pytest.fixture
+def cache():
+    return ResponseCache()
+
+def make_prefetcher(cache, candidates=(), idle=True, budget=None):
+    def fetch(city):
+        cache.put(city, "weather", {"name": city})
+        cache.put(city, "forecast", {"list": []})
+    return Prefetcher(
+        MagicMock(side_effect=fetch),
+        lambda city: cache.get(city, "weather")[1],
+        lambda: list(candidates),
+        idle=lambda: idle,
+        budget=budget or TokenBucket(rate=100, capacity=100),
+    )
+
+def test_idle_prefetch_walks_candidates_in_order(cache):
+    cache.put("Paris", "weather", {"name": "Paris"})
+    prefetcher = make_prefetcher(cache, candidates=["Paris", "Tokyo", "Berlin"])
+
+    assert prefetcher.run_once()
+    assert prefetcher.run_once()
+    assert not prefetcher.run_once()
+    assert [call.args[0] for call in prefetcher.fetch.call_args_list] == ["Tokyo", "Berlin"]
+
+def test_nothing_is_prefetched_while_a_fetch_is_running(cache):
+    prefetcher = make_prefetcher(cache, candidates=["Tokyo"], idle=False)
+
+    assert not prefetcher.run_once()
+    prefetcher.fetch.assert_not_called()
+
+def test_hovered_city_goes_first_even_when_busy(cache):
+    prefetcher = make_prefetcher(cache, candidates=["Tokyo"], idle=False)
+    prefetcher.request("Dubai")
+
+    assert prefetcher.run_once()
+    prefetcher.fetch.assert_called_once_with("Dubai")
+
+def test_fresh_requests_are_not_fetched(cache):
+    cache.put("Dubai", "weather", {"name": "Dubai"})
+    prefetcher = make_prefetcher(cache)
+    prefetcher.request("Dubai")
+
+    assert not prefetcher.run_once()
+    prefetcher.fetch.assert_not_called()
+
+def test_prefetch_stays_within_budget(cache):
+    budget = TokenBucket(rate=0.001, capacity=2)
+    prefetcher = make_prefetcher(cache, candidates=["Tokyo", "Berlin", "Dubai"], budget=budget)
+    while prefetcher.run_once():
+        pass
+
+    assert prefetcher.fetch.call_count == 2
+    assert prefetcher.stats["over_budget"] == 1
+
+def test_failed_prefetch_is_counted(cache):
+    prefetcher = make_prefetcher(cache, candidates=["Tokyo"])
+    prefetcher.fetch.side_effect = Exception("503")
+    prefetcher.run_once()
+
+    assert prefetcher.stats["failed"] == 1
+
+def test_failing_candidate_is_skipped_until_cooldown(cache):
+    clock = FakeClock()
+    budget = TokenBucket(rate=0.001, capacity=5)
+    prefetcher = make_prefetcher(cache, candidates=["Lndon", "Paris", "Tokyo"], budget=budget)
+    prefetcher.clock = clock
+    fetch = prefetcher.fetch.side_effect
+    prefetcher.fetch.side_effect = lambda city: fetch(city) if city != "Lndon" else 1 / 0
+    while prefetcher.run_once():
+        pass
+
+    assert [call.args[0] for call in prefetcher.fetch.call_args_list] == ["Lndon", "Paris", "Tokyo"]
+    assert prefetcher.stats["failed"] == 1
+    assert round(budget.available()) == 2
+
+    clock.now += FAILURE_COOLDOWN + 1
+    assert prefetcher.run_once()
+    assert prefetcher.fetch.call_args.args[0] == "Lndon"
+
+def test_hit_rate_counters(cache):
+    prefetcher = make_prefetcher(cache, candidates=["Tokyo"])
+    prefetcher.run_once()
+
+    prefetcher.record_selection("tokyo", "hit")
+    prefetcher.record_selection("Paris", "stale")
+    prefetcher.record_selection("Berlin", "miss")
+    prefetcher.record_selection("Dubai", "miss")
+
+    assert prefetcher.hit_rate() == 0.5
+    assert prefetcher.stats["prefetch_hits"] == 1
+    assert prefetcher.stats["misses"] == 2
+
+def test_background_thread_prefetches_and_stops(cache):
+    done = threading.Event()
+    prefetcher = Prefetcher(lambda city: done.set(), lambda city: False, lambda: ["Tokyo"], poll=0.01)
+    thread = prefetcher.start()
+
+    assert done.wait(5)
+    prefetcher.stop()
+    thread.join(5)
+    assert not thread.is_alive()
+
+@pytest.fixture
+def weather_app(cache):
+    app = WeatherApp.__new__(WeatherApp)
+    app.root = MockRoot()
+    app.metrics = PhaseMetrics()
+    app.renderer = Renderer(app.root)
+    app.response_cache = cache
+    app.prefetcher = make_prefetcher(cache)
+    app.recent_cities = ["Paris", "Tokyo"]
+    return app
+
+def test_cache_state(weather_app, cache):
+    assert weather_app.cache_state("Paris") == "miss"
+    cache.put("Paris", "weather", {"name": "Paris"})
+    cache.put("Paris", "forecast", {"list": []})
+    assert weather_app.cache_state("Paris") == "hit"
+
+def test_hovering_recent_button_queues_prefetch(weather_app):
+    weather_app.prefetch_recent_city(1)
+    weather_app.prefetch_recent_city(5)
+
+    assert list(weather_app.prefetcher._queue) == ["Tokyo"]
+
+def test_hovering_dropdown_item_queues_prefetch(weather_app):
+    menu = MagicMock()
+    menu.index.return_value = 3
+    menu.entrycget.return_value = "Paris"
+    weather_app._on_dropdown_hover(MagicMock(widget=menu))
+
+    menu.entrycget.assert_called_once_with(3, "label")
+    assert list(weather_app.prefetcher._queue) == ["Paris"]
+
+def test_debug_overlay_shows_hit_rate(weather_app):
+    weather_app.debug = True
+    weather_app.debug_label = MagicMock()
+    weather_app.prefetcher.record_selection("Paris", "hit")
+    weather_app.refresh_debug_overlay()
+    weather_app.renderer.flush()
+
+    text = weather_app.debug_label.configure.call_args.kwargs["text"]
+    assert text.endswith("prefetch: 100% of 1 picks from cache, 0 prefetched")
+
+def test_stale_cities_are_left_to_the_refresher(weather_app):
+    clock = FakeClock()
+    weather_app.response_cache = ResponseCache(clock=clock)
+    for city in ["Paris", "Tokyo"]:
+        weather_app.response_cache.put(city, "weather", {"name": city})
+        weather_app.response_cache.put(city, "forecast", {"list": []})
+    clock.now += 31 * 60
+    prefetcher = Prefetcher(MagicMock(), weather_app.skip_prefetch, lambda: ["Paris", "Tokyo", "Dubai"])
+
+    assert weather_app.cache_state("Paris") == "stale"
+    assert prefetcher.run_once()
+    prefetcher.fetch.assert_called_once_with("Dubai")
+
+def test_cities_known_to_be_missing_are_not_prefetched(weather_app, cache):
+    cache.put("Lndon", "not_found", True)
+    budget = TokenBucket(rate=0.001, capacity=5)
+    prefetcher = Prefetcher(MagicMock(), weather_app.skip_prefetch, lambda: ["Lndon", "Paris"], budget=budget)
+
+    assert prefetcher.run_once()
+    prefetcher.fetch.assert_called_once_with("Paris")
+    assert round(budget.available()) == 4
@@ -0,0 +1,126 @@
+import pytest
+from unittest.mock import MagicMock
+from fake_server import start_server
+from http_client import WeatherClient
+from forecast import aggregate_daily
+from models import Observation, ForecastSeries
+from providers import (
+    OpenWeatherProvider, OneCallProvider, FixtureProvider, CityNotFoundError,
+    make_provider, parse_one_call, write_fixture,
+)
+from project import WeatherApp
+from renderer import Renderer
+from metrics import PhaseMetrics
+from response_cache import ResponseCache
+from store import ObservationStore
+
+class MockRoot:
+    def after(self, ms, func):
+        func()
+
+@pytest.fixture
+def server():
+    server = start_server(seed=1, unknown_cities=["Atlantis"])
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def client(server):
+    client = WeatherClient.from_base_url("dummy_api_key", server.base_url)
+    yield client
+    client.close()
+
+def test_openweather_makes_two_calls(server, client):
+    observation, forecast = OpenWeatherProvider(client).fetch("Berlin")
+
+    assert observation.name == "Berlin"
+    assert len(forecast) == 40
+    assert server.stats["/data/2.5/weather"] == 1
+    assert server.stats["/data/2.5/forecast"] == 1
+
+def test_openweather_unknown_city(client):
+    with pytest.raises(CityNotFoundError):
+        OpenWeatherProvider(client).fetch("Atlantis")
+
+def test_one_call_geocodes_once_then_makes_one_call(server, client):
+    provider = OneCallProvider(client)
+    provider.fetch("Berlin")
+    observation, forecast = provider.fetch("berlin")
+
+    assert server.stats["/geo/1.0/direct"] == 1
+    assert server.stats["/data/3.0/onecall"] == 2
+    assert (observation.name, observation.country) == ("Berlin", "XX")
+    assert len(aggregate_daily(forecast)) == 3
+
+def test_one_call_locates_a_picked_suggestion_by_id(server, client):
+    """Test a label like "Paris, US, TX" is never sent to the geocoder"""
+    provider = OneCallProvider(client)
+    provider.fetch("Paris, US, TX", 4717560)
+    observation, forecast = provider.fetch("Paris, US, TX", 4717560)
+
+    assert "/geo/1.0/direct" not in server.stats
+    assert server.stats["/data/2.5/weather"] == 1
+    assert server.stats["/data/3.0/onecall"] == 2
+    assert observation.name == "City 4717560"
+    assert len(forecast) > 0
+
+def test_one_call_unknown_city(server, client):
+    with pytest.raises(CityNotFoundError):
+        OneCallProvider(client).fetch("Atlantis")
+
+    assert "/data/3.0/onecall" not in server.stats
+
+def test_parse_one_call():
+    data = {
+        "timezone_offset": 3600,
+        "current": {"dt": 1700000000, "temp": 11.2, "humidity": 80, "pressure": 1009, "wind_speed": 4.1,
+                    "weather": [{"icon": "10d", "description": "light rain"}]},
+        "daily": [
+            {"dt": 1700136000, "temp": {"day": 9, "min": 5, "max": 12}, "rain": 3.2,
+             "weather": [{"icon": "10d", "description": "light rain"}]},
+            {"dt": 1700049600, "temp": {"day": 10, "min": 6, "max": 13},
+             "weather": [{"icon": "01d", "description": "clear sky"}]},
+        ],
+    }
+    observation, forecast = parse_one_call(data, {"name": "London", "country": "GB"})
+
+    assert observation == Observation(name="London", country="GB", dt=1700000000, temp=11.2, humidity=80,
+                                      pressure=1009, wind_speed=4.1, icon="10d", description="light rain")
+    assert list(forecast.dt) == [1700049600, 1700136000]
+    assert list(forecast.precipitation) == [0, 3.2]
+    days = aggregate_daily(forecast, skip_today=False, now=1700000000)
+    assert [(day["temp_min"], day["temp_max"]) for day in days] == [(6, 13), (5, 12)]
+
+def test_fixture_round_trip(tmp_path):
+    observation = Observation(name="New York", country="US", temp=3)
+    forecast = ForecastSeries()
+    forecast.append(1700000000, 3, 1, 5, 0, "13d", "light snow")
+    write_fixture(str(tmp_path), "New York", observation, forecast)
+
+    loaded, loaded_forecast = FixtureProvider(str(tmp_path)).fetch("new  york")
+    assert loaded == observation
+    assert loaded_forecast.conditions == [("13d", "light snow")]
+    with pytest.raises(CityNotFoundError):
+        FixtureProvider(str(tmp_path)).fetch("Paris")
+
+def test_make_provider():
+    assert isinstance(make_provider("onecall", MagicMock(base_url="https://api.example/data/2.5")), OneCallProvider)
+    with pytest.raises(ValueError):
+        make_provider("darksky")
+
+def test_app_reports_city_missing_from_fixtures(tmp_path):
+    app = WeatherApp.__new__(WeatherApp)
+    app.root = MockRoot()
+    app.metrics = PhaseMetrics()
+    app.renderer = Renderer(app.root)
+    app.provider = FixtureProvider(str(tmp_path))
+    app.city_ids = {}
+    app.response_cache = ResponseCache()
+    app.store = ObservationStore(":memory:")
+    app.status_label = MagicMock()
+    app.error_label = MagicMock()
+
+    app._fetch_weather_thread("Paris")
+
+    app.error_label.configure.assert_called_with(text="Error: City 'Paris' not found")
@@ -0,0 +1,154 @@
+import pytest
+import threading
+from unittest.mock import MagicMock
+from refresher import AutoRefresher
+from resilience import TokenBucket
+from project import WeatherApp
+from renderer import Renderer
+from metrics import PhaseMetrics
+from models import Observation, ForecastSeries
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class MockRoot:
+    def after(self, ms, func):
+        func()
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+def make_refresher(clock, targets, refresh=None, age=None, budget=None):
+    return AutoRefresher(
+        refresh or MagicMock(),
+        lambda: targets,
+        age=age,
+        intervals={"current": 100, "recent": 300, "popular": 600},
+        budget=budget or TokenBucket(rate=100, capacity=100, clock=clock),
+        clock=clock,
+        random=lambda: 0.5,
+    )
+
+def test_each_city_gets_its_shortest_interval(clock):
+    refresher = make_refresher(clock, ("London", ["Paris", "london"], ["Paris", "Tokyo"]))
+    refresher.update_targets()
+
+    intervals = {key: entry[1] for key, entry in refresher._schedule.items()}
+    assert intervals == {"london": 100, "paris": 300, "tokyo": 600}
+
+def test_first_refreshes_are_spread_out(clock):
+    refresher = make_refresher(clock, ("London", [], ["Tokyo"]))
+    refresher.update_targets()
+
+    assert refresher._schedule["london"][0] == 1050
+    assert refresher._schedule["tokyo"][0] == 1300
+
+def test_due_cities_are_refreshed_and_rescheduled(clock):
+    refresh = MagicMock()
+    refresher = make_refresher(clock, ("London", ["Paris"], []), refresh=refresh)
+    refresher.update_targets()
+
+    clock.now += 60
+    wait = refresher.run_pending()
+    refresh.assert_called_once_with("London")
+    assert refresher._schedule["london"][0] == 1160
+    assert wait == 90
+
+    clock.now += 100
+    refresher.run_pending()
+    assert [call.args[0] for call in refresh.call_args_list] == ["London", "Paris", "London"]
+
+def test_recently_fetched_city_is_skipped(clock):
+    refresh = MagicMock()
+    refresher = make_refresher(clock, ("London", [], []), refresh=refresh, age=lambda city: 10)
+    refresher.update_targets()
+    clock.now += 60
+    refresher.run_pending()
+
+    refresh.assert_not_called()
+    assert refresher.stats["skipped"] == 1
+    # The next refresh is counted from when the data was fetched
+    assert refresher._schedule["london"][0] == clock.now + 90
+
+def test_budget_defers_refreshes(clock):
+    refresh = MagicMock()
+    budget = TokenBucket(rate=0.1, capacity=1, clock=clock)
+    refresher = make_refresher(clock, (None, [], ["London", "Paris"]), refresh=refresh, budget=budget)
+    refresher.update_targets()
+    clock.now += 400
+    refresher.run_pending()
+
+    assert refresh.call_count == 1
+    assert refresher.stats["deferred"] == 1
+
+def test_failed_refresh_is_counted_and_rescheduled(clock):
+    refresher = make_refresher(clock, ("London", [], []), refresh=MagicMock(side_effect=Exception("503")))
+    refresher.update_targets()
+    clock.now += 60
+    refresher.run_pending()
+
+    assert refresher.stats["failed"] == 1
+    assert refresher._schedule["london"][0] == 1160
+
+def test_dropped_cities_are_unscheduled(clock):
+    targets = ["London", ["Paris"], []]
+    refresher = AutoRefresher(MagicMock(), lambda: tuple(targets), clock=clock)
+    refresher.update_targets()
+    targets[1] = []
+    refresher.update_targets()
+
+    assert list(refresher._schedule) == ["london"]
+
+def test_background_thread_refreshes_and_stops():
+    refreshed = threading.Event()
+    refresher = AutoRefresher(
+        lambda city: refreshed.set(),
+        lambda: ("London", [], []),
+        intervals={"current": 0.05},
+    )
+    thread = refresher.start()
+
+    assert refreshed.wait(5)
+    refresher.stop()
+    thread.join(5)
+    assert not thread.is_alive()
+
+def weather(temp, dt=1700000000):
+    return Observation(name="London", country="GB", dt=dt, temp=temp, humidity=50, icon="01d", description="clear sky")
+
+@pytest.fixture
+def weather_app():
+    app = WeatherApp.__new__(WeatherApp)
+    app.root = MockRoot()
+    app.metrics = PhaseMetrics()
+    app.renderer = Renderer(app.root)
+    app.status_label = MagicMock()
+    app.update_gui = MagicMock()
+    app.city = "London"
+    app.weather_data = weather(15)
+    app.forecast_data = ForecastSeries()
+    return app
+
+def test_unchanged_refresh_does_not_repaint(weather_app):
+    # New payload objects, newer timestamp, same strings on screen
+    weather_app._apply_refresh("london", weather(15, dt=1700000600), ForecastSeries())
+
+    weather_app.update_gui.assert_not_called()
+
+def test_changed_refresh_repaints(weather_app):
+    weather_app._apply_refresh("London", weather(17), ForecastSeries())
+
+    weather_app.update_gui.assert_called_once()
+    assert weather_app.weather_data.temp == 17
+    weather_app.status_label.configure.assert_called_with(text="Data refreshed")
+
+def test_refresh_for_another_city_only_fills_cache(weather_app):
+    weather_app._apply_refresh("Paris", weather(17), ForecastSeries())
+
+    weather_app.update_gui.assert_not_called()
+    assert weather_app.weather_data.temp == 15
@@ -0,0 +1,118 @@
+import pytest
+import tkinter
+from unittest.mock import MagicMock
+from project import WeatherApp
+from renderer import Renderer
+from metrics import PhaseMetrics
+from models import Observation, ForecastSeries
+
+class MockLabel:
+    def __init__(self):
+        self.text = ""
+        self.configure_calls = 0
+    
+    def configure(self, text=None, image=None):
+        self.configure_calls += 1
+        if text is not None:
+            self.text = text
+
+class DeferredRoot:
+    """Queues after() callbacks so frames can be run explicitly"""
+    def __init__(self):
+        self.functions = []
+    
+    def after(self, ms, func):
+        self.functions.append(func)
+    
+    def run(self):
+        while self.functions:
+            self.functions.pop(0)()
+
+@pytest.fixture
+def root():
+    return DeferredRoot()
+
+@pytest.fixture
+def renderer(root):
+    return Renderer(root)
+
+def test_changes_are_batched_into_one_frame(renderer, root):
+    first, second = MockLabel(), MockLabel()
+    renderer.set(first, text="a")
+    renderer.set(second, text="b")
+    renderer.set(first, text="c")
+    
+    assert len(root.functions) == 1
+    root.run()
+    
+    assert renderer.frames == 1
+    assert first.text == "c"
+    assert first.configure_calls == 1
+    assert second.text == "b"
+
+def test_unchanged_widgets_are_not_touched(renderer, root):
+    label = MockLabel()
+    renderer.set(label, text="15.5°C")
+    root.run()
+    renderer.set(label, text="15.5°C")
+    root.run()
+    
+    assert label.configure_calls == 1
+    assert renderer.configure_calls == 1
+
+def test_forget_forces_next_configure(renderer, root):
+    label = MockLabel()
+    renderer.set(label, text="x")
+    root.run()
+    renderer.forget(label)
+    renderer.set(label, text="x")
+    root.run()
+    
+    assert label.configure_calls == 2
+
+def test_destroyed_widget_does_not_drop_the_frame(renderer, root):
+    """Test a TclError from one widget leaves the other updates in the frame intact"""
+    destroyed, label = MagicMock(), MockLabel()
+    destroyed.configure.side_effect = tkinter.TclError('invalid command name ".!ctklabel"')
+    renderer.set(destroyed, text="gone")
+    renderer.set(label, text="still here")
+    root.run()
+    
+    assert label.text == "still here"
+    assert destroyed not in renderer._rendered
+
+def test_successful_fetch_renders_in_one_frame(root):
+    """Test a fetch result reaches the widgets in a single Tk callback"""
+    app = WeatherApp.__new__(WeatherApp)
+    app.root = root
+    app.metrics = PhaseMetrics()
+    app.renderer = Renderer(root)
+    app.temp_unit = "celsius"
+    app.wind_unit = "m/s"
+    app.pressure_unit = "hPa"
+    app.weather_data = None
+    app.forecast_data = None
+    app.forecast_days = []
+    app.add_to_recent_cities = MagicMock()
+    app.snapshot_writer = MagicMock()
+    app.load_weather_icon = MagicMock()
+    for name in ["status_label", "error_label", "city_label", "date_label", "icon_label", "temp_label",
+                 "desc_label", "humidity_label", "wind_label", "pressure_label"]:
+        setattr(app, name, MockLabel())
+    
+    weather_data = {"name": "London", "main": {"temp": 15.5}, "weather": [{"icon": "01d"}]}
+    root.after(0, lambda: app._apply_weather("London", Observation.from_json(weather_data), ForecastSeries()))
+    root.run()
+    
+    assert app.renderer.frames == 1
+    assert app.city_label.text == "London, "
+    assert app.status_label.text == "Data fetched successfully"
+    
+    # Same payload again only touches widgets whose text changed
+    app.renderer.set(app.status_label, text="Refreshing...")
+    root.run()
+    calls = app.renderer.configure_calls
+    app._apply_weather("London", Observation.from_json(weather_data), ForecastSeries())
+    root.run()
+    
+    assert app.renderer.configure_calls == calls + 1
@@ -0,0 +1,224 @@
+import pytest
+import requests
+from unittest.mock import patch, MagicMock
+from resilience import TokenBucket, RetryPolicy, CircuitBreaker, CircuitOpenError, parse_retry_after
+from http_client import WeatherClient
+from project import WeatherApp
+from renderer import Renderer
+from metrics import PhaseMetrics
+from response_cache import ResponseCache
+from store import ObservationStore
+from models import Observation, ForecastSeries
+from providers import OpenWeatherProvider
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class MockResponse:
+    def __init__(self, json_data=None, status_code=200, headers=None):
+        self.json_data = json_data or {}
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return self.json_data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error")
+
+class MockRoot:
+    def after(self, ms, func):
+        func()
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+def test_bucket_allows_burst_then_refills(clock):
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+
+    assert all(bucket.acquire(timeout=0) for _ in range(3))
+    assert bucket.acquire(timeout=0) is False
+
+    clock.now += 0.5
+    assert bucket.acquire(timeout=0) is True
+    clock.now += 10
+    assert bucket.available() == 3
+
+def test_bucket_pause_holds_everyone_back(clock):
+    bucket = TokenBucket(rate=100, capacity=10, clock=clock)
+    bucket.pause(5)
+
+    clock.now += 4
+    assert bucket.acquire(timeout=0) is False
+    clock.now += 1.1
+    assert bucket.acquire(timeout=0) is True
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480) == 10
+
+def test_retry_policy_backoff_and_retry_after():
+    policy = RetryPolicy(attempts=4, base_delay=0.5, max_delay=3, max_retry_after=10, random=lambda: 1.0)
+
+    assert [policy.delay(attempt) for attempt in range(4)] == [0.5, 1.0, 2.0, None]
+    assert policy.backoff(10) == 3
+    assert policy.delay(0, MockResponse(headers={"Retry-After": "4"})) == 4
+    # Too long to wait out on a fetch thread
+    assert policy.delay(0, MockResponse(headers={"Retry-After": "60"})) is None
+
+def test_breaker_opens_then_half_opens(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now += 31
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only the trial call goes through
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.now += 31
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_client_retries_429_honouring_retry_after():
+    sleeps = []
+    client = WeatherClient("dummy_api_key", retry=RetryPolicy(sleep=sleeps.append))
+    responses = [MockResponse(status_code=429, headers={"Retry-After": "2"}), MockResponse({"name": "Paris"})]
+    with patch('requests.Session.get', side_effect=responses) as mock_get, \
+         patch.object(client.limiter, 'pause') as mock_pause:
+        response = client.get("weather", {"q": "Paris"})
+
+    assert response.json() == {"name": "Paris"}
+    assert mock_get.call_count == 2
+    assert sleeps == [2]
+    mock_pause.assert_called_once_with(2)
+
+def test_long_retry_after_does_not_stall_the_bucket():
+    client = WeatherClient("dummy_api_key", retry=RetryPolicy(max_retry_after=10, sleep=lambda seconds: None))
+    with patch('requests.Session.get', return_value=MockResponse(status_code=429, headers={"Retry-After": "3600"})) as mock_get, \
+         patch.object(client.limiter, 'pause') as mock_pause:
+        assert client.get("weather", {"q": "Paris"}).status_code == 429
+
+    # Gave up straight away, and later calls are held back at most max_retry_after
+    assert mock_get.call_count == 1
+    mock_pause.assert_called_once_with(10)
+
+def test_client_does_not_retry_404():
+    client = WeatherClient("dummy_api_key", retry=RetryPolicy(sleep=lambda seconds: None))
+    with patch('requests.Session.get', return_value=MockResponse(status_code=404)) as mock_get:
+        assert client.get("weather", {"q": "Atlantis"}).status_code == 404
+
+    assert mock_get.call_count == 1
+    assert client.breaker._failures == 0
+
+def test_client_gives_up_and_opens_breaker():
+    client = WeatherClient(
+        "dummy_api_key",
+        retry=RetryPolicy(attempts=3, sleep=lambda seconds: None),
+        breaker=CircuitBreaker(failure_threshold=2),
+    )
+    with patch('requests.Session.get', side_effect=requests.exceptions.ConnectionError("down")) as mock_get:
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.ConnectionError):
+                client.get("weather", {"q": "Paris"})
+        with pytest.raises(CircuitOpenError):
+            client.get("weather", {"q": "Paris"})
+
+    # Three attempts each for the first two calls, nothing once open
+    assert mock_get.call_count == 6
+
+def test_failed_trial_of_any_kind_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.now += 31
+    client = WeatherClient("dummy_api_key", retry=RetryPolicy(sleep=lambda seconds: None), breaker=breaker)
+    with patch('requests.Session.get', side_effect=requests.exceptions.ChunkedEncodingError("dropped")):
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            client.get("weather", {"q": "Paris"})
+
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 31
+    with patch('requests.Session.get', return_value=MockResponse({"name": "Paris"})):
+        assert client.get("weather", {"q": "Paris"}).json() == {"name": "Paris"}
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_calls_wait_for_the_bucket(clock):
+    limiter = TokenBucket(rate=1, capacity=1, clock=clock)
+    client = WeatherClient("dummy_api_key", limiter=limiter)
+    with patch('requests.Session.get', return_value=MockResponse()):
+        client.get("weather", {"q": "Paris"})
+
+    assert limiter.acquire(timeout=0) is False
+
+@pytest.fixture
+def weather_app():
+    app = WeatherApp.__new__(WeatherApp)
+    app.root = MockRoot()
+    app.metrics = PhaseMetrics()
+    app.renderer = Renderer(app.root)
+    app.client = MagicMock()
+    app.provider = OpenWeatherProvider(app.client)
+    app.city_ids = {}
+    app.response_cache = ResponseCache()
+    app.store = ObservationStore(":memory:")
+    app.status_label = MagicMock()
+    app.error_label = MagicMock()
+    app.update_gui = MagicMock()
+    app.add_to_recent_cities = MagicMock()
+    app.snapshot_writer = MagicMock()
+    app.weather_data = None
+    app.forecast_data = None
+    return app
+
+def test_open_circuit_serves_cached_data(weather_app):
+    weather_app.response_cache.put("London", "weather", Observation(name="London"))
+    weather_app.response_cache.put("London", "forecast", ForecastSeries())
+    weather_app.client.fetch_current_and_forecast.side_effect = CircuitOpenError(20)
+
+    weather_app._fetch_weather_thread("London")
+
+    assert weather_app.weather_data.name == "London"
+    weather_app.status_label.configure.assert_called_with(text="Weather service unavailable, showing saved data")
+    weather_app.error_label.configure.assert_not_called()
+
+def test_rate_limited_falls_back_to_stored_history(weather_app):
+    weather_app.store.record("Paris", "weather", {"name": "Paris", "dt": 1700000000})
+    weather_app.store.record("Paris", "forecast", {"list": []})
+    weather_app.client.fetch_current_and_forecast.return_value = (
+        MockResponse(status_code=429), MockResponse(status_code=429)
+    )
+
+    weather_app._fetch_weather_thread("Paris")
+
+    assert weather_app.weather_data.name == "Paris"
+    weather_app.error_label.configure.assert_not_called()
+
+def test_error_shown_when_nothing_is_cached(weather_app):
+    weather_app.client.fetch_current_and_forecast.side_effect = CircuitOpenError(20)
+
+    weather_app._fetch_weather_thread("Tokyo")
+
+    weather_app.status_label.configure.assert_called_with(text="Failed to fetch weather data")
+    weather_app.error_label.configure.assert_called_with(text="Error: Weather service unavailable, retrying in 20s")
@@ -0,0 +1,107 @@
+import pytest
+from unittest.mock import MagicMock
+from project import WeatherApp
+from response_cache import ResponseCache, normalize_city
+from renderer import Renderer
+from metrics import PhaseMetrics
+from models import Observation, ForecastSeries
+
+class MockRoot:
+    def after(self, ms, func):
+        func()
+
+class MockClock:
+    def __init__(self):
+        self.now = 0
+    
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return MockClock()
+
+@pytest.fixture
+def cache(clock):
+    return ResponseCache(ttls={"weather": 60, "forecast": 300}, max_stale=600, clock=clock)
+
+@pytest.fixture
+def weather_app(cache):
+    app = WeatherApp.__new__(WeatherApp)
+    app.city = "London"
+    app.metrics = PhaseMetrics()
+    app.renderer = Renderer(MockRoot())
+    app.weather_data = None
+    app.forecast_data = None
+    app.response_cache = cache
+    app.status_label = MagicMock()
+    app.update_gui = MagicMock()
+    app.scheduler = MagicMock()
+    return app
+
+def test_normalize_city():
+    assert normalize_city("  New   York ") == "new york"
+    assert normalize_city("LONDON") == normalize_city("london")
+
+def test_cache_miss(cache):
+    assert cache.get("London", "weather") == (None, False)
+
+def test_cache_entry_goes_stale_per_endpoint(cache, clock):
+    """Test weather and forecast each use their own TTL"""
+    cache.put("London", "weather", {"temp": 1})
+    cache.put("London", "forecast", {"list": []})
+    clock.now = 120
+    
+    assert cache.get("london", "weather") == ({"temp": 1}, False)
+    assert cache.get("london", "forecast") == ({"list": []}, True)
+
+def test_cache_entry_age(cache, clock):
+    assert cache.age("London", "weather") is None
+    cache.put("London", "weather", {"temp": 1})
+    clock.now = 45
+    
+    assert cache.age(" london ", "weather") == 45
+
+def test_cache_drops_entries_past_max_stale(cache, clock):
+    cache.put("London", "weather", {"temp": 1})
+    clock.now = 60 + 600 + 1
+    
+    assert cache.get("London", "weather") == (None, False)
+    assert len(cache) == 0
+
+def test_invalidate_city(cache):
+    cache.put("London", "weather", {})
+    cache.put("Paris", "weather", {})
+    cache.invalidate("LONDON")
+    
+    assert cache.get("London", "weather") == (None, False)
+    assert cache.get("Paris", "weather") == ({}, True)
+
+def test_fetch_weather_fresh_cache_skips_network(weather_app, cache):
+    """Test a fresh entry is drawn without starting a fetch"""
+    cache.put("London", "weather", Observation(name="London"))
+    cache.put("London", "forecast", ForecastSeries())
+    
+    weather_app.fetch_weather()
+    
+    weather_app.scheduler.submit.assert_not_called()
+    weather_app.scheduler.supersede.assert_called_once()
+    weather_app.update_gui.assert_called_once()
+    assert weather_app.weather_data.name == "London"
+
+def test_fetch_weather_stale_cache_draws_then_refreshes(weather_app, cache, clock):
+    """Test a stale entry is drawn immediately and refreshed in the background"""
+    cache.put("London", "weather", Observation(name="London"))
+    cache.put("London", "forecast", ForecastSeries())
+    clock.now = 120
+    
+    weather_app.fetch_weather()
+    
+    weather_app.update_gui.assert_called_once()
+    weather_app.scheduler.submit.assert_called_once()
+
+def test_fetch_weather_cache_miss_fetches(weather_app):
+    weather_app.fetch_weather()
+    
+    weather_app.update_gui.assert_not_called()
+    weather_app.scheduler.submit.assert_called_once()
@@ -0,0 +1,66 @@
+import pytest
+import threading
+from scheduler import FetchScheduler
+
+@pytest.fixture
+def scheduler():
+    scheduler = FetchScheduler(max_in_flight=1)
+    yield scheduler
+    scheduler.shutdown()
+
+def blocking_job(started, release, results):
+    def job(ticket):
+        started.set()
+        release.wait(5)
+        results.append((ticket.key, ticket.is_current()))
+    return job
+
+def test_only_newest_ticket_is_current(scheduler):
+    first = scheduler.submit("london", lambda ticket: None)
+    second = scheduler.submit("paris", lambda ticket: None)
+    
+    assert not first.is_current()
+    assert second.is_current()
+
+def test_duplicate_request_is_coalesced(scheduler):
+    """Test a repeat request joins the job already in flight"""
+    started, release, results = threading.Event(), threading.Event(), []
+    first = scheduler.submit("london", blocking_job(started, release, results))
+    started.wait(5)
+    second = scheduler.submit("london", blocking_job(started, release, results))
+    release.set()
+    scheduler.shutdown()
+    
+    assert first is second
+    assert results == [("london", True)]
+
+def test_superseded_queued_request_is_cancelled(scheduler):
+    """Test queued work that is no longer wanted never runs"""
+    started, release, results = threading.Event(), threading.Event(), []
+    scheduler.submit("london", blocking_job(started, release, results))
+    started.wait(5)
+    scheduler.submit("paris", lambda ticket: results.append(("paris", ticket.is_current())))
+    scheduler.submit("tokyo", lambda ticket: results.append(("tokyo", ticket.is_current())))
+    release.set()
+    scheduler.shutdown()
+    
+    assert ("paris", True) not in results and ("paris", False) not in results
+    assert ("london", False) in results
+    assert ("tokyo", True) in results
+
+def test_in_flight_is_bounded(scheduler):
+    started, release, results = threading.Event(), threading.Event(), []
+    scheduler.submit("london", blocking_job(started, release, results))
+    started.wait(5)
+    for city in ["paris", "tokyo", "berlin", "dubai"]:
+        scheduler.submit(city, lambda ticket: None)
+    
+    # One running plus at most one queued
+    assert scheduler.in_flight() <= 2
+    release.set()
+
+def test_supersede_invalidates_outstanding_tickets(scheduler):
+    ticket = scheduler.submit("london", lambda ticket: None)
+    scheduler.supersede()
+    
+    assert not ticket.is_current()
@@ -0,0 +1,110 @@
+import os
+import pytest
+from unittest.mock import patch, MagicMock
+from project import WeatherApp
+from icon_cache import IconCache
+from renderer import Renderer
+from metrics import PhaseMetrics
+import threading
+from snapshot import save_snapshot, load_snapshot, SnapshotWriter
+from models import Observation, ForecastSeries
+
+class MockRoot:
+    def after(self, ms, func):
+        func()
+
+@pytest.fixture
+def weather_data():
+    return {"name": "Tokyo", "dt": 1611234567, "weather": [{"icon": "01d", "description": "clear sky"}], "main": {"temp": 5}}
+
+@pytest.fixture
+def weather_app(tmp_path):
+    app = WeatherApp.__new__(WeatherApp)
+    app.root = MockRoot()
+    app.metrics = PhaseMetrics()
+    app.renderer = Renderer(app.root)
+    app.icon_cache = IconCache(str(tmp_path))
+    app.snapshot_path = str(tmp_path / "snapshot.json.gz")
+    app.city_ids = {}
+    app.status_label = MagicMock()
+    app.update_gui = MagicMock()
+    return app
+
+def test_snapshot_round_trip(tmp_path, weather_data):
+    path = str(tmp_path / "snapshot.json.gz")
+    save_snapshot(path, "Tokyo", weather_data, {"list": []}, {"01d": b"\x89PNG"})
+    snapshot = load_snapshot(path)
+    
+    assert snapshot["city"] == "Tokyo"
+    assert snapshot["weather"] == weather_data
+    assert snapshot["forecast"] == {"list": []}
+    assert snapshot["icons"] == {"01d": b"\x89PNG"}
+
+def test_missing_or_corrupt_snapshot(tmp_path):
+    path = tmp_path / "snapshot.json.gz"
+    assert load_snapshot(str(path)) is None
+    path.write_bytes(b"not gzip")
+    assert load_snapshot(str(path)) is None
+
+def test_save_snapshot_includes_cached_icons(weather_app, weather_data):
+    weather_app.icon_cache.put_bytes("01d", b"png")
+    weather_app.save_snapshot("Tokyo", Observation.from_json(weather_data), ForecastSeries())
+    
+    assert load_snapshot(weather_app.snapshot_path)["icons"] == {"01d": b"png"}
+
+def test_picked_city_id_survives_restart(weather_app, weather_data):
+    """Test a suggestion label like "Paris, US, TX" is fetched by ID, not by name, after a restart"""
+    weather_app.city_ids["paris, us, tx"] = 4717560
+    weather_app.save_snapshot("Paris, US, TX", Observation.from_json(weather_data), ForecastSeries())
+    
+    restarted = WeatherApp.__new__(WeatherApp)
+    restarted.city_ids = {}
+    restarted.restore_city(load_snapshot(weather_app.snapshot_path))
+    
+    assert restarted.city == "Paris, US, TX"
+    assert restarted.city_ids == {"paris, us, tx": 4717560}
+
+def test_show_snapshot_draws_without_network(weather_app, weather_data):
+    """Test a saved snapshot is rendered synchronously with its icons"""
+    snapshot = {"city": "Tokyo", "weather": weather_data, "forecast": {"list": []}, "icons": {"01d": b"png"}}
+    with patch('project.Image.open'), patch('project.ImageTk.PhotoImage', return_value="photo"):
+        weather_app.show_snapshot(snapshot)
+    
+    assert weather_app.weather_data == Observation.from_json(weather_data)
+    weather_app.update_gui.assert_called_once()
+    assert weather_app.icon_cache.get_image("01d") == "photo"
+    assert weather_app.icon_cache.get_bytes("01d") == b"png"
+
+def test_writer_coalesces_to_latest_state():
+    """Test saves made while a write is running collapse into one write of the newest state"""
+    started, release = threading.Event(), threading.Event()
+    written = []
+    
+    def write(city):
+        started.set()
+        release.wait(5)
+        written.append(city)
+    
+    writer = SnapshotWriter(write)
+    writer.save("London")
+    assert started.wait(5)
+    for city in ["Paris", "Tokyo", "Berlin"]:
+        writer.save(city)
+    release.set()
+    writer.shutdown()
+    
+    assert written == ["London", "Berlin"]
+
+def test_concurrent_saves_leave_a_valid_snapshot(tmp_path, weather_data):
+    path = str(tmp_path / "snapshot.json.gz")
+    threads = [
+        threading.Thread(target=save_snapshot, args=(path, f"City {i}", weather_data, {"list": []}))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert load_snapshot(path)["city"].startswith("City ")
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
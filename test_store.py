@@ -0,0 +1,86 @@
+import pytest
+import sqlite3
+from unittest.mock import MagicMock
+from project import WeatherApp
+from response_cache import ResponseCache
+from store import ObservationStore, RETENTION_DAYS
+from models import Observation
+
+NOW = 1611234567
+
+@pytest.fixture
+def store(tmp_path):
+    store = ObservationStore(str(tmp_path / "observations.db"))
+    yield store
+    store.close()
+
+def observation(dt, temp):
+    return {"name": "London", "dt": dt, "main": {"temp": temp}}
+
+def test_store_uses_wal(store):
+    mode = store._connection.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+def test_history_returns_last_24h_in_order(store):
+    """Test range queries by city and time"""
+    for hours_ago, temp in [(30, 1), (20, 2), (10, 3), (1, 4)]:
+        store.record("London", "weather", observation(NOW - hours_ago * 3600, temp))
+    store.record("Paris", "weather", observation(NOW - 3600, 99))
+    
+    history = store.history("london", hours=24, now=NOW)
+    
+    assert [payload["main"]["temp"] for _, payload in history] == [2, 3, 4]
+    assert history[0][0] == NOW - 20 * 3600
+
+def test_same_observation_is_stored_once(store):
+    store.record("London", "weather", observation(NOW, 1))
+    store.record("LONDON ", "weather", observation(NOW, 1))
+    
+    assert len(store.range("London", until=NOW)) == 1
+
+def test_forecasts_are_keyed_on_fetch_time(store):
+    store.record("London", "forecast", {"list": [1]}, fetched_at=NOW - 60)
+    store.record("London", "forecast", {"list": [2]}, fetched_at=NOW)
+    
+    assert store.latest("London", "forecast") == {"list": [2]}
+    assert len(store.range("London", "forecast", until=NOW)) == 2
+
+def test_unchanged_forecast_is_not_stored_again(store):
+    assert store.record("London", "forecast", {"list": [1]}, fetched_at=NOW - 600)
+    assert not store.record("London", "forecast", {"list": [1]}, fetched_at=NOW)
+    
+    assert store.range("London", "forecast", until=NOW) == [(NOW - 600, {"list": [1]})]
+
+def test_old_forecasts_are_pruned(store):
+    week = RETENTION_DAYS["forecast"] * 86400
+    store.record("London", "forecast", {"list": [1]}, fetched_at=NOW - week - 60)
+    store.record("Paris", "forecast", {"list": [1]}, fetched_at=NOW - week - 60)
+    store.record("Paris", "weather", observation(NOW - week - 60, 5))
+    
+    # Recording prunes that city's old forecasts, prune() the rest
+    store.record("London", "forecast", {"list": [2]}, fetched_at=NOW)
+    assert store.range("London", "forecast", until=NOW) == [(NOW, {"list": [2]})]
+    assert store.prune(now=NOW) == 1
+    assert store.range("Paris", "forecast", until=NOW) == []
+    assert len(store.range("Paris", "weather", until=NOW)) == 1
+
+def test_store_survives_reopen(tmp_path):
+    path = str(tmp_path / "observations.db")
+    first = ObservationStore(path)
+    first.record("Tokyo", "weather", observation(NOW, 10))
+    first.close()
+    
+    second = ObservationStore(path)
+    assert second.latest("Tokyo") == observation(NOW, 10)
+    assert second.cities() == ["tokyo"]
+    second.close()
+
+def test_record_observation_ignores_store_errors():
+    app = WeatherApp.__new__(WeatherApp)
+    app.response_cache = ResponseCache()
+    app.store = MagicMock()
+    app.store.record.side_effect = sqlite3.OperationalError("disk full")
+    
+    app.record_observation("London", "weather", Observation(dt=NOW))
+    
+    assert app.response_cache.get("London", "weather")[0].dt == NOW
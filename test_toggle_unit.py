@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
 from project import WeatherApp
 
 class MockSwitch:
@@ -35,6 +35,7 @@ def weather_app():
     app.temp_unit = "celsius"
     app.unit_switch = MockSwitch()
     app.update_gui = MagicMock()
+    app.update_temperature_labels = MagicMock()
     
     return app
 
@@ -46,7 +47,8 @@ def test_toggle_unit_to_fahrenheit(weather_app):
     weather_app.toggle_unit()
     
     assert weather_app.temp_unit == "fahrenheit"
-    weather_app.update_gui.assert_called_once()
+    weather_app.update_temperature_labels.assert_called_once()
+    weather_app.update_gui.assert_not_called()
 
 def test_toggle_unit_to_celsius(weather_app):
     """Test toggling temperature unit to celsius"""
@@ -56,7 +58,8 @@ def test_toggle_unit_to_celsius(weather_app):
     weather_app.toggle_unit()
     
     assert weather_app.temp_unit == "celsius"
-    weather_app.update_gui.assert_called_once()
+    weather_app.update_temperature_labels.assert_called_once()
+    weather_app.update_gui.assert_not_called()
 
 def test_toggle_unit_no_change_celsius(weather_app):
     """Test toggle doesn't change when already in celsius and switch is off"""
@@ -66,7 +69,8 @@ def test_toggle_unit_no_change_celsius(weather_app):
     weather_app.toggle_unit()
     
     assert weather_app.temp_unit == "celsius"
-    weather_app.update_gui.assert_called_once()
+    weather_app.update_temperature_labels.assert_called_once()
+    weather_app.update_gui.assert_not_called()
 
 def test_toggle_unit_no_change_fahrenheit(weather_app):
     """Test toggle doesn't change when already in fahrenheit and switch is on"""
@@ -76,4 +80,5 @@ def test_toggle_unit_no_change_fahrenheit(weather_app):
     weather_app.toggle_unit()
     
     assert weather_app.temp_unit == "fahrenheit"
-    weather_app.update_gui.assert_called_once()
\ No newline at end of file
+    weather_app.update_temperature_labels.assert_called_once()
+    weather_app.update_gui.assert_not_called()
\ No newline at end of file
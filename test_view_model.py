@@ -0,0 +1,96 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from project import WeatherApp
+from renderer import Renderer
+from metrics import PhaseMetrics
+from view_model import WeatherViewModel, convert_temperature, format_temperature
+from models import Observation
+
+class MockRoot:
+    def after(self, ms, func):
+        func()
+
+class MockLabel:
+    def __init__(self):
+        self.text = ""
+        self.configure_calls = 0
+    
+    def configure(self, text=None, image=None):
+        self.configure_calls += 1
+        if text is not None:
+            self.text = text
+
+@pytest.fixture
+def weather_data():
+    return {
+        "name": "London",
+        "sys": {"country": "GB"},
+        "dt": 1611234567,
+        "weather": [{"icon": "01d", "description": "clear sky"}],
+        "main": {"temp": 15.5, "humidity": 76, "pressure": 1013},
+        "wind": {"speed": 3.6}
+    }
+
+@pytest.fixture
+def daily_forecast():
+    return [{
+        "day": "Friday", "icon": "10d", "description": "light rain",
+        "temp_min": 8.0, "temp_max": 12.0, "temp_mean": 10.0, "precipitation": 2.5,
+    }]
+
+@pytest.fixture
+def weather_app(weather_data):
+    app = WeatherApp.__new__(WeatherApp)
+    app.metrics = PhaseMetrics()
+    app.renderer = Renderer(MockRoot())
+    app.temp_unit = "celsius"
+    app.wind_unit = "m/s"
+    app.pressure_unit = "hPa"
+    app.weather_data = Observation.from_json(weather_data)
+    app.forecast_data = None
+    app.load_weather_icon = MagicMock()
+    for name in ["error_label", "city_label", "date_label", "icon_label", "temp_label",
+                 "desc_label", "humidity_label", "wind_label", "pressure_label"]:
+        setattr(app, name, MockLabel())
+    app.forecast_days = []
+    return app
+
+def test_convert_temperature_kelvin():
+    assert convert_temperature(0, "kelvin") == 273.15
+    assert format_temperature(0, "kelvin") == "273.1 K"
+
+def test_view_model_formats_every_unit(weather_data, daily_forecast):
+    view = WeatherViewModel(Observation.from_json(weather_data), daily_forecast)
+    
+    assert view.city == "London, GB"
+    assert view.temp == {"celsius": "15.5°C", "fahrenheit": "59.9°F", "kelvin": "288.6 K"}
+    assert view.wind == {"m/s": "Wind: 3.6 m/s", "mph": "Wind: 8.1 mph"}
+    assert view.pressure == {"hPa": "Pressure: 1013 hPa", "inHg": "Pressure: 29.91 inHg"}
+    assert view.forecast[0].temp["fahrenheit"] == "53.6° / 46.4°F"
+    assert view.forecast[0].description == "Light rain\n2.5 mm"
+
+def test_view_model_missing_pressure(weather_data):
+    del weather_data["main"]["pressure"]
+    assert WeatherViewModel(Observation.from_json(weather_data)).pressure["inHg"] == "Pressure: --"
+
+def test_view_model_built_once_per_payload(weather_app):
+    with patch('project.WeatherViewModel') as mock_view_model:
+        weather_app.get_view_model()
+        weather_app.get_view_model()
+    
+    mock_view_model.assert_called_once()
+
+def test_toggle_only_repaints_temperatures(weather_app):
+    """Test switching units touches the temperature labels and nothing else"""
+    weather_app.update_gui()
+    weather_app.unit_switch = MagicMock()
+    weather_app.unit_switch.get.return_value = 1
+    calls_before = weather_app.city_label.configure_calls
+    
+    with patch('project.WeatherViewModel') as mock_view_model:
+        weather_app.toggle_unit()
+    
+    mock_view_model.assert_not_called()
+    assert weather_app.temp_label.text == "59.9°F"
+    assert weather_app.city_label.configure_calls == calls_before
+    assert weather_app.load_weather_icon.call_count == 1
@@ -1,12 +1,21 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from project import WeatherApp
+from http_client import WeatherClient
+from resilience import RetryPolicy
+from response_cache import ResponseCache
+from renderer import Renderer
+from metrics import PhaseMetrics
+from store import ObservationStore
 import requests
+from models import Observation
+from providers import OpenWeatherProvider
 
 class MockResponse:
     def __init__(self, json_data, status_code=200):
         self.json_data = json_data
         self.status_code = status_code
+        self.headers = {}
         self.content = b""
     
     def json(self):
@@ -41,7 +50,14 @@ def weather_app():
         app = WeatherApp.__new__(WeatherApp)
         
         app.root = root
+        app.metrics = PhaseMetrics()
+        app.renderer = Renderer(root)
         app.api_key = "dummy_api_key"
+        app.client = WeatherClient("dummy_api_key", retry=RetryPolicy(sleep=lambda seconds: None))
+        app.provider = OpenWeatherProvider(app.client)
+        app.city_ids = {}
+        app.response_cache = ResponseCache()
+        app.store = ObservationStore(":memory:")
         app.city = "London"
         app.temp_unit = "celsius"
         app.weather_data = None
@@ -51,6 +67,7 @@ def weather_app():
         app.update_gui = MagicMock()
         app.recent_cities = []
         app.add_to_recent_cities = MagicMock()
+        app.snapshot_writer = MagicMock()
         
         return app
 
@@ -61,9 +78,64 @@ def weather_app():
 ])
 def test_fetch_weather_error_handling(weather_app, exception, expected_message):
     """Test error handling in fetch weather"""
-    with patch('requests.get', side_effect=exception):
-        weather_app._fetch_weather_thread()
+    with patch('requests.Session.get', side_effect=exception) as mock_get:
+        weather_app._fetch_weather_thread("London")
         
         weather_app.status_label.configure.assert_called_with(text="Failed to fetch weather data")
         weather_app.error_label.configure.assert_called_with(text=expected_message)
-        assert weather_app.update_gui.call_count == 0
\ No newline at end of file
+        assert weather_app.update_gui.call_count == 0
+    
+    # Both calls (and any retries) finished under the patch, none was left to reach the network
+    assert {call.args[0].rsplit("/", 1)[-1] for call in mock_get.call_args_list} == {"weather", "forecast"}
+
+def test_fetch_weather_success(weather_app):
+    """Test a successful fetch stores both payloads and renders"""
+    responses = {
+        "weather": MockResponse({"name": "London"}),
+        "forecast": MockResponse({"list": []}),
+    }
+    with patch('requests.Session.get', side_effect=lambda url, **kwargs: responses[url.rsplit("/", 1)[-1]]):
+        weather_app._fetch_weather_thread("London")
+    
+    assert weather_app.weather_data == Observation(name="London")
+    assert len(weather_app.forecast_data) == 0
+    weather_app.update_gui.assert_called_once()
+    weather_app.status_label.configure.assert_called_with(text="Data fetched successfully")
+    assert weather_app.response_cache.get("london", "weather") == (Observation(name="London"), True)
+    assert weather_app.store.latest("London", "forecast") == {"city": {"timezone": 0}, "list": []}
+
+def test_fetch_weather_city_not_found(weather_app):
+    """Test a 404 shows the city not found message"""
+    with patch('requests.Session.get', return_value=MockResponse({}, status_code=404)):
+        weather_app._fetch_weather_thread("London")
+    
+    weather_app.error_label.configure.assert_called_with(text="Error: City 'London' not found")
+    assert weather_app.update_gui.call_count == 0
+
+
+def test_superseded_fetch_is_dropped(weather_app):
+    """Test a response for an older request never reaches the GUI"""
+    ticket = MagicMock()
+    ticket.is_current.return_value = False
+    with patch('requests.Session.get', return_value=MockResponse({"name": "Paris"})):
+        weather_app._fetch_weather_thread("Paris", ticket)
+    
+    assert weather_app.weather_data is None
+    weather_app.update_gui.assert_not_called()
+    weather_app.add_to_recent_cities.assert_not_called()
+    assert weather_app.response_cache.get("Paris", "weather") == (Observation(name="Paris"), True)
+
+def test_missing_city_is_not_requested_again(weather_app):
+    """Test a 404 is remembered for a short while"""
+    clock = [0]
+    weather_app.response_cache = ResponseCache(clock=lambda: clock[0])
+    with patch('requests.Session.get', return_value=MockResponse({}, status_code=404)) as mock_get:
+        weather_app._fetch_weather_thread("Atlantis")
+        weather_app._fetch_weather_thread("atlantis ")
+        assert mock_get.call_count == 2
+        
+        clock[0] = 301
+        weather_app._fetch_weather_thread("Atlantis")
+    
+    assert mock_get.call_count == 4
+    weather_app.error_label.configure.assert_called_with(text="Error: City 'Atlantis' not found")
@@ -0,0 +1,86 @@
+from datetime import datetime
+
+TEMP_UNITS = ("celsius", "fahrenheit", "kelvin")
+WIND_UNITS = ("m/s", "mph")
+PRESSURE_UNITS = ("hPa", "inHg")
+
+MPH_PER_MS = 2.23694
+INHG_PER_HPA = 0.0295300
+
+
+def convert_temperature(temp, unit):
+    if unit == "fahrenheit":
+        return (temp * 9/5) + 32
+    elif unit == "kelvin":
+        return temp + 273.15
+    else:
+        return temp
+
+
+def format_temperature(temp_c, unit):
+    value = convert_temperature(temp_c, unit)
+    if unit == "kelvin":
+        return f"{value:.1f} K"
+    return f"{value:.1f}°{unit[0].upper()}"
+
+
+def format_temperature_range(temp_max_c, temp_min_c, unit):
+    temp_max = convert_temperature(temp_max_c, unit)
+    temp_min = convert_temperature(temp_min_c, unit)
+    if unit == "kelvin":
+        return f"{temp_max:.1f} / {temp_min:.1f} K"
+    return f"{temp_max:.1f}° / {temp_min:.1f}°{unit[0].upper()}"
+
+
+class ForecastDayView:
+    def __init__(self, day):
+        self.day = day["day"]
+        self.icon = day["icon"]
+        description = day["description"].capitalize()
+        if day["precipitation"] > 0:
+            description += f"\n{day['precipitation']:.1f} mm"
+        self.description = description
+        self.temp = {
+            unit: format_temperature_range(day["temp_max"], day["temp_min"], unit)
+            for unit in TEMP_UNITS
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, ForecastDayView) and vars(self) == vars(other)
+
+
+class WeatherViewModel:
+    """Display strings for one ``Observation``, pre-formatted for every unit.
+
+    Built once per observation so a unit switch is just a dictionary lookup.
+    """
+
+    def __init__(self, observation, daily_forecast=()):
+        self.city = f"{observation.name}, {observation.country}"
+        self.date = datetime.fromtimestamp(observation.dt).strftime("%A, %d %B %Y")
+        self.icon = observation.icon
+        self.description = observation.description.capitalize()
+        self.humidity = f"Humidity: {observation.humidity}%"
+
+        self.temp = {unit: format_temperature(observation.temp, unit) for unit in TEMP_UNITS}
+
+        wind_speed = observation.wind_speed
+        self.wind = {
+            "m/s": f"Wind: {wind_speed} m/s",
+            "mph": f"Wind: {wind_speed * MPH_PER_MS:.1f} mph",
+        }
+
+        pressure = observation.pressure
+        if pressure is None:
+            self.pressure = {unit: "Pressure: --" for unit in PRESSURE_UNITS}
+        else:
+            self.pressure = {
+                "hPa": f"Pressure: {pressure} hPa",
+                "inHg": f"Pressure: {pressure * INHG_PER_HPA:.2f} inHg",
+            }
+
+        self.forecast = [ForecastDayView(day) for day in daily_forecast]
+
+    def __eq__(self, other):
+        # Same strings on screen, whatever the raw payloads were
+        return isinstance(other, WeatherViewModel) and vars(self) == vars(other)
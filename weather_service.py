@@ -0,0 +1,110 @@
+import os
+import sqlite3
+
+from lazy_import import lazy_module
+from http_client import WeatherClient
+from providers import CityNotFoundError, make_provider, DEFAULT_PROVIDER, CITY_IDS
+from response_cache import ResponseCache, normalize_city
+from store import ObservationStore, default_store_path
+from metrics import PhaseMetrics
+from models import Observation, ForecastSeries
+
+dotenv = lazy_module("dotenv")
+
+RECORD_TYPES = {"weather": Observation, "forecast": ForecastSeries}
+
+
+class WeatherService:
+    """Fetching, caching and recording weather, with no GUI attached.
+
+    Reads its configuration from the environment (and ``.env``) the same
+    way for the app and for the headless ``--cities`` command, so both hit
+    the same provider, response cache and SQLite history.
+    """
+
+    def __init__(self, provider=None, fixtures_dir=None, store_path=None):
+        # Load .env file
+        dotenv.load_dotenv()
+
+        # API validation (fixture data works without a key)
+        provider = provider or os.getenv("WEATHER_PROVIDER", DEFAULT_PROVIDER)
+        self.api_key = os.getenv("OPENWEATHER_API_KEY")
+        if not self.api_key and provider != "fixtures":
+            raise ValueError("API key not found. Please set OPENWEATHER_API_KEY in your .env file.")
+
+        # Per-phase timings for the debug overlay and Prometheus export
+        self.metrics = PhaseMetrics()
+
+        # Shared HTTP client (keep-alive connection pool)
+        self.client = WeatherClient.from_base_url(
+            self.api_key, os.getenv("OPENWEATHER_BASE_URL"), metrics=self.metrics
+        )
+
+        # Where weather comes from: OpenWeather (2 calls), One Call (1 call) or fixture files
+        self.provider = make_provider(provider, self.client, fixtures_dir or os.getenv("WEATHER_FIXTURES"))
+        self.response_cache = ResponseCache()
+
+        # Local history of every payload (SQLite, WAL mode)
+        self.store = ObservationStore(store_path or default_store_path(os.getenv("WEATHER_CACHE_DIR")))
+        try:
+            self.store.prune()
+        except sqlite3.Error:
+            pass
+
+        # Cities with a known OpenWeather ID are fetched by ID, not by name
+        self.city_ids = {normalize_city(name): city_id for name, city_id in CITY_IDS.items()}
+
+    def fetch_city(self, city):
+        with self.metrics.timer("fetch"):
+            weather_data, forecast_data = self.fetch_from_provider(city)
+
+        # Good data is worth caching even if the user has moved on
+        with self.metrics.timer("store_write"):
+            self.record_observation(city, "weather", weather_data)
+            self.record_observation(city, "forecast", forecast_data)
+        return weather_data, forecast_data
+
+    def fetch_from_provider(self, city):
+        # A city the provider just couldn't find isn't asked about again for a while
+        if self.is_known_missing(city):
+            raise CityNotFoundError(city)
+        try:
+            return self.provider.fetch(city, self.city_ids.get(normalize_city(city)))
+        except CityNotFoundError:
+            self.response_cache.put(city, "not_found", True)
+            raise
+
+    def is_known_missing(self, city):
+        _, fresh = self.response_cache.get(city, "not_found")
+        return fresh
+
+    def record_observation(self, city, kind, data):
+        # ``data`` is an Observation or ForecastSeries; history keeps its compact JSON
+        self.response_cache.put(city, kind, data)
+        try:
+            self.store.record(city, kind, data.to_json())
+        except sqlite3.Error:
+            # History is a nice-to-have, never fail a fetch over it
+            pass
+
+    def last_good(self, city, kind):
+        """The newest ``kind`` data for ``city``, from the cache or else history.
+
+        Stale entries count: when upstream is failing or throttled, the last
+        good data beats an error. Returns None if there is none.
+        """
+        data, _ = self.response_cache.get(city, kind)
+        if data is not None:
+            return data
+        try:
+            data = self.store.latest(city, kind)
+        except sqlite3.Error:
+            return None
+        return RECORD_TYPES[kind].from_json(data) if data is not None else None
+
+    def get_history(self, city, hours=24):
+        return self.store.history(city, hours)
+
+    def close(self):
+        self.client.close()
+        self.store.close()